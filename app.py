@@ -4,8 +4,23 @@ import numpy as np
 from datetime import datetime, date, timedelta
 import json
 import os
+import sys
+import time
+import threading
 import plotly.graph_objects as go
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from alerts import load_alerts
+from dashboard_snapshot import build_snapshot, load_snapshot
+from farm_data import FARM_TZ, SharedTables, data_version
+from forecast import forecast_milestones
+from fruit_store import FRUIT_STORE_DIR, MANIFEST_NAME, FruitStore, import_csv
+from growth_fit import fit_fruits, house_summary, latest_season
+from growth_stage import stage_info
+from season_archive import ARCHIVE_INDEX_FILE, read_records, read_table
+from season_index import SeasonIndex
+from stage_timeline import StageTimeline, update_stage_timeline
+
 # ============================================================
 # Page config
 # ============================================================
@@ -78,12 +93,17 @@ st.markdown("""
 # ============================================================
 # 설정
 # ============================================================
-TODAY = date.today()
 DATA_DIR = "data"
 SENSOR_FILE = os.path.join(DATA_DIR, "sensor_history.json")
 GDD_FILE = os.path.join(DATA_DIR, "gdd_data.json")
 PHENOLOGY_FILE = os.path.join(DATA_DIR, "phenology.json")
-GROWTH_FILE = "fruit_growth.json"
+SEASON_INDEX_FILE = os.path.join(DATA_DIR, "season_index.json")
+SNAPSHOT_FILE = os.path.join(DATA_DIR, "dashboard_snapshot.json")
+STAGE_TIMELINE_FILE = os.path.join(DATA_DIR, "stage_timeline.json")
+ALERT_LOG_FILE = os.path.join(DATA_DIR, "alerts.json")
+
+# 자동 갱신 조각(fragment)이 데이터 버전을 확인하는 주기 (초)
+REFRESH_SECONDS = 60
 
 # ============================================================
 # 데이터 로드
@@ -106,75 +126,190 @@ def save_json(filepath, data):
     except:
         return False
 
+def today():
+    """농장 현지 날짜 (fragment 자동 갱신은 모듈을 다시 실행하지 않으므로 호출할 때마다 계산)"""
+    return datetime.now(FARM_TZ).date()
+
+def fmt(value, spec=".1f", unit=""):
+    """센서 값 표시 (결측은 -)"""
+    return "-" if value is None else f"{value:{spec}}{unit}"
+
+# 데이터 품질 플래그 표시명
+QUALITY_LABELS = {"missing": "결측", "stuck": "값 고정", "out_of_range": "범위 이탈"}
+
 # ============================================================
-# 생육 단계 감지
+# 대시보드 스냅샷 / 생육 단계
 # ============================================================
+@st.cache_data(show_spinner=False)
+def get_snapshot(version):
+    """수집기가 만든 스냅샷 (없거나 오래됐으면 전체 기록으로 생성)"""
+    snapshot = load_snapshot(SNAPSHOT_FILE, SENSOR_FILE, GDD_FILE)
+    if snapshot is None:
+        snapshot = build_snapshot(read_records("sensor", SENSOR_FILE), read_records("gdd", GDD_FILE), today(),
+                                  timeline=stage_timeline())
+    return snapshot
+
+def live_version():
+    """화면 갱신 판단용 데이터 버전 (파일 stat 만 확인)"""
+    return data_version([SNAPSHOT_FILE, SENSOR_FILE, GDD_FILE, ARCHIVE_INDEX_FILE, STAGE_TIMELINE_FILE])
+
+def current_snapshot():
+    return get_snapshot(live_version())
+
+@st.cache_resource
+def shared_tables():
+    """센서/GDD 전체 기록 (지난 시즌 보관분 포함, 프로세스 공용 컬럼 배열, 새 데이터가 오면 통째로 교체)"""
+    files = {"sensor": SENSOR_FILE, "gdd": GDD_FILE}
+    return SharedTables(
+        {name: [path, ARCHIVE_INDEX_FILE] for name, path in files.items()},
+        loader=lambda name: read_table(name, files[name]),
+    )
+
+def history(name):
+    return shared_tables().get(name)
+
+@st.cache_resource(max_entries=2)
+def get_stage_timeline(version):
+    """수집기가 만든 연도별 단계 구간 (없으면 None)"""
+    return StageTimeline.load(STAGE_TIMELINE_FILE)
+
+def stage_timeline():
+    return get_stage_timeline(data_version([STAGE_TIMELINE_FILE]))
+
+@st.cache_resource(max_entries=2)
+def get_season_index(version):
+    """연도 × 일자 인덱스 (프로세스 공용 읽기 전용 배열, 파일이 바뀔 때만 다시 파싱, 없으면 None)"""
+    index = SeasonIndex.load(SEASON_INDEX_FILE)
+    if index is not None:
+        for values in index.metrics.values():
+            values.setflags(write=False)
+    return index
+
+def season_index():
+    return get_season_index(data_version([SEASON_INDEX_FILE]))
+
 def get_current_growth_stage():
-    """현재 생육 단계 자동 감지"""
-    month = TODAY.month
+    """현재 생육 단계 (스냅샷에 저장된 단계 타임라인 조회값, 수집 이후 날짜가 바뀌었으면 다시 조회)"""
+    snapshot = current_snapshot()
+    day = today()
+    if snapshot["stage"].get("date") == day.isoformat():
+        return snapshot["stage"]
+    timeline = stage_timeline()
+    if timeline is not None:
+        return timeline.lookup(day)
+    return snapshot["stage"]
+
+# ============================================================
+# 차트 캐시
+# 그림 스펙(JSON)을 (차트 종류, 데이터 버전, 표시 범위)별로 모든 세션이 공유
+# ============================================================
+CHART_LAYOUT = dict(
+    height=300,
+    margin=dict(l=10, r=10, t=30, b=10),
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+)
+
+# 누적 GDD 차트 표시 범위
+GDD_RANGES = {"all": "전체", "year": "올해", "30d": "최근 30일"}
+
+# 생육 단계 음영 색 (배지 색과 같은 계열)
+STAGE_FILLS = {
+    "stage-dormancy": "rgba(100,100,100,0.08)",
+    "stage-flowering": "rgba(255,105,180,0.10)",
+    "stage-fruiting": "rgba(52,199,89,0.10)",
+    "stage-harvest": "rgba(255,149,0,0.10)",
+}
+
+def _sensor_recent_figure(version, display_range):
+    series = get_snapshot(version)['series']['sensor']
+    df = pd.DataFrame(series)
+    df['date'] = pd.to_datetime(df['date'])
     
-    gdd_data = load_json(GDD_FILE)
-    phenology = load_json(PHENOLOGY_FILE)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=df['date'], y=df['outdoor_temp'], name='실외 온도', line=dict(color='#FF9500', width=2)))
+    fig.add_trace(go.Scatter(x=df['date'], y=df['temp_2dong'], name='2동 온도', line=dict(color='#34C759', width=2)))
+    fig.add_trace(go.Scatter(x=df['date'], y=df['moisture_2dong'], name='2동 수분', line=dict(color='#007AFF', width=2), yaxis='y2'))
     
-    current_gdd = gdd_data[-1].get("accumulated_gdd", 0) if gdd_data else 0
-    year_str = str(TODAY.year)
-    year_data = phenology.get(year_str, {})
-    
-    # GDD와 날짜 기반 판단
-    if month in [1, 2, 3]:
-        if current_gdd < 200:
-            return {
-                "id": "dormancy",
-                "name": "휴면기/발아기",
-                "emoji": "🌱",
-                "color": "stage-dormancy",
-                "progress": min(100, (current_gdd / 200) * 100),
-                "next_milestone": "발아",
-                "next_gdd": 200
-            }
-        elif current_gdd < 750:
-            return {
-                "id": "pre_flowering",
-                "name": "발아 후 성장기",
-                "emoji": "🌿",
-                "color": "stage-dormancy",
-                "progress": min(100, ((current_gdd - 200) / 550) * 100),
-                "next_milestone": "개화",
-                "next_gdd": 750
-            }
+    fig.update_layout(
+        **CHART_LAYOUT,
+        yaxis=dict(title='온도 (°C)'),
+        yaxis2=dict(title='수분 (%)', overlaying='y', side='right')
+    )
+    return fig
+
+def _gdd_accumulated_figure(version, display_range):
+    df = history("gdd").to_frame(['date', 'accumulated_gdd'])
+    df['date'] = pd.to_datetime(df['date'])
+    if display_range == "year":
+        df = df[df['date'].dt.year == df['date'].iloc[-1].year]
+    elif display_range == "30d":
+        df = df.tail(30)
     
-    elif month in [4, 5]:
-        return {
-            "id": "flowering",
-            "name": "개화기/착과기",
-            "emoji": "🌸",
-            "color": "stage-flowering",
-            "progress": min(100, ((current_gdd - 750) / 250) * 100) if current_gdd >= 750 else 0,
-            "next_milestone": "착과 완료",
-            "next_gdd": 1000
-        }
+    fig = go.Figure()
+    timeline = stage_timeline()
+    if timeline is not None and len(df):
+        first, last = df['date'].iloc[0].strftime('%Y-%m-%d'), df['date'].iloc[-1].strftime('%Y-%m-%d')
+        for interval in timeline.intervals():
+            if interval['end'] < first or interval['start'] > last:
+                continue
+            info = stage_info(interval['id'], int(interval['start'][5:7]), 0)
+            fig.add_vrect(
+                x0=max(interval['start'], first), x1=min(interval['end'], last),
+                fillcolor=STAGE_FILLS[info['color']], line_width=0, layer='below',
+                annotation_text=info['emoji'], annotation_position='top left',
+            )
+    fig.add_trace(go.Scatter(x=df['date'], y=df['accumulated_gdd'], mode='lines+markers', name='누적 GDD', line=dict(color='#34C759', width=3)))
+    fig.add_hline(y=200, line_dash='dash', line_color='#FF9500', annotation_text='발아 (200)')
+    fig.add_hline(y=750, line_dash='dash', line_color='#FF69B4', annotation_text='개화 (750)')
     
-    elif month in [6, 7, 8, 9, 10]:
-        return {
-            "id": "fruiting",
-            "name": "과실 비대기",
-            "emoji": "🥝",
-            "color": "stage-fruiting",
-            "progress": ((month - 6) / 4) * 100,
-            "next_milestone": "수확",
-            "next_gdd": 0
-        }
+    fig.update_layout(**CHART_LAYOUT, yaxis_title='누적 GDD (°C·일)')
+    return fig
+
+def _season_compare_figure(version, display_range):
+    year, other_year = display_range
+    index = season_index()
+    this, other, _ = index.compare("season_gdd", year, other_year)
     
-    else:  # 11, 12월
-        return {
-            "id": "harvest",
-            "name": "수확 후 관리",
-            "emoji": "📦",
-            "color": "stage-harvest",
-            "progress": 100,
-            "next_milestone": "내년 준비",
-            "next_gdd": 0
-        }
+    dates = pd.date_range(f"{year}-01-01", periods=len(this))
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dates, y=this, name=f'{year}년', line=dict(color='#34C759', width=3)))
+    fig.add_trace(go.Scatter(x=dates, y=other, name=f'{other_year}년', line=dict(color='#8E8E93', width=2, dash='dot')))
+    fig.update_layout(**CHART_LAYOUT, yaxis_title='시즌 누적 GDD (°C·일)')
+    return fig
+
+CHART_BUILDERS = {
+    "sensor_recent": _sensor_recent_figure,
+    "gdd_accumulated": _gdd_accumulated_figure,
+    "season_compare": _season_compare_figure,
+}
+
+@st.cache_resource
+def chart_cache_stats():
+    """차트별 요청/생성 횟수와 생성 시간 (프로세스 전체 공유)"""
+    return {"lock": threading.Lock(), "charts": {}}
+
+def _chart_stat(chart):
+    return chart_cache_stats()["charts"].setdefault(chart, {"requests": 0, "builds": 0, "build_seconds": 0.0})
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def build_chart_spec(chart, version, display_range):
+    """그림 생성 → JSON 스펙 (캐시에 없을 때만 실행)"""
+    started = time.perf_counter()
+    spec = CHART_BUILDERS[chart](version, display_range).to_json()
+    elapsed = time.perf_counter() - started
+    with chart_cache_stats()["lock"]:
+        stat = _chart_stat(chart)
+        stat["builds"] += 1
+        stat["build_seconds"] += elapsed
+    return spec
+
+def cached_chart(chart, version, display_range=None):
+    """캐시된 스펙으로 차트 표시 (검증 없이 복원 → DataFrame/그림 생성 생략)"""
+    with chart_cache_stats()["lock"]:
+        _chart_stat(chart)["requests"] += 1
+    spec = build_chart_spec(chart, version, display_range)
+    st.plotly_chart(go.Figure(json.loads(spec), _validate=False), use_container_width=True)
 
 # ============================================================
 # AI 모델 (간단한 다중 회귀)
@@ -261,32 +396,38 @@ class SimpleMultipleRegression:
 # ============================================================
 # 헤더
 # ============================================================
-stage = get_current_growth_stage()
-
-st.markdown(f"""
+@st.fragment(run_every=REFRESH_SECONDS)
+def header():
+    """헤더 (데이터 버전이 바뀌면 이 조각만 새 값으로 그려짐)"""
+    stage = get_current_growth_stage()
+    
+    st.markdown(f"""
 <div style="padding: 1.5rem; background: var(--card); border-bottom: 1px solid var(--border); margin-bottom: 1rem;">
     <h1 style="margin:0; color: var(--text);">🥝 키위 농장 AI 관리 시스템</h1>
-    <p style="margin:5px 0 10px 0; color: var(--muted);">{TODAY.strftime('%Y년 %m월 %d일')}</p>
+    <p style="margin:5px 0 10px 0; color: var(--muted);">{today().strftime('%Y년 %m월 %d일')}</p>
     <span class="stage-badge {stage['color']}">{stage['emoji']} {stage['name']}</span>
 </div>
 """, unsafe_allow_html=True)
 
+header()
+
 # ============================================================
 # 홈 탭 (생육 단계별 대시보드)
 # ============================================================
-def home_dashboard():
+@st.fragment(run_every=REFRESH_SECONDS)
+def home_metrics():
+    """생육 단계 + 핵심 지표 카드 (자동 갱신)"""
     stage = get_current_growth_stage()
-    gdd_data = load_json(GDD_FILE)
-    sensor_data = load_json(SENSOR_FILE)
+    snapshot = current_snapshot()
     
-    # 현재 GDD
-    current_gdd = gdd_data[-1].get("accumulated_gdd", 0) if gdd_data else 0
+    # 현재 GDD (시즌 누적)
+    current_gdd = snapshot['current_gdd']
     
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.markdown(f"### {stage['emoji']} 현재 생육 단계: {stage['name']}")
     
     if stage['next_gdd'] > 0:
-        remaining = stage['next_gdd'] - current_gdd
+        remaining = stage['next_gdd'] - stage.get('gdd', current_gdd)
         st.metric("다음 단계까지", f"{remaining:.1f}°C·일 남음")
         st.progress(stage['progress'] / 100, text=f"{stage['progress']:.0f}% 진행")
     
@@ -298,15 +439,19 @@ def home_dashboard():
     
     c1, c2, c3 = st.columns(3)
     
-    if gdd_data:
-        c1.metric("누적 GDD", f"{current_gdd:.1f}°C·일")
+    if snapshot['counts']['gdd']:
+        c1.metric("누적 GDD", f"{current_gdd:.1f}°C·일", help="올해 1월 1일부터")
     
-    if sensor_data:
-        latest = sensor_data[-1]
-        c2.metric("평균 온도", f"{latest['outdoor_temp']:.1f}°C")
-        c3.metric("평균 수분", f"{latest['moisture_2dong']:.0f}%")
+    latest = snapshot['latest_sensor']
+    if latest:
+        c2.metric("평균 온도", fmt(latest['outdoor_temp'], ".1f", "°C"))
+        c3.metric("평균 수분", fmt(latest['moisture_2dong'], ".0f", "%"))
     
     st.markdown("</div>", unsafe_allow_html=True)
+
+def home_dashboard():
+    home_metrics()
+    stage = get_current_growth_stage()
     
     # 단계별 안내
     st.markdown("<div class='card'>", unsafe_allow_html=True)
@@ -333,6 +478,19 @@ def home_dashboard():
         st.caption("• 내년 데이터 분석 및 계획 수립")
     
     st.markdown("</div>", unsafe_allow_html=True)
+    
+    # 최근 알림 (수집기 규칙 엔진 결과)
+    recent_alerts = load_alerts(ALERT_LOG_FILE, since=(today() - timedelta(days=7)).strftime("%Y-%m-%d"))
+    if recent_alerts:
+        st.markdown("<div class='card'>", unsafe_allow_html=True)
+        st.markdown("### 🚨 최근 알림 (7일)")
+        for alert in recent_alerts[:10]:
+            text = f"{alert['date']} {alert['time']} · {alert['message']} ({alert['value']})"
+            if alert['level'] == 'warning':
+                st.warning(text)
+            else:
+                st.caption(f"• {text}")
+        st.markdown("</div>", unsafe_allow_html=True)
 
 # ============================================================
 # 센서 탭
@@ -340,52 +498,51 @@ def home_dashboard():
 def sensor_tab():
     st.markdown("## 📡 센서 모니터링")
     
-    sensor_data = load_json(SENSOR_FILE)
-    
-    if not sensor_data:
+    # 데이터가 없어도 조각은 만들어 둠 → 첫 수집 후 새로고침 없이 표시
+    sensor_cards()
+    sensor_chart()
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def sensor_cards():
+    """최근 센서값 카드 (자동 갱신)"""
+    latest = current_snapshot()['latest_sensor']
+    if not latest:
         st.info("📊 GitHub Actions가 매일 자동으로 데이터를 수집합니다")
         return
     
-    latest = sensor_data[-1]
-    
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.markdown(f"### 최근 데이터 ({latest['date']})")
     
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("실외 온도", f"{latest['outdoor_temp']:.1f}°C")
-    c2.metric("2동 온도", f"{latest['temp_2dong']:.1f}°C")
-    c3.metric("3동 온도", f"{latest['temp_3dong']:.1f}°C")
-    c4.metric("토양 온도", f"{latest['temp_soil']:.1f}°C")
+    c1.metric("실외 온도", fmt(latest['outdoor_temp'], ".1f", "°C"))
+    c2.metric("2동 온도", fmt(latest['temp_2dong'], ".1f", "°C"))
+    c3.metric("3동 온도", fmt(latest['temp_3dong'], ".1f", "°C"))
+    c4.metric("토양 온도", fmt(latest['temp_soil'], ".1f", "°C"))
     
     c1, c2 = st.columns(2)
-    c1.metric("2동 수분", f"{latest['moisture_2dong']:.0f}%")
-    c2.metric("3동 수분", f"{latest['moisture_3dong']:.0f}%")
+    c1.metric("2동 수분", fmt(latest['moisture_2dong'], ".0f", "%"))
+    c2.metric("3동 수분", fmt(latest['moisture_3dong'], ".0f", "%"))
+    
+    quality = latest.get('quality', {})
+    if quality.get('flags'):
+        issues = ", ".join(
+            f"{field} ({'/'.join(QUALITY_LABELS.get(f, f) for f in flags)})"
+            for field, flags in quality['flags'].items()
+        )
+        st.warning(f"⚠️ 센서 점검 필요: {issues}")
     
     st.markdown("</div>", unsafe_allow_html=True)
-    
-    # 최근 7일 추이
-    if len(sensor_data) >= 2:
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def sensor_chart():
+    """최근 30일 추이 차트 (자동 갱신)"""
+    version = live_version()
+    series = get_snapshot(version)['series']['sensor']
+    if len(series['date']) >= 2:
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.markdown("### 📈 최근 추이")
         
-        df = pd.DataFrame(sensor_data[-30:])
-        df['date'] = pd.to_datetime(df['date'])
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=df['date'], y=df['outdoor_temp'], name='실외 온도', line=dict(color='#FF9500', width=2)))
-        fig.add_trace(go.Scatter(x=df['date'], y=df['temp_2dong'], name='2동 온도', line=dict(color='#34C759', width=2)))
-        fig.add_trace(go.Scatter(x=df['date'], y=df['moisture_2dong'], name='2동 수분', line=dict(color='#007AFF', width=2), yaxis='y2'))
-        
-        fig.update_layout(
-            height=300,
-            margin=dict(l=10, r=10, t=30, b=10),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            yaxis=dict(title='온도 (°C)'),
-            yaxis2=dict(title='수분 (%)', overlaying='y', side='right')
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        cached_chart("sensor_recent", version)
         st.markdown("</div>", unsafe_allow_html=True)
 
 # ============================================================
@@ -394,56 +551,66 @@ def sensor_tab():
 def gdd_tab():
     st.markdown("## 🌡️ 적산온도 (GDD)")
     
-    gdd_data = load_json(GDD_FILE)
+    # 요약/이정표는 스냅샷 (시즌 누적 GDD, 홈 화면·API 와 같은 값)
+    snapshot = current_snapshot()
+    latest = snapshot['latest_gdd']
     
-    if not gdd_data:
+    if not latest:
         st.info("📊 데이터 수집 중입니다")
+        gdd_chart()
         return
     
-    latest = gdd_data[-1]
-    current_gdd = latest['accumulated_gdd']
-    
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     c1, c2, c3 = st.columns(3)
-    c1.metric("누적 GDD", f"{current_gdd:.1f}°C·일")
+    c1.metric("누적 GDD", f"{snapshot['current_gdd']:.1f}°C·일", help="올해 1월 1일부터")
     c2.metric("일일 증가", f"+{latest['daily_gdd']:.1f}")
-    c3.metric("수집 일수", f"{len(gdd_data)}일")
+    c3.metric("수집 일수", f"{snapshot['counts']['gdd']}일")
     st.markdown("</div>", unsafe_allow_html=True)
     
     # 이정표
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.markdown("### 📍 생육 이정표")
     
-    milestones = [
-        {"name": "발아", "gdd": 200, "emoji": "🌱"},
-        {"name": "개화", "gdd": 750, "emoji": "🌸"},
-    ]
-    
-    for m in milestones:
-        reached = current_gdd >= m['gdd']
-        status = "✅" if reached else f"{((current_gdd/m['gdd'])*100):.0f}%"
-        st.progress(min(1.0, current_gdd/m['gdd']), text=f"{m['emoji']} {m['name']} ({m['gdd']}°C·일): {status}")
+    for m in snapshot['milestones']:
+        status = "✅" if m['reached'] else f"{m['progress']:.0f}%"
+        st.progress(m['progress'] / 100, text=f"{m['emoji']} {m['name']} ({m['gdd']}°C·일): {status}")
     
     st.markdown("</div>", unsafe_allow_html=True)
     
-    # 그래프
-    df = pd.DataFrame(gdd_data)
-    df['date'] = pd.to_datetime(df['date'])
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df['date'], y=df['accumulated_gdd'], mode='lines+markers', name='누적 GDD', line=dict(color='#34C759', width=3)))
-    fig.add_hline(y=200, line_dash='dash', line_color='#FF9500', annotation_text='발아 (200)')
-    fig.add_hline(y=750, line_dash='dash', line_color='#FF69B4', annotation_text='개화 (750)')
-    
-    fig.update_layout(
-        height=300,
-        margin=dict(l=10, r=10, t=30, b=10),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        yaxis_title='누적 GDD (°C·일)'
-    )
+    # 전체 기록 차트는 켰을 때만 (탭 본문은 매 실행마다 모두 실행되므로 첫 화면은 스냅샷만 읽음)
+    show_history = st.toggle("📈 전체 기록 차트 보기", key="gdd_history")
+    gdd_chart()
+    if not show_history:
+        return
     
-    st.plotly_chart(fig, use_container_width=True)
+    # 작년 대비 (연도 × 일자 인덱스 조회)
+    index = season_index()
+    this_day = today()
+    if index and this_day.year in index.years and len(index.years) > 1:
+        st.markdown("<div class='card'>", unsafe_allow_html=True)
+        st.markdown("### 📅 연도별 비교")
+        
+        other_years = [y for y in index.years if y != this_day.year]
+        other_year = st.selectbox("비교 연도", sorted(other_years, reverse=True))
+        this, other, diff = index.compare("season_gdd", this_day.year, other_year)
+        
+        day = this_day.timetuple().tm_yday - 1
+        valid = np.flatnonzero(~np.isnan(diff[:day + 1]))
+        if len(valid):
+            d = valid[-1]
+            st.metric(f"{other_year}년 같은 날 대비", f"{this[d]:.1f}°C·일", f"{diff[d]:+.1f}")
+        
+        cached_chart("season_compare", data_version([SEASON_INDEX_FILE]), (this_day.year, other_year))
+        st.markdown("</div>", unsafe_allow_html=True)
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def gdd_chart():
+    """누적 GDD 차트 (자동 갱신, 전체 기록 보기를 켰을 때만)"""
+    if not st.session_state.get("gdd_history") or not current_snapshot()['counts']['gdd']:
+        return
+    display_range = st.radio("표시 범위", list(GDD_RANGES), format_func=GDD_RANGES.get,
+                             horizontal=True, label_visibility="collapsed", key="gdd_range")
+    cached_chart("gdd_accumulated", live_version(), display_range)
 
 # ============================================================
 # 생육 기록 탭
@@ -452,7 +619,7 @@ def phenology_tab():
     st.markdown("## 📝 생육 기록")
     
     phenology = load_json(PHENOLOGY_FILE)
-    year_str = str(TODAY.year)
+    year_str = str(today().year)
     
     if year_str not in phenology:
         phenology[year_str] = {}
@@ -464,8 +631,8 @@ def phenology_tab():
     st.markdown("### ➕ 새 이벤트 기록")
     
     with st.form("phenology_form"):
-        event_date = st.date_input("날짜", value=TODAY)
-        event_type = st.selectbox("이벤트", ["개화 시작", "개화 피크", "착과 확인", "적과 완료", "수확 시작"])
+        event_date = st.date_input("날짜", value=today())
+        event_type = st.selectbox("이벤트", ["발아 확인", "개화 시작", "개화 피크", "착과 확인", "적과 완료", "수확 시작"])
         notes = st.text_input("메모 (선택)", placeholder="예: 80% 개화 확인")
         
         if st.form_submit_button("💾 저장", type="primary"):
@@ -477,6 +644,7 @@ def phenology_tab():
             }
             
             if save_json(PHENOLOGY_FILE, phenology):
+                update_stage_timeline(history("gdd"), phenology, STAGE_TIMELINE_FILE)
                 st.success("✅ 저장 완료")
                 st.rerun()
     
@@ -503,36 +671,56 @@ def phenology_tab():
 # ============================================================
 # AI 예측 탭
 # ============================================================
+@st.cache_data(show_spinner=False)
+def get_milestone_forecast(version):
+    """발아/개화 몬테카를로 예측 (데이터 버전별 캐시)"""
+    return forecast_milestones(history("sensor"), history("gdd"))
+
+@st.cache_data(show_spinner=False)
+def get_fruit_forecast(version):
+    """과실별 성장 곡선 → 동별 최종 크기/수확 시기 (데이터 버전별 캐시)"""
+    index = season_index()
+    store = FruitStore(FRUIT_STORE_DIR)
+    if index is None:
+        return {}
+    season = latest_season(store)
+    fits, _ = fit_fruits(store, index, season=season)
+    return house_summary(fits, store, history("gdd"), index, history("sensor"), season=season)
+
 def ai_tab():
     st.markdown("## 🤖 AI 예측")
     
     stage = get_current_growth_stage()
+    counts = current_snapshot()['counts']
+    # 예측은 전체 기록을 읽으므로 켰을 때만 계산
+    show_forecast = st.toggle("🔮 예측 계산", key="ai_forecast", help="저장된 전체 기록으로 예측합니다")
     
     # 단계별 다른 AI 표시
     if stage['id'] in ['dormancy', 'pre_flowering']:
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.markdown("### 🌱 발아/개화 예측")
         
-        gdd_data = load_json(GDD_FILE)
-        if gdd_data and len(gdd_data) >= 7:
-            current_gdd = gdd_data[-1]['accumulated_gdd']
-            recent = gdd_data[-7:]
-            avg_daily = np.mean([r['daily_gdd'] for r in recent])
+        if not counts['gdd']:
+            st.info("📊 데이터 수집 중")
+        elif not show_forecast:
+            st.caption("예측 계산을 켜면 발아/개화 시기를 예측합니다")
+        else:
+            forecast = get_milestone_forecast(data_version([SENSOR_FILE, GDD_FILE]))
+            labels = {"bud_break": "🌱 발아", "flowering_start": "🌸 개화"}
             
-            if avg_daily > 0:
-                days_to_bud = int((200 - current_gdd) / avg_daily) if current_gdd < 200 else 0
-                days_to_flower = int((750 - current_gdd) / avg_daily) if current_gdd < 750 else 0
+            if not forecast:
+                st.success("✅ 개화 단계 도달")
+            
+            for milestone, result in forecast.items():
+                dates = result['dates']
+                if not dates:
+                    st.info(f"{labels[milestone]}: 예측 기간 내 도달 어려움")
+                    continue
                 
-                if days_to_bud > 0:
-                    pred_date = (TODAY + timedelta(days=days_to_bud)).strftime('%m월 %d일')
-                    st.success(f"🌱 발아 예상: {pred_date} (약 {days_to_bud}일 후)")
-                elif days_to_flower > 0:
-                    pred_date = (TODAY + timedelta(days=days_to_flower)).strftime('%m월 %d일')
-                    st.success(f"🌸 개화 예상: {pred_date} (약 {days_to_flower}일 후)")
-                else:
-                    st.success("✅ 개화 단계 도달")
-        else:
-            st.info("📊 데이터 수집 중 (7일 이상 필요)")
+                median = dates[0.5]
+                days_left = max(0, (median - today()).days)
+                st.success(f"{labels[milestone]} 예상: {median.strftime('%m월 %d일')} (약 {days_left}일 후)")
+                st.caption(f"   80% 범위: {dates[0.1].strftime('%m월 %d일')} ~ {dates[0.9].strftime('%m월 %d일')} · 도달 확률 {result['probability']*100:.0f}%")
         
         st.markdown("</div>", unsafe_allow_html=True)
     
@@ -541,11 +729,12 @@ def ai_tab():
         st.markdown("### 🌸 착과율 예측")
         st.info("개화기 환경 데이터를 기반으로 착과율을 예측합니다")
         
-        sensor_data = load_json(SENSOR_FILE)
-        if len(sensor_data) >= 7:
-            recent = sensor_data[-7:]
-            avg_temp = np.mean([s['outdoor_temp'] for s in recent])
-            avg_humid = np.mean([s['outdoor_humid'] for s in recent])
+        if counts['sensor'] >= 7 and not show_forecast:
+            st.caption("예측 계산을 켜면 최근 7일 환경으로 착과율을 예측합니다")
+        elif counts['sensor'] >= 7:
+            recent = history("sensor")[-7:]
+            avg_temp = np.nanmean(recent.column('outdoor_temp'))
+            avg_humid = np.nanmean(recent.column('outdoor_humid'))
             
             # 간단한 착과율 예측 (실제로는 더 정교한 모델 필요)
             base_rate = 75
@@ -569,17 +758,53 @@ def ai_tab():
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.markdown("### 🥝 과실 성장 예측")
         
-        # 기존 성장 예측 모델
-        growth_data = load_json(GROWTH_FILE)
-        sensor_data = load_json(SENSOR_FILE)
+        store = FruitStore(FRUIT_STORE_DIR)
         
-        if len(sensor_data) >= 3 and len(growth_data) >= 3:
-            st.info("✅ AI 모델 학습 가능")
-            
-            if st.button("🚀 모델 학습", type="primary"):
-                st.info("학습 기능은 과실 측정 데이터 입력 후 사용 가능합니다")
-        else:
-            st.info(f"📊 데이터 수집 중 (센서: {len(sensor_data)}/3, 성장: {len(growth_data)}/3)")
+        # 캘리퍼/저울 CSV 일괄 가져오기
+        uploaded = st.file_uploader("📥 과실 측정 CSV 가져오기", type="csv")
+        if uploaded is not None and st.button("가져오기", key="fruit_import"):
+            try:
+                result = import_csv(uploaded.getvalue(), store)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                st.success(f"✅ {result['imported']}/{result['rows']}행 저장 (총 {result['total']}행)")
+                if result['rejected']:
+                    st.warning(f"⚠️ 거부: {result['rejected']}")
+                if result['duplicates_in_store']:
+                    st.caption(f"이미 있는 측정 {result['duplicates_in_store']}건은 건너뜀")
+        
+        houses = store.houses()
+        if houses:
+            cols = st.columns(len(houses))
+            for col, house in zip(cols, houses):
+                col.metric(f"{house} 과실", f"{len(store.fruit_ids(house))}개")
+        
+        measurements = store.count()
+        summary = {}
+        ready = counts['sensor'] >= 3 and measurements >= 3
+        if ready and show_forecast:
+            version = data_version([os.path.join(FRUIT_STORE_DIR, MANIFEST_NAME), GDD_FILE, SEASON_INDEX_FILE])
+            with st.spinner("과실별 성장 곡선 계산 중..."):
+                summary = get_fruit_forecast(version)
+        
+        for house, entry in summary.items():
+            final = entry['final_mm']
+            st.markdown(f"**{house}** · 과실 {entry['fruits']}개")
+            col1, col2 = st.columns(2)
+            col1.metric("예상 최종 횡경", f"{final[0.5]:.0f}mm", help=f"80% 범위 {final[0.1]:.0f}~{final[0.9]:.0f}mm")
+            if entry['final_weight_g']:
+                col2.metric("예상 최종 무게", f"{entry['final_weight_g'][0.5]:.0f}g")
+            dates = entry['harvest_dates']
+            if dates:
+                st.success(f"📦 수확 적기: {dates[0.1].strftime('%m월 %d일')} ~ {dates[0.9].strftime('%m월 %d일')} (중앙 {dates[0.5].strftime('%m월 %d일')})")
+            else:
+                st.info("📦 수확 적기: 예측 기간 내 도달 어려움")
+        
+        if ready and not show_forecast:
+            st.caption("예측 계산을 켜면 동별 최종 크기와 수확 적기를 예측합니다")
+        elif not summary:
+            st.info(f"📊 데이터 수집 중 (센서: {counts['sensor']}/3, 측정: {measurements}/3)")
         
         st.markdown("</div>", unsafe_allow_html=True)
 
@@ -607,16 +832,25 @@ with tab5:
 with st.sidebar:
     st.markdown("### ℹ️ 시스템 정보")
     
-    sensor_count = len(load_json(SENSOR_FILE))
-    gdd_count = len(load_json(GDD_FILE))
+    counts = current_snapshot()['counts']
     
-    st.metric("센서 데이터", f"{sensor_count}일")
-    st.metric("GDD 데이터", f"{gdd_count}일")
+    st.metric("센서 데이터", f"{counts['sensor']}일")
+    st.metric("GDD 데이터", f"{counts['gdd']}일")
     
     stage = get_current_growth_stage()
     st.info(f"현재: {stage['emoji']} {stage['name']}")
     
     st.caption("🤖 GitHub Actions가 매일 자동 수집")
     
+    charts = chart_cache_stats()["charts"]
+    if charts:
+        with st.expander("📈 차트 캐시"):
+            for chart, stat in sorted(charts.items()):
+                hit_rate = 1 - stat['builds'] / stat['requests'] if stat['requests'] else 0
+                build_ms = stat['build_seconds'] / stat['builds'] * 1000 if stat['builds'] else 0
+                st.caption(f"{chart}: 적중 {hit_rate*100:.0f}% ({stat['requests']}회) · 생성 평균 {build_ms:.0f}ms")
+            shared_kb = shared_tables().nbytes / 1024
+            st.caption(f"공용 기록 배열: {shared_kb:.0f}KB (모든 세션 공유)")
+    
     if st.button("🔄 새로고침"):
         st.rerun()
@@ -0,0 +1,208 @@
+"""
+센서 알림 규칙 엔진
+- 임계값 / 지속시간 / 변화율 규칙을 생육 단계별로 적용
+- 규칙마다 마지막 처리 시각과 진행 중 상태만 저장 → 매 실행마다 새 샘플만 평가
+- 같은 이상 구간은 한 번만 기록 (중복 제거)
+- 시간대/날짜는 농장 현지 시각 기준 (수집 러너의 TZ 설정과 무관)
+"""
+
+import os
+import json
+from datetime import datetime
+
+from farm_data import FARM_TZ
+
+DATA_DIR = "data"
+ALERT_STATE_FILE = os.path.join(DATA_DIR, "alert_state.json")
+ALERT_LOG_FILE = os.path.join(DATA_DIR, "alerts.json")
+
+MAX_LOG_ENTRIES = 500
+
+ALL_STAGES = ("dormancy", "pre_flowering", "flowering", "fruiting", "harvest")
+
+# 규칙 정의
+# kind: threshold (즉시) / duration (seconds 이상 지속) / rate (시간당 변화량)
+RULES = [
+    {
+        "id": "cold_shock",
+        "kind": "threshold",
+        "field": "outdoor_temp",
+        "op": "<",
+        "value": 8.0,
+        "stages": ("dormancy", "pre_flowering", "flowering"),
+        "level": "warning",
+        "message": "저온 쇼크 주의 (8°C 미만)",
+    },
+    {
+        "id": "rapid_temp_drop",
+        "kind": "rate",
+        "field": "outdoor_temp",
+        "op": "<",
+        "value": -4.0,
+        "stages": ALL_STAGES,
+        "level": "info",
+        "message": "급격한 기온 하강 (시간당 4°C 이상)",
+    },
+]
+
+for _house, _suffix in (("2동", "2dong"), ("3동", "3dong")):
+    RULES += [
+        {
+            "id": f"moisture_low_{_suffix}",
+            "kind": "duration",
+            "field": f"moisture_{_suffix}",
+            "op": "<",
+            "value": 40.0,
+            "seconds": 6 * 3600,
+            "stages": ("flowering", "fruiting"),
+            "level": "warning",
+            "message": f"{_house} 토양 수분 부족 (40% 미만 6시간 이상)",
+        },
+        {
+            "id": f"moisture_high_{_suffix}",
+            "kind": "duration",
+            "field": f"moisture_{_suffix}",
+            "op": ">",
+            "value": 45.0,
+            "seconds": 12 * 3600,
+            "stages": ("flowering", "fruiting"),
+            "level": "info",
+            "message": f"{_house} 토양 수분 과다 (45% 초과 12시간 이상)",
+        },
+        {
+            "id": f"night_cold_{_suffix}",
+            "kind": "threshold",
+            "field": f"temp_{_suffix}",
+            "op": "<",
+            "value": 15.0,
+            "hours": (20, 6),
+            "stages": ("flowering",),
+            "level": "warning",
+            "message": f"{_house} 야간 온도 15°C 미만",
+        },
+    ]
+
+
+def _compare(op, x, value):
+    return x < value if op == "<" else x > value
+
+
+def _local(ts):
+    return datetime.fromtimestamp(ts, FARM_TZ)
+
+
+def _in_hours(ts, hours):
+    if not hours:
+        return True
+    hour = _local(ts).hour
+    start, end = hours
+    return start <= hour < end if start < end else hour >= start or hour < end
+
+
+class AlertEngine:
+    """규칙별 증분 상태를 가진 평가기"""
+
+    def __init__(self, rules=RULES, state=None):
+        self.rules = rules
+        self.state = state or {}
+
+    def _rule_state(self, rule):
+        return self.state.setdefault(rule["id"], {"last_ts": 0, "since": None, "fired": False, "prev": None})
+
+    def evaluate(self, series, stage_of):
+        """
+        새 샘플 평가
+        series: {필드: [(timestamp, 값), ...]} (시간순)
+        stage_of: 날짜 문자열 → 생육 단계 id
+        반환: 새 알림 목록
+        """
+        alerts = []
+        for rule in self.rules:
+            samples = series.get(rule["field"])
+            if not samples:
+                continue
+            state = self._rule_state(rule)
+
+            for ts, x in samples:
+                if ts <= state["last_ts"]:
+                    continue
+                state["last_ts"] = ts
+                date_str = _local(ts).strftime("%Y-%m-%d")
+
+                if stage_of(date_str) not in rule["stages"] or not _in_hours(ts, rule.get("hours")):
+                    state.update(since=None, fired=False, prev=None)
+                    continue
+
+                if rule["kind"] == "rate":
+                    prev = state["prev"]
+                    state["prev"] = [ts, x]
+                    if not prev or ts <= prev[0]:
+                        continue
+                    rate = (x - prev[1]) / ((ts - prev[0]) / 3600)
+                    breach, measured = _compare(rule["op"], rate, rule["value"]), round(rate, 2)
+                else:
+                    breach, measured = _compare(rule["op"], x, rule["value"]), x
+
+                if not breach:
+                    state.update(since=None, fired=False)
+                    continue
+
+                if state["since"] is None:
+                    state["since"] = ts
+                if state["fired"]:
+                    continue
+                if rule["kind"] == "duration" and ts - state["since"] < rule["seconds"]:
+                    continue
+
+                state["fired"] = True
+                alerts.append({
+                    "ts": ts,
+                    "date": date_str,
+                    "time": _local(ts).strftime("%H:%M"),
+                    "rule": rule["id"],
+                    "level": rule["level"],
+                    "value": measured,
+                    "message": rule["message"],
+                })
+
+        return sorted(alerts, key=lambda a: a["ts"])
+
+
+def _load(filepath, default):
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _save(filepath, data, **kwargs):
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, **kwargs)
+
+
+def process_alerts(series, stage_of, state_file=ALERT_STATE_FILE, log_file=ALERT_LOG_FILE):
+    """수집기용: 상태 로드 → 새 샘플 평가 → 알림 로그/상태 저장"""
+    engine = AlertEngine(state=_load(state_file, {}))
+    new_alerts = engine.evaluate(series, stage_of)
+
+    log = _load(log_file, [])
+    seen = {(a["rule"], a["ts"]) for a in log}
+    log += [a for a in new_alerts if (a["rule"], a["ts"]) not in seen]
+    log = log[-MAX_LOG_ENTRIES:]
+
+    try:
+        _save(state_file, engine.state, indent=2)
+        _save(log_file, log, separators=(",", ":"))
+    except OSError as e:
+        print(f"❌ Save error: {e}")
+    return new_alerts
+
+
+def load_alerts(log_file=ALERT_LOG_FILE, since=None):
+    """알림 로그 조회 (since 날짜 이후, 최신순)"""
+    log = _load(log_file, [])
+    if since:
+        log = [a for a in log if a["date"] >= since]
+    return list(reversed(log))
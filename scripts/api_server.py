@@ -0,0 +1,215 @@
+"""
+농장 데이터 읽기 전용 JSON API
+- 수집기가 쓰는 data/ 파일을 그대로 제공 (폰 위젯, 온실 제어기 등)
+- ETag = 데이터 버전 → 변경 없으면 304 (폴링 비용 최소화)
+- 기간 조회는 커서 기반 페이지 단위
+
+사용법:
+    python scripts/api_server.py --port 8080
+
+엔드포인트:
+    GET /api/version
+    GET /api/latest
+    GET /api/sensor?start=2026-02-01&end=2026-02-28&limit=100&cursor=...
+    GET /api/gdd?start=...&end=...&limit=...&cursor=...
+    GET /api/phenology?year=2026
+"""
+
+import os
+import json
+import zlib
+import argparse
+import threading
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from dashboard_snapshot import build_snapshot, load_snapshot
+from farm_data import data_version
+from season_archive import ARCHIVE_INDEX_NAME, read_records
+from stage_timeline import StageTimeline
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class FarmData:
+    """파일 버전이 바뀔 때만 다시 읽는 데이터 캐시"""
+
+    def __init__(self, data_dir):
+        self.sensor_file = os.path.join(data_dir, "sensor_history.json")
+        self.gdd_file = os.path.join(data_dir, "gdd_data.json")
+        self.phenology_file = os.path.join(data_dir, "phenology.json")
+        self.snapshot_file = os.path.join(data_dir, "dashboard_snapshot.json")
+        self.stage_timeline_file = os.path.join(data_dir, "stage_timeline.json")
+        self.archive_dir = os.path.join(data_dir, "archive")
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def _paths(self, name):
+        """버전 확인용 경로 (센서/GDD 는 보관 인덱스 포함)"""
+        paths = [getattr(self, f"{name}_file")]
+        if name in ("sensor", "gdd"):
+            paths.append(os.path.join(self.archive_dir, ARCHIVE_INDEX_NAME))
+        return paths
+
+    def version(self, *names):
+        return data_version([path for name in names for path in self._paths(name)])
+
+    def _load(self, name, default):
+        path = getattr(self, f"{name}_file")
+        version = data_version(self._paths(name))
+        with self._lock:
+            cached = self._cache.get(name)
+            if cached and cached[0] == version:
+                return cached[1]
+        if name in ("sensor", "gdd"):
+            # 지난 시즌 보관분 + hot 기록
+            data = read_records(name, path, self.archive_dir)
+        else:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = default
+        # 날짜 목록을 같이 보관해 기간 조회는 이진 탐색
+        entry = (data, [r["date"] for r in data]) if isinstance(data, list) else (data, None)
+        with self._lock:
+            self._cache[name] = (version, entry)
+        return entry
+
+    def records(self, name):
+        return self._load(name, [])
+
+    def phenology(self):
+        return self._load("phenology", {})[0]
+
+    def latest(self):
+        """수집기 스냅샷 (없거나 오래됐으면 기록 + 저장된 단계 타임라인으로 생성)"""
+        snapshot = load_snapshot(self.snapshot_file, self.sensor_file, self.gdd_file)
+        if snapshot is None:
+            snapshot = build_snapshot(self.records("sensor")[0], self.records("gdd")[0],
+                                      timeline=StageTimeline.load(self.stage_timeline_file))
+        return {
+            "sensor": snapshot["latest_sensor"],
+            "gdd": snapshot["latest_gdd"],
+            "current_gdd": snapshot["current_gdd"],
+            "stage": snapshot["stage"],
+            "milestones": snapshot["milestones"],
+            "generated_at": snapshot["generated_at"],
+        }
+
+
+def paginate(records, dates, start=None, end=None, cursor=None, limit=DEFAULT_LIMIT):
+    """날짜 범위 + 커서(마지막으로 받은 날짜) 기반 페이지"""
+    first = bisect_left(dates, start) if start else 0
+    hi = bisect_right(dates, end) if end else len(dates)
+    lo = max(first, bisect_right(dates, cursor)) if cursor else first
+
+    page = records[lo:min(hi, lo + limit)]
+    next_cursor = page[-1]["date"] if page and lo + limit < hi else None
+    return {
+        "items": page,
+        "count": len(page),
+        "total": max(0, hi - first),
+        "next_cursor": next_cursor,
+    }
+
+
+def make_handler(farm):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "KiwiFarmAPI/1.0"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body=None, etag=None):
+            payload = b"" if body is None else json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            if body is not None:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            if payload and self.command != "HEAD":
+                self.wfile.write(payload)
+
+        def _error(self, status, message):
+            self._send(status, {"error": message})
+
+        def do_HEAD(self):
+            self.do_GET()
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            route = ROUTES.get(url.path.rstrip("/"))
+            if route is None:
+                return self._error(404, "not found")
+
+            sources, build = route
+            # 응답 내용은 (데이터 버전, 경로, 쿼리)로 결정되므로 본문 생성 전에 304 판단
+            request_key = zlib.crc32(f"{url.path}?{url.query}".encode("utf-8"))
+            etag = f'"{farm.version(*sources)}-{request_key:08x}"'
+            if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+                return self._send(304, etag=etag)
+
+            try:
+                body = build(query)
+            except ValueError as e:
+                return self._error(400, str(e))
+            self._send(200, body, etag=etag)
+
+    def _range(name):
+        def build(query):
+            try:
+                limit = min(MAX_LIMIT, max(1, int(query.get("limit", DEFAULT_LIMIT))))
+            except ValueError:
+                raise ValueError("limit must be an integer")
+            records, dates = farm.records(name)
+            return paginate(records, dates, query.get("start"), query.get("end"),
+                            query.get("cursor"), limit)
+        return build
+
+    def _phenology(query):
+        phenology = farm.phenology()
+        year = query.get("year")
+        return {year: phenology.get(year, {})} if year else phenology
+
+    ROUTES = {
+        "/api/version": (("sensor", "gdd", "phenology"), lambda q: {
+            "sensor": farm.version("sensor"),
+            "gdd": farm.version("gdd"),
+            "phenology": farm.version("phenology"),
+        }),
+        "/api/latest": (("sensor", "gdd", "snapshot", "stage_timeline"), lambda q: farm.latest()),
+        "/api/sensor": (("sensor",), _range("sensor")),
+        "/api/gdd": (("gdd",), _range("gdd")),
+        "/api/phenology": (("phenology",), _phenology),
+    }
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="농장 데이터 읽기 전용 API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", default="data")
+    args = parser.parse_args()
+
+    farm = FarmData(args.data_dir)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(farm))
+    print(f"🌐 API 서버: http://{args.host}:{args.port}/api/latest (data: {args.data_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
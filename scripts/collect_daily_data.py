@@ -11,21 +11,62 @@ import requests
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+from alerts import process_alerts
+from dashboard_snapshot import write_snapshot
+from forecast import load_climatology
+from gdd_engine import COLD_SHOCK_HOURS, MIN_COVERAGE_HOURS, degree_hours
+from season_archive import archive_closed_seasons, read_records
+from season_index import update_season_index
+from sensor_stats import CHANNEL_LIMITS, RunningStats, assess_day, is_valid
+from stage_timeline import update_stage_timeline
+
 # 환경변수
 ECOWITT_APP_KEY = os.environ.get('ECOWITT_APP_KEY')
 ECOWITT_API_KEY = os.environ.get('ECOWITT_API_KEY')
 ECOWITT_MAC = os.environ.get('ECOWITT_MAC')
+# API 주소 (재생 서버 등 대역으로 바꿀 때), 응답 원문 저장 폴더 (설정 시 녹화)
+ECOWITT_BASE_URL = os.environ.get('ECOWITT_BASE_URL', 'https://api.ecowitt.net')
+ECOWITT_RECORD_DIR = os.environ.get('ECOWITT_RECORD_DIR')
 
 # 파일 경로
 DATA_DIR = "data"
 SENSOR_FILE = os.path.join(DATA_DIR, "sensor_history.json")
 GDD_FILE = os.path.join(DATA_DIR, "gdd_data.json")
 PHENOLOGY_FILE = os.path.join(DATA_DIR, "phenology.json")
+REFETCH_LOG_FILE = os.path.join(DATA_DIR, "refetch_log.json")
+
+# 결측 보완 설정
+EXPECTED_SAMPLES_PER_DAY = 48   # 30분 간격
+MIN_SAMPLE_FRACTION = 0.8       # 채널별 이 비율 미만이면 재수집 대상
+GAP_LOOKBACK_DAYS = 60          # 검사 기간
+MAX_FETCH_DAYS = 7              # 1회 요청 최대 기간
+MAX_REFETCH_ATTEMPTS = 2        # 같은 날짜 재수집 최대 횟수
+
+# GDD 계산 방식: "daily" (일평균) / "degree_hour" (30분 샘플 적분)
+GDD_METHOD = os.environ.get('GDD_METHOD', 'daily')
+
+def record_response(start_date, end_date, params, result, record_dir):
+    """API 응답 원문을 기간별 파일로 저장 (키 제외, ecowitt_replay.py 로 재생)"""
+    stamp = "_".join("".join(c for c in s if c.isdigit()) for s in (start_date, end_date))
+    filepath = os.path.join(record_dir, f"history_{stamp}.json")
+    entry = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "call_back": params["call_back"],
+        "cycle_type": params["cycle_type"],
+        "response": result,
+    }
+    try:
+        os.makedirs(record_dir, exist_ok=True)
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"❌ Save error: {e}")
 
 def get_history_data(start_date, end_date):
     """ECOWITT 히스토리 데이터 가져오기 (예전 방식 적용)"""
     try:
-        url = "https://api.ecowitt.net/api/v3/device/history"
+        url = f"{ECOWITT_BASE_URL.rstrip('/')}/api/v3/device/history"
         t = str(int(time.time() * 1000))
         
         params = {
@@ -50,6 +91,8 @@ def get_history_data(start_date, end_date):
         if response.status_code == 200:
             result = response.json()
             print(f"Response code: {result.get('code')}")
+            if ECOWITT_RECORD_DIR:
+                record_response(start_date, end_date, params, result, ECOWITT_RECORD_DIR)
             
             if result.get("code") == 0:
                 data = result.get("data", {})
@@ -72,6 +115,22 @@ def get_history_data(start_date, end_date):
         traceback.print_exc()
         return None
 
+# API 응답 경로 → 저장 필드
+CHANNEL_SOURCES = [
+    # 실내(게이트웨이) = 실외 온도/습도로 사용
+    ("indoor", "temperature", "outdoor_temp", "Indoor temp"),
+    ("indoor", "humidity", "outdoor_humid", "Indoor humid"),
+    # 온습도 센서 CH1 = 2동, CH3 = 3동
+    ("temp_and_humidity_ch1", "temperature", "temp_2dong", "CH1 temp"),
+    ("temp_and_humidity_ch3", "temperature", "temp_3dong", "CH3 temp"),
+    # 온도 센서 CH2 = 토양
+    ("temp_ch2", "temperature", "temp_soil", "CH2 (soil) temp"),
+    # 토양 수분 CH1 = 2동, CH2 = 3동
+    ("soil_ch1", "soilmoisture", "moisture_2dong", "Soil CH1"),
+    ("soil_ch2", "soilmoisture", "moisture_3dong", "Soil CH2"),
+]
+CHANNELS = [field for _, _, field, _ in CHANNEL_SOURCES]
+
 def parse_history_data(api_data):
     """
     히스토리 데이터 파싱 (예전 코드 방식 참고)
@@ -86,158 +145,72 @@ def parse_history_data(api_data):
         }
       }
     }
+    
+    채널별 값은 목록으로 모으지 않고 1패스 통계(RunningStats)로 누적하며,
+    샘플이 없는 채널은 0.0 대신 None 으로 저장하고 quality 필드에 표시합니다.
+    degree_hour 방식용 실외 온도 샘플만 같은 패스에서 따로 모읍니다.
     """
     try:
-        # 날짜별 데이터 그룹화
-        daily_data = defaultdict(lambda: {
-            'temp_2dong': [],
-            'temp_3dong': [],
-            'temp_soil': [],
-            'moisture_2dong': [],
-            'moisture_3dong': [],
-            'outdoor_temp': [],
-            'outdoor_humid': []
-        })
+        # 날짜별 채널 통계
+        daily_data = defaultdict(lambda: {ch: RunningStats() for ch in CHANNELS})
+        outdoor_ts, outdoor_values = [], []
         
         print(f"\n📊 Parsing data...")
         
-        # 실내(게이트웨이) = 실외 온도로 사용
-        if "indoor" in api_data:
-            indoor = api_data["indoor"]
-            
-            # 실외 온도
-            if "temperature" in indoor:
-                temp_list = indoor["temperature"].get("list", {})
-                print(f"  Indoor temp records: {len(temp_list)}")
-                
-                for timestamp, value in temp_list.items():
-                    try:
-                        dt = datetime.fromtimestamp(int(timestamp))
-                        date_str = dt.strftime("%Y-%m-%d")
-                        daily_data[date_str]['outdoor_temp'].append(float(value))
-                    except Exception as e:
-                        continue
-            
-            # 실외 습도
-            if "humidity" in indoor:
-                humid_list = indoor["humidity"].get("list", {})
-                print(f"  Indoor humid records: {len(humid_list)}")
-                
-                for timestamp, value in humid_list.items():
-                    try:
-                        dt = datetime.fromtimestamp(int(timestamp))
-                        date_str = dt.strftime("%Y-%m-%d")
-                        daily_data[date_str]['outdoor_humid'].append(float(value))
-                    except:
-                        continue
-        
-        # 온습도 센서 CH1 = 2동
-        if "temp_and_humidity_ch1" in api_data:
-            ch1 = api_data["temp_and_humidity_ch1"]
-            
-            if "temperature" in ch1:
-                temp_list = ch1["temperature"].get("list", {})
-                print(f"  CH1 temp records: {len(temp_list)}")
-                
-                for timestamp, value in temp_list.items():
-                    try:
-                        dt = datetime.fromtimestamp(int(timestamp))
-                        date_str = dt.strftime("%Y-%m-%d")
-                        daily_data[date_str]['temp_2dong'].append(float(value))
-                    except:
-                        continue
-        
-        # 온습도 센서 CH3 = 3동
-        if "temp_and_humidity_ch3" in api_data:
-            ch3 = api_data["temp_and_humidity_ch3"]
-            
-            if "temperature" in ch3:
-                temp_list = ch3["temperature"].get("list", {})
-                print(f"  CH3 temp records: {len(temp_list)}")
-                
-                for timestamp, value in temp_list.items():
-                    try:
-                        dt = datetime.fromtimestamp(int(timestamp))
-                        date_str = dt.strftime("%Y-%m-%d")
-                        daily_data[date_str]['temp_3dong'].append(float(value))
-                    except:
-                        continue
-        
-        # 온도 센서 CH2 = 토양
-        if "temp_ch2" in api_data:
-            ch2 = api_data["temp_ch2"]
+        for source, measure, field, label in CHANNEL_SOURCES:
+            if source not in api_data or measure not in api_data[source]:
+                continue
             
-            if "temperature" in ch2:
-                temp_list = ch2["temperature"].get("list", {})
-                print(f"  CH2 (soil) temp records: {len(temp_list)}")
-                
-                for timestamp, value in temp_list.items():
-                    try:
-                        dt = datetime.fromtimestamp(int(timestamp))
-                        date_str = dt.strftime("%Y-%m-%d")
-                        daily_data[date_str]['temp_soil'].append(float(value))
-                    except:
-                        continue
-        
-        # 토양 수분 CH1 = 2동
-        if "soil_ch1" in api_data:
-            soil1 = api_data["soil_ch1"]
+            value_list = api_data[source][measure].get("list", {})
+            print(f"  {label} records: {len(value_list)}")
+            limits = CHANNEL_LIMITS.get(field)
             
-            if "soilmoisture" in soil1:
-                moist_list = soil1["soilmoisture"].get("list", {})
-                print(f"  Soil CH1 records: {len(moist_list)}")
-                
-                for timestamp, value in moist_list.items():
-                    try:
-                        dt = datetime.fromtimestamp(int(timestamp))
-                        date_str = dt.strftime("%Y-%m-%d")
-                        daily_data[date_str]['moisture_2dong'].append(float(value))
-                    except:
-                        continue
-        
-        # 토양 수분 CH2 = 3동
-        if "soil_ch2" in api_data:
-            soil2 = api_data["soil_ch2"]
-            
-            if "soilmoisture" in soil2:
-                moist_list = soil2["soilmoisture"].get("list", {})
-                print(f"  Soil CH2 records: {len(moist_list)}")
-                
-                for timestamp, value in moist_list.items():
-                    try:
-                        dt = datetime.fromtimestamp(int(timestamp))
-                        date_str = dt.strftime("%Y-%m-%d")
-                        daily_data[date_str]['moisture_3dong'].append(float(value))
-                    except:
-                        continue
+            for timestamp, value in value_list.items():
+                try:
+                    ts, x = int(timestamp), float(value)
+                    date_str = datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+                    daily_data[date_str][field].add(x, limits)
+                except:
+                    continue
+                if field == "outdoor_temp" and (not limits or limits[0] <= x <= limits[1]):
+                    outdoor_ts.append(ts)
+                    outdoor_values.append(x)
         
         # 날짜별 평균 계산
         daily_averages = []
         
         for date_str in sorted(daily_data.keys()):
             data = daily_data[date_str]
-            
-            def calc_avg(values):
-                return round(sum(values) / len(values), 2) if values else 0.0
-            
             date_obj = datetime.strptime(date_str, "%Y-%m-%d")
             
             avg_record = {
                 "date": date_str,
                 "month": date_obj.month,
                 "day_of_year": date_obj.timetuple().tm_yday,
-                "temp_2dong": calc_avg(data['temp_2dong']),
-                "temp_3dong": calc_avg(data['temp_3dong']),
-                "temp_soil": calc_avg(data['temp_soil']),
-                "moisture_2dong": calc_avg(data['moisture_2dong']),
-                "moisture_3dong": calc_avg(data['moisture_3dong']),
-                "outdoor_temp": calc_avg(data['outdoor_temp']),
-                "outdoor_humid": calc_avg(data['outdoor_humid']),
-                "sample_count": len(data['outdoor_temp'])
             }
+            for field in CHANNELS:
+                stats = data[field]
+                avg_record[field] = round(stats.mean, 2) if stats.n else None
+            avg_record["sample_count"] = data['outdoor_temp'].n
+            avg_record["stats"] = {field: data[field].to_dict() for field in CHANNELS}
+            avg_record["quality"] = assess_day(data)
             
             daily_averages.append(avg_record)
-            print(f"  ✅ {date_str}: {avg_record['sample_count']} samples → {avg_record['outdoor_temp']}°C")
+            quality = avg_record["quality"]
+            note = "" if quality["status"] == "good" else f" ⚠️ {quality['status']} {quality['flags']}"
+            print(f"  ✅ {date_str}: {avg_record['sample_count']} samples → {avg_record['outdoor_temp']}°C{note}")
+        
+        # 실외 온도 30분 샘플 → 시간 단위 열량/저온 노출 (degree_hour 방식용)
+        if outdoor_ts:
+            hourly = degree_hours(outdoor_ts, outdoor_values)
+            by_date = {d: i for i, d in enumerate(hourly["date"])}
+            for avg_record in daily_averages:
+                i = by_date.get(avg_record["date"])
+                if i is None:
+                    continue
+                avg_record["degree_hours"] = round(float(hourly["heat"][i]), 2)
+                avg_record["cold_hours"] = round(float(hourly["cold_hours"][i]), 2)
+                avg_record["covered_hours"] = round(float(hourly["covered_hours"][i]), 2)
         
         return daily_averages
         
@@ -247,6 +220,31 @@ def parse_history_data(api_data):
         traceback.print_exc()
         return None
 
+def extract_series(api_data):
+    """
+    원본 30분 샘플 → 채널별 시간순 [(timestamp, 값), ...] (알림 규칙 평가용)
+    허용 범위를 벗어난 값은 제외합니다.
+    """
+    series = {}
+    for source, measure, field, _ in CHANNEL_SOURCES:
+        if source not in api_data or measure not in api_data[source]:
+            continue
+        
+        limits = CHANNEL_LIMITS.get(field)
+        samples = []
+        for timestamp, value in api_data[source][measure].get("list", {}).items():
+            try:
+                ts, x = int(timestamp), float(value)
+            except:
+                continue
+            if limits and not (limits[0] <= x <= limits[1]):
+                continue
+            samples.append((ts, x))
+        
+        series[field] = sorted(samples)
+    
+    return series
+
 def load_json(filepath):
     """JSON 로드"""
     try:
@@ -296,9 +294,134 @@ def merge_sensor_data(new_data):
         return True
     return False
 
-def calculate_gdd(sensor_data, base_temp=10.0, shock_threshold=8.0):
-    """적산온도 계산"""
+def find_gaps(history, start_date, end_date, min_fraction=MIN_SAMPLE_FRACTION):
+    """
+    누락/샘플 부족 날짜 찾기
+    검사 기간 중 한 번도 값이 없던 채널(미설치 센서)은 제외합니다.
+    """
+    by_date = {r["date"]: r for r in history}
+    
+    def channel_counts(record):
+        if "stats" in record:
+            return {ch: s.get("n", 0) for ch, s in record["stats"].items()}
+        return {"outdoor_temp": record.get("sample_count", 0)}
+    
+    window = []
+    day = start_date
+    while day <= end_date:
+        window.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    
+    active = set()
+    for date_str in window:
+        if date_str in by_date:
+            active.update(ch for ch, n in channel_counts(by_date[date_str]).items() if n > 0)
+    
+    min_samples = EXPECTED_SAMPLES_PER_DAY * min_fraction
+    gaps = []
+    for date_str in window:
+        record = by_date.get(date_str)
+        if record is None:
+            gaps.append(date_str)
+            continue
+        counts = channel_counts(record)
+        if any(counts[ch] < min_samples for ch in active if ch in counts):
+            gaps.append(date_str)
+    
+    return gaps
+
+def coalesce_ranges(dates, max_days=MAX_FETCH_DAYS, bridge_days=1):
+    """
+    날짜 목록 → 최소 요청 구간 [(시작, 끝), ...]
+    bridge_days 이하로 떨어진 구간은 하나로 합치고, max_days 를 넘으면 나눕니다.
+    """
+    ranges = []
+    for date_str in sorted(dates):
+        day = datetime.strptime(date_str, "%Y-%m-%d")
+        if ranges:
+            start, end = ranges[-1]
+            if (day - end).days <= bridge_days + 1 and (day - start).days < max_days:
+                ranges[-1] = (start, day)
+                continue
+        ranges.append((day, day))
+    
+    return [(s.strftime("%Y-%m-%d"), e.strftime("%Y-%m-%d")) for s, e in ranges]
+
+def repair_gaps(lookback_days=GAP_LOOKBACK_DAYS, min_fraction=MIN_SAMPLE_FRACTION):
+    """
+    결측 구간만 다시 받아오기
+    기존보다 샘플이 많은 날만 반환 (merge_sensor_data 로 병합)
+    """
+    history = load_json(SENSOR_FILE)
+    if not history:
+        return []
+    
+    end_date = datetime.now() - timedelta(days=1)
+    start_date = max(
+        end_date - timedelta(days=lookback_days),
+        datetime.strptime(history[0]["date"], "%Y-%m-%d")
+    )
+    
+    attempts = load_json(REFETCH_LOG_FILE) or {}
+    gaps = [
+        d for d in find_gaps(history, start_date, end_date, min_fraction)
+        if attempts.get(d, 0) < MAX_REFETCH_ATTEMPTS
+    ]
+    if not gaps:
+        print("  ✅ No gaps")
+        return []
+    
+    ranges = coalesce_ranges(gaps)
+    print(f"  🔍 {len(gaps)} incomplete days → {len(ranges)} requests")
+    
+    by_date = {r["date"]: r for r in history}
+    gap_set = set(gaps)
+    repaired = []
+    
+    for start_str, end_str in ranges:
+        api_data = get_history_data(f"{start_str} 00:00:00", f"{end_str} 23:59:59")
+        days = parse_history_data(api_data) if api_data else None
+        
+        for record in days or []:
+            date_str = record["date"]
+            if date_str not in gap_set:
+                continue
+            old = by_date.get(date_str)
+            old_count = sum(s.get("n", 0) for s in old.get("stats", {}).values()) if old else -1
+            if old and "stats" not in old:
+                old_count = old.get("sample_count", 0)
+            new_count = sum(s.get("n", 0) for s in record["stats"].values())
+            if new_count > old_count:
+                repaired.append(record)
+    
+    for date_str in gaps:
+        attempts[date_str] = attempts.get(date_str, 0) + 1
+    # 검사 기간을 벗어난 기록은 정리
+    cutoff = start_date.strftime("%Y-%m-%d")
+    save_json(REFETCH_LOG_FILE, {d: n for d, n in attempts.items() if d >= cutoff})
+    
+    print(f"  🩹 {len(repaired)} days repaired")
+    return repaired
+
+def calculate_gdd(sensor_data, base_temp=10.0, shock_threshold=8.0,
+                  recovery_penalty=0.5, stress_window=3, bad_day_policy="impute",
+                  recompute_from=None, method=GDD_METHOD):
+    """
+    적산온도 계산 (일괄/보정 계산은 gdd_engine 참고)
+    
+    method="degree_hour" 이면 파싱 때 30분 샘플로 구한 열량(degree_hours, 기준 10°C)과
+    저온 노출 시간(cold_hours, 8°C 미만)을 사용합니다. 측정 시간이 부족한 날은 일평균 방식.
+    
+    실외 온도가 결측/고착인 날은 bad_day_policy 에 따라 처리합니다.
+    - "impute": 마지막 정상 온도로 대체 (imputed 표시)
+    - "skip": GDD 0, 스트레스 상태 유지 (skipped 표시)
+    
+    recompute_from 날짜 이후 기록은 지우고 sensor_data 로 다시 계산합니다.
+    """
     gdd_records = load_json(GDD_FILE)
+    if recompute_from:
+        gdd_records = [r for r in gdd_records if r["date"] < recompute_from]
+        sensor_data = [r for r in sensor_data if r["date"] >= recompute_from]
     existing_dates = {r["date"] for r in gdd_records}
     
     sorted_data = sorted(sensor_data, key=lambda x: x["date"])
@@ -319,18 +442,44 @@ def calculate_gdd(sensor_data, base_temp=10.0, shock_threshold=8.0):
             yesterday_gdd = last.get("accumulated_gdd", 0)
             stress_days = last.get("stress_days_remaining", 0)
         
+        use_hours = method == "degree_hour" and record.get("covered_hours", 0) >= MIN_COVERAGE_HOURS
+        
+        imputed = False
+        if not use_hours and not is_valid(record, "outdoor_temp"):
+            previous = [r["outdoor_temp"] for r in gdd_records if r.get("outdoor_temp") is not None]
+            if bad_day_policy == "impute" and previous:
+                outdoor_temp = previous[-1]
+                imputed = True
+            else:
+                gdd_records.append({
+                    "date": date_str,
+                    "outdoor_temp": None,
+                    "daily_gdd": 0,
+                    "accumulated_gdd": round(yesterday_gdd, 2),
+                    "stress_days_remaining": stress_days,
+                    "is_shock": False,
+                    "skipped": True
+                })
+                print(f"  ⏭️  {date_str}: 온도 데이터 불량 → 건너뜀")
+                continue
+        
+        if use_hours:
+            raw_gdd = record["degree_hours"] / record["covered_hours"]
+            is_shock = record["cold_hours"] >= COLD_SHOCK_HOURS
+        else:
+            raw_gdd = max(0, outdoor_temp - base_temp)
+            is_shock = outdoor_temp < shock_threshold
+        
         daily_gdd = 0
-        recovery_penalty = 0.5
         
-        if outdoor_temp < shock_threshold:
+        if is_shock:
             daily_gdd = 0
-            stress_days = 3
+            stress_days = stress_window
         elif stress_days > 0:
-            raw_gdd = max(0, outdoor_temp - base_temp)
             daily_gdd = raw_gdd * recovery_penalty
             stress_days -= 1
         else:
-            daily_gdd = max(0, outdoor_temp - base_temp)
+            daily_gdd = raw_gdd
         
         accumulated_gdd = yesterday_gdd + daily_gdd
         
@@ -340,11 +489,16 @@ def calculate_gdd(sensor_data, base_temp=10.0, shock_threshold=8.0):
             "daily_gdd": round(daily_gdd, 2),
             "accumulated_gdd": round(accumulated_gdd, 2),
             "stress_days_remaining": stress_days,
-            "is_shock": outdoor_temp < shock_threshold
+            "is_shock": is_shock
         }
+        if use_hours:
+            new_record["method"] = "degree_hour"
+            new_record["cold_hours"] = record["cold_hours"]
+        if imputed:
+            new_record["imputed"] = True
         
         gdd_records.append(new_record)
-        print(f"  📈 {date_str}: +{daily_gdd:.2f} → {accumulated_gdd:.2f}")
+        print(f"  📈 {date_str}: +{daily_gdd:.2f} → {accumulated_gdd:.2f}{' (대체값)' if imputed else ''}")
     
     if save_json(GDD_FILE, gdd_records):
         return True
@@ -428,9 +582,22 @@ def main():
         print("❌ Save failed")
         return False
     
-    # GDD 계산
+    # 결측 구간 재수집
+    print("\n🩹 Repairing gaps...")
+    repaired = repair_gaps()
+    if repaired and not merge_sensor_data(repaired):
+        print("❌ Save failed")
+        return False
+    
+    # GDD 계산 (보완된 날이 있으면 그 날부터 재계산)
     print("\n📈 Calculating GDD...")
-    if not calculate_gdd(daily_averages):
+    if repaired:
+        recompute_from = min(r["date"] for r in repaired)
+        gdd_ok = calculate_gdd(load_json(SENSOR_FILE), recompute_from=recompute_from)
+    else:
+        recompute_from = None
+        gdd_ok = calculate_gdd(daily_averages)
+    if not gdd_ok:
         print("❌ GDD failed")
         return False
     
@@ -438,9 +605,51 @@ def main():
     print("\n🌱 Detecting stages...")
     detect_phenology_stage(daily_averages)
     
+    # 연도별 생육 단계 구간 (보관분 포함 전체 GDD + 생육 기록)
+    timeline = update_stage_timeline(read_records("gdd", GDD_FILE), load_json(PHENOLOGY_FILE))
+    print(f"  🗓️  Stage timeline: {len(timeline.intervals())} intervals")
+    
+    # 알림 규칙 평가 (새 샘플만)
+    print("\n🚨 Evaluating alerts...")
+    
+    def stage_of(date_str):
+        return timeline.lookup(date_str)["id"]
+    
+    new_alerts = process_alerts(extract_series(api_data), stage_of)
+    for alert in new_alerts:
+        print(f"  ⚠️  {alert['date']} {alert['time']} {alert['message']} ({alert['value']})")
+    print(f"  {len(new_alerts)} new alerts")
+    
+    # 끝난 시즌 압축 보관 (hot JSON 에는 진행 중인 시즌만)
+    archived = archive_closed_seasons()
+    for dataset, years in archived.items():
+        print(f"🗄️  Archived {dataset}: {', '.join(map(str, years))}")
+    
+    # 이후 단계는 보관분 + hot 전체 기록 사용
+    sensor_history = read_records("sensor", SENSOR_FILE)
+    gdd_records = read_records("gdd", GDD_FILE)
+    
+    # 연도 × 일자 인덱스 증분 갱신
+    new_dates = {r["date"] for r in daily_averages + repaired}
+    changed = update_season_index(
+        daily_averages + repaired,
+        [r for r in gdd_records
+         if r["date"] in new_dates or (recompute_from and r["date"] >= recompute_from)],
+        full_sensor=sensor_history,
+        full_gdd=gdd_records,
+    )
+    print(f"🗂️  Season index: {changed} cells updated")
+    
+    # 예측용 기후값 갱신 (새 데이터가 있을 때만 재계산)
+    load_climatology(sensor_history)
+    
     # 통계
-    sensor_count = len(load_json(SENSOR_FILE))
-    gdd_count = len(load_json(GDD_FILE))
+    sensor_count = len(sensor_history)
+    gdd_count = len(gdd_records)
+    
+    # 앱 첫 화면용 스냅샷
+    print("\n🖼️  Writing dashboard snapshot...")
+    write_snapshot(sensor_history, gdd_records, sensor_file=SENSOR_FILE, gdd_file=GDD_FILE, timeline=timeline)
     
     print("\n" + "="*60)
     print("📊 SUMMARY")
@@ -448,6 +657,7 @@ def main():
     print(f"✅ Sensor records: {sensor_count}")
     print(f"✅ GDD records: {gdd_count}")
     print(f"✅ New data: {len(daily_averages)} days")
+    print(f"✅ Repaired: {len(repaired)} days")
     print("="*60)
     
     return True
@@ -0,0 +1,111 @@
+"""
+대시보드 스냅샷
+- 홈/헤더/사이드바/센서 카드가 쓰는 파생 값을 수집기가 미리 계산해 저장
+- 앱은 첫 화면을 이 파일만으로 그리고, 상세 화면에서만 전체 기록을 로드
+- 생육 단계는 단계 타임라인 조회값을 그대로 저장 (앱/API 가 같은 값을 보여줌)
+- 현재 GDD 와 이정표 진행률은 시즌(1월 1일부터) 누적 기준 (accumulated_gdd 는 해가 바뀌어도 이어짐)
+"""
+
+import os
+import json
+from datetime import datetime
+
+from farm_data import FARM_TZ
+from growth_stage import milestone_progress
+from stage_timeline import StageTimeline
+
+DATA_DIR = "data"
+SENSOR_FILE = os.path.join(DATA_DIR, "sensor_history.json")
+GDD_FILE = os.path.join(DATA_DIR, "gdd_data.json")
+SNAPSHOT_FILE = os.path.join(DATA_DIR, "dashboard_snapshot.json")
+
+SNAPSHOT_SCHEMA = 3
+SERIES_DAYS = 30
+SERIES_FIELDS = ["outdoor_temp", "temp_2dong", "temp_3dong", "moisture_2dong", "moisture_3dong"]
+
+
+def source_signature(paths=(SENSOR_FILE, GDD_FILE)):
+    """원본 파일 크기 (스냅샷이 원본과 맞는지 확인용, git checkout 후에도 유지)"""
+    signature = {}
+    for path in paths:
+        try:
+            signature[os.path.basename(path)] = os.path.getsize(path)
+        except OSError:
+            signature[os.path.basename(path)] = None
+    return signature
+
+
+def build_snapshot(sensor_records, gdd_records, today=None, signature=None, timeline=None):
+    """
+    전체 기록 → 스냅샷 딕셔너리
+    timeline: 수집기가 만든 StageTimeline (없으면 GDD 기록만으로 만듦)
+    """
+    today = today or datetime.now(FARM_TZ).date()
+    timeline = timeline or StageTimeline.build(gdd_records)
+    current_gdd = timeline.season_gdd(today.isoformat())
+
+    latest_sensor = None
+    if sensor_records:
+        latest_sensor = {k: v for k, v in sensor_records[-1].items() if k != "stats"}
+
+    recent = sensor_records[-SERIES_DAYS:]
+    recent_gdd = gdd_records[-SERIES_DAYS:]
+
+    return {
+        "schema": SNAPSHOT_SCHEMA,
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "source": signature if signature is not None else source_signature(),
+        "latest_sensor": latest_sensor,
+        "latest_gdd": gdd_records[-1] if gdd_records else None,
+        "current_gdd": current_gdd,
+        "stage": timeline.lookup(today),
+        "milestones": milestone_progress(current_gdd),
+        "counts": {
+            "sensor": len(sensor_records),
+            "gdd": len(gdd_records),
+        },
+        "series": {
+            "sensor": {
+                "date": [r["date"] for r in recent],
+                **{field: [r.get(field) for r in recent] for field in SERIES_FIELDS},
+            },
+            "gdd": {
+                "date": [r["date"] for r in recent_gdd],
+                "accumulated_gdd": [r.get("accumulated_gdd") for r in recent_gdd],
+                "daily_gdd": [r.get("daily_gdd") for r in recent_gdd],
+            },
+        },
+    }
+
+
+def write_snapshot(sensor_records, gdd_records, filepath=SNAPSHOT_FILE,
+                   sensor_file=SENSOR_FILE, gdd_file=GDD_FILE, timeline=None):
+    """수집기 마지막 단계: 스냅샷 저장"""
+    snapshot = build_snapshot(sensor_records, gdd_records, timeline=timeline,
+                              signature=source_signature((sensor_file, gdd_file)))
+    try:
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        return snapshot
+    except OSError as e:
+        print(f"❌ Save error: {e}")
+        return None
+
+
+def load_snapshot(filepath=SNAPSHOT_FILE, sensor_file=SENSOR_FILE, gdd_file=GDD_FILE):
+    """
+    저장된 스냅샷 로드
+    스키마가 다르거나 원본 파일이 그 뒤에 바뀌었으면 None
+    """
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if snapshot.get("schema") != SNAPSHOT_SCHEMA:
+        return None
+    if snapshot.get("source") != source_signature((sensor_file, gdd_file)):
+        return None
+    return snapshot
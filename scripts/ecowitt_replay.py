@@ -0,0 +1,379 @@
+"""
+ECOWITT API 대역 (녹화/재생)
+- record: 실제 device/history 응답을 기간별 파일로 저장 (수집기 ECOWITT_RECORD_DIR 와 같은 형식)
+- serve: 녹화 파일 또는 합성 데이터를 같은 응답 형식으로 돌려주는 로컬 서버
+  (지연, 오류 비율, 샘플 간격(= 응답 크기) 설정, 같은 시드면 같은 응답)
+- bench: 서버를 띄우고 수집기 전체 과정 측정 (여러 해 백필 + 일일 실행)
+
+수집기는 ECOWITT_BASE_URL 로 이 서버를 가리킵니다:
+    python scripts/ecowitt_replay.py serve --port 8090 --latency 200
+    ECOWITT_BASE_URL=http://127.0.0.1:8090 ECOWITT_APP_KEY=x ECOWITT_API_KEY=x ECOWITT_MAC=x \\
+        python scripts/collect_daily_data.py
+
+사용법:
+    python scripts/ecowitt_replay.py record 2025-01-01 2025-12-31 --dir recordings
+    python scripts/ecowitt_replay.py serve --source recordings
+    python scripts/ecowitt_replay.py bench --years 3 --runs 3 --latency 100 --error-rate 0.05
+"""
+
+import os
+import json
+import glob
+import time
+import random
+import shutil
+import tempfile
+import argparse
+import threading
+import contextlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from synthetic_data import SAMPLE_SECONDS, synthetic_api_data
+
+HISTORY_PATH = "/api/v3/device/history"
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+ERROR_KINDS = ["http", "api"]   # HTTP 503 / 응답 code != 0
+
+
+# ============================================================
+# 샘플 원본
+# ============================================================
+def _as_series(unit, values):
+    """{시각 문자열: 값} → (단위, 정렬된 시각 배열, 값 목록)"""
+    items = sorted((int(t), v) for t, v in values.items())
+    return unit, np.array([t for t, _ in items], dtype=np.int64), [v for _, v in items]
+
+
+def _slice(series, start, end, payload):
+    """채널별 [start, end] 구간을 응답 형식으로 payload 에 추가"""
+    for (source, measure), (unit, ts, values) in series.items():
+        lo, hi = np.searchsorted(ts, start, "left"), np.searchsorted(ts, end, "right")
+        if hi <= lo:
+            continue
+        body = payload.setdefault(source, {}).setdefault(measure, {"unit": unit, "list": {}})
+        body["list"].update(zip(map(str, ts[lo:hi].tolist()), values[lo:hi]))
+    return payload
+
+
+class RecordedSamples:
+    """녹화 파일들의 샘플을 채널별로 합쳐 두고 요청 구간만 잘라 응답"""
+
+    def __init__(self, directory):
+        merged, units = {}, {}
+        self.files = sorted(glob.glob(os.path.join(directory, "history_*.json")))
+        for path in self.files:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)["response"].get("data") or {}
+            for source, measures in data.items():
+                for measure, body in measures.items():
+                    if isinstance(body, dict) and "list" in body:
+                        units[(source, measure)] = body.get("unit", "")
+                        merged.setdefault((source, measure), {}).update(body["list"])
+        self.series = {key: _as_series(units[key], values) for key, values in merged.items()}
+
+    def window(self, start, end):
+        return _slice(self.series, start, end, {})
+
+    def describe(self):
+        return f"녹화 {len(self.files)}개 파일"
+
+
+class SyntheticSamples:
+    """연도별로 한 번 만든 합성 샘플 (같은 시드/간격이면 어떤 구간으로 요청해도 같은 값)"""
+
+    def __init__(self, seed=0, interval=SAMPLE_SECONDS):
+        self.seed = seed
+        self.interval = interval
+        self._years = {}
+        self._lock = threading.Lock()
+
+    def _year(self, year):
+        with self._lock:
+            if year not in self._years:
+                start = datetime(year, 1, 1)
+                days = (datetime(year + 1, 1, 1) - start).days
+                payload = synthetic_api_data(start, days, seed=self.seed + year, interval=self.interval)
+                self._years[year] = {
+                    (source, measure): _as_series(body["unit"], body["list"])
+                    for source, measures in payload.items() for measure, body in measures.items()
+                }
+            return self._years[year]
+
+    def window(self, start, end):
+        end = min(end, int(time.time()))   # 실제 API 처럼 미래 샘플은 없음
+        payload = {}
+        if end < start:
+            return payload
+        for year in range(datetime.fromtimestamp(start).year, datetime.fromtimestamp(end).year + 1):
+            _slice(self._year(year), start, end, payload)
+        return payload
+
+    def describe(self):
+        return f"합성 데이터 ({self.interval}초 간격, seed={self.seed})"
+
+
+# ============================================================
+# 재생 서버
+# ============================================================
+def make_handler(samples, latency=0.0, jitter=0.0, error_rate=0.0, seed=0, stats=None):
+    """
+    latency/jitter: 응답 지연 (초, 고정 + 균등 분포)
+    error_rate: 요청 중 오류로 응답할 비율 (HTTP 503 또는 API 오류 코드)
+    """
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    stats = stats if stats is not None else {}
+    stats.update(requests=0, errors=0, bytes=0)
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "EcowittReplay/1.0"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body):
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            with lock:
+                stats["bytes"] += len(payload)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.rstrip("/") != HISTORY_PATH:
+                return self._send(404, {"code": 404, "msg": "not found"})
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+            # 난수는 요청 순서대로 뽑음 → 같은 시드/요청 순서면 같은 지연과 오류
+            with lock:
+                stats["requests"] += 1
+                delay = latency + rng.uniform(0, jitter)
+                failure = rng.choice(ERROR_KINDS) if rng.random() < error_rate else None
+                if failure:
+                    stats["errors"] += 1
+            time.sleep(delay)
+
+            if failure == "http":
+                return self._send(503, {"code": 503, "msg": "replay: service unavailable"})
+            if failure == "api":
+                return self._send(200, {"code": -1, "msg": "replay: injected error", "data": []})
+
+            try:
+                start = int(datetime.strptime(query["start_date"], TIME_FORMAT).timestamp())
+                end = int(datetime.strptime(query["end_date"], TIME_FORMAT).timestamp())
+            except (KeyError, ValueError):
+                return self._send(200, {"code": 40000, "msg": "invalid start_date/end_date", "data": []})
+
+            self._send(200, {
+                "code": 0,
+                "msg": "success",
+                "time": str(int(time.time())),
+                "data": samples.window(start, end) or [],
+            })
+
+    return Handler
+
+
+def start_server(samples, host="127.0.0.1", port=0, **options):
+    """백그라운드 스레드로 서버 시작 → (server, base_url, stats)"""
+    stats = {}
+    server = ThreadingHTTPServer((host, port), make_handler(samples, stats=stats, **options))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}", stats
+
+
+def load_samples(source, seed=0, interval=SAMPLE_SECONDS):
+    if source == "synthetic":
+        return SyntheticSamples(seed, interval)
+    return RecordedSamples(source)
+
+
+# ============================================================
+# 파이프라인 측정
+# ============================================================
+def _windows(start, end, max_days):
+    day = start
+    while day <= end:
+        last = min(day + timedelta(days=max_days - 1), end)
+        yield day, last
+        day = last + timedelta(days=1)
+
+
+def run_backfill(collector, start, end):
+    """수집기 함수로 start~end 백필 (MAX_FETCH_DAYS 단위 요청) → 단계별 시간"""
+    seconds = dict.fromkeys(["fetch", "parse", "merge", "gdd", "phenology"], 0.0)
+    records, failed = [], 0
+
+    def timed(step, func, *args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds[step] += time.perf_counter() - started
+        return result
+
+    windows = list(_windows(start, end, collector.MAX_FETCH_DAYS))
+    for first, last in windows:
+        api_data = timed("fetch", collector.get_history_data,
+                         f"{first:%Y-%m-%d} 00:00:00", f"{last:%Y-%m-%d} 23:59:59")
+        if not api_data:
+            failed += 1
+            continue
+        records += timed("parse", collector.parse_history_data, api_data) or []
+
+    timed("merge", collector.merge_sensor_data, records)
+    timed("gdd", collector.calculate_gdd, collector.load_json(collector.SENSOR_FILE))
+    timed("phenology", collector.detect_phenology_stage, None)
+    return {
+        "requests": len(windows),
+        "failed_requests": failed,
+        "days": len(records),
+        "seconds": {step: round(value, 3) for step, value in seconds.items()},
+        "total_seconds": round(sum(seconds.values()), 3),
+    }
+
+
+def run_bench(args):
+    import collect_daily_data as collector
+
+    samples = load_samples(args.source, args.seed, args.interval)
+    server, base_url, stats = start_server(samples, latency=args.latency / 1000, jitter=args.jitter / 1000,
+                                           error_rate=args.error_rate, seed=args.seed)
+    collector.ECOWITT_BASE_URL = base_url
+    collector.ECOWITT_APP_KEY = collector.ECOWITT_API_KEY = collector.ECOWITT_MAC = "replay"
+    print(f"🔁 재생 서버 {base_url} ({samples.describe()})")
+
+    data_dir = os.path.abspath(args.data_dir) if args.data_dir else tempfile.mkdtemp(prefix="kiwi-bench-")
+    os.makedirs(os.path.join(data_dir, "data"), exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(data_dir)
+    devnull = open(os.devnull, "w")
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull)
+    try:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        with quiet:
+            backfill = run_backfill(collector, today.replace(year=today.year - args.years + 1, month=1, day=1),
+                                    today - timedelta(days=1))
+        served = dict(stats)
+        print(f"📥 백필 {backfill['days']}일: {backfill['total_seconds']:.2f}s "
+              f"(요청 {backfill['requests']}, 실패 {backfill['failed_requests']}, {served['bytes'] / 1e6:.1f}MB)")
+        print("   " + ", ".join(f"{k} {v:.2f}s" for k, v in backfill["seconds"].items()))
+
+        runs = []
+        for i in range(args.runs):
+            before = dict(stats)
+            started = time.perf_counter()
+            with quiet:
+                ok = collector.main()
+            runs.append({
+                "ok": bool(ok),
+                "seconds": round(time.perf_counter() - started, 3),
+                "requests": stats["requests"] - before["requests"],
+                "bytes": stats["bytes"] - before["bytes"],
+            })
+            print(f"📅 일일 실행 {i + 1}: {runs[-1]['seconds']:.2f}s "
+                  f"(요청 {runs[-1]['requests']}, {'성공' if ok else '실패'})")
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+        server.server_close()
+        devnull.close()
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    result = {
+        "source": samples.describe(),
+        "years": args.years,
+        "latency_ms": args.latency,
+        "jitter_ms": args.jitter,
+        "error_rate": args.error_rate,
+        "backfill": backfill,
+        "daily_runs": runs,
+        "server": dict(stats),
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"💾 {args.json}")
+    return all(r["ok"] for r in runs)
+
+
+# ============================================================
+# 녹화 / 실행
+# ============================================================
+def run_record(args):
+    """실제 API 를 기간별로 호출해 응답 저장 (ECOWITT_* 환경변수 필요)"""
+    import collect_daily_data as collector
+
+    if not all([collector.ECOWITT_APP_KEY, collector.ECOWITT_API_KEY, collector.ECOWITT_MAC]):
+        print("❌ API credentials missing")
+        return False
+    collector.ECOWITT_RECORD_DIR = args.dir
+    start = datetime.strptime(args.start, "%Y-%m-%d")
+    end = datetime.strptime(args.end, "%Y-%m-%d")
+    saved = 0
+    for first, last in _windows(start, end, collector.MAX_FETCH_DAYS):
+        if collector.get_history_data(f"{first:%Y-%m-%d} 00:00:00", f"{last:%Y-%m-%d} 23:59:59"):
+            saved += 1
+        time.sleep(args.pause)
+    print(f"💾 {saved}개 응답 저장 → {args.dir}")
+    return saved > 0
+
+
+def run_serve(args):
+    samples = load_samples(args.source, args.seed, args.interval)
+    options = dict(latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate, seed=args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(samples, **options))
+    print(f"🔁 ECOWITT 재생 서버: http://{args.host}:{args.port}{HISTORY_PATH} ({samples.describe()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ECOWITT API 녹화/재생")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="실제 응답 녹화")
+    record.add_argument("start", help="시작일 (YYYY-MM-DD)")
+    record.add_argument("end", help="종료일 (YYYY-MM-DD)")
+    record.add_argument("--dir", default="recordings", help="저장 폴더")
+    record.add_argument("--pause", type=float, default=1.0, help="요청 간격 (초)")
+
+    for name, help_text in [("serve", "재생 서버 실행"), ("bench", "수집기 파이프라인 측정")]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--source", default="synthetic", help="녹화 폴더 또는 synthetic")
+        p.add_argument("--interval", type=int, default=SAMPLE_SECONDS, help="합성 샘플 간격 (초, 작을수록 응답이 큼)")
+        p.add_argument("--latency", type=float, default=0.0, help="응답 지연 (ms)")
+        p.add_argument("--jitter", type=float, default=0.0, help="추가 지연 최대값 (ms, 균등 분포)")
+        p.add_argument("--error-rate", type=float, default=0.0, help="오류 응답 비율 (0~1)")
+        p.add_argument("--seed", type=int, default=0)
+
+    serve = sub.choices["serve"]
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8090)
+
+    bench = sub.choices["bench"]
+    bench.add_argument("--years", type=int, default=2, help="백필 연수")
+    bench.add_argument("--runs", type=int, default=3, help="백필 후 일일 실행 횟수")
+    bench.add_argument("--data-dir", help="데이터 폴더 (기본: 임시 폴더, 실행 후 삭제)")
+    bench.add_argument("--json", help="결과를 JSON 파일로 저장")
+    bench.add_argument("--verbose", action="store_true", help="수집기 출력 표시")
+
+    args = parser.parse_args()
+    if getattr(args, "json", None):
+        args.json = os.path.abspath(args.json)
+    return {"record": run_record, "serve": run_serve, "bench": run_bench}[args.command](args)
+
+
+if __name__ == "__main__":
+    exit(0 if main() else 1)
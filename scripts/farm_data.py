@@ -0,0 +1,250 @@
+"""
+농장 데이터 공통 유틸리티
+- 농장 현지 시간대
+- 데이터 버전 토큰 (캐시 키)
+- 프로세스 공용 컬럼 테이블 (모든 세션이 같은 배열을 읽음)
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections.abc import Mapping
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+# 농장 현지 시간대 (GitHub Actions 러너/앱 서버는 UTC 일 수 있음)
+FARM_TZ = ZoneInfo(os.environ.get("FARM_TZ", "Asia/Seoul"))
+
+
+def data_version(paths):
+    """
+    파일 크기/수정 시각 기반 데이터 버전 토큰
+    파일이 바뀔 때만 값이 달라지므로 캐시 키로 사용합니다.
+    """
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}")
+        except OSError:
+            parts.append(f"{path}:-")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+# ============================================================
+# 공용 컬럼 테이블
+# ============================================================
+class RecordView(Mapping):
+    """ColumnTable 한 행을 딕셔너리처럼 읽는 뷰 (값 복사 없음)"""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key):
+        if not self._table.has(key, self._row):
+            raise KeyError(key)
+        return self._table.value(key, self._row)
+
+    def __iter__(self):
+        return (key for key in self._table.columns if self._table.has(key, self._row))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class ColumnTable:
+    """
+    기록 목록 → 필드별 연속 NumPy 배열 (읽기 전용)
+    숫자는 float64(None → NaN), 문자열은 고정 폭 배열, 중첩 값만 object 배열
+    absent: 키가 없던 행 마스크, nulls: 문자열 필드의 None 마스크 ("" 와 구분) — 필요한 필드만
+    """
+
+    def __init__(self, columns, kinds, absent=None, nulls=None):
+        self.columns = columns
+        self.kinds = kinds
+        self.absent = absent or {}
+        self.nulls = nulls or {}
+        self._len = len(next(iter(columns.values()))) if columns else 0
+
+    @classmethod
+    def from_records(cls, records):
+        fields = list(dict.fromkeys(key for record in records for key in record))
+        columns, kinds, absent, nulls = {}, {}, {}, {}
+        for field in fields:
+            values = [record.get(field) for record in records]
+            missing = np.array([field not in record for record in records], dtype=bool)
+            if missing.any():
+                absent[field] = _readonly(missing)
+            present = [v for v in values if v is not None]
+            if all(isinstance(v, bool) for v in present):
+                kind = "bool"
+            elif all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+                kind = "int"
+            elif all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+                kind = "float"
+            elif all(isinstance(v, str) for v in present):
+                kind = "str"
+            else:
+                kind = "object"
+
+            if kind in ("bool", "int", "float"):
+                array = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            elif kind == "str":
+                array = np.array(["" if v is None else v for v in values], dtype=str)
+                nulls[field] = _readonly(np.array([v is None for v in values], dtype=bool))
+            else:
+                array = np.empty(len(values), dtype=object)
+                array[:] = values
+            array.setflags(write=False)
+            columns[field], kinds[field] = array, kind
+        return cls(columns, kinds, absent, nulls)
+
+    @classmethod
+    def concat(cls, tables):
+        """여러 테이블을 행 방향으로 이어 붙임 (필드/종류가 다르면 맞춰서)"""
+        tables = [t for t in tables if len(t)]
+        if len(tables) == 1:
+            return tables[0]
+        fields = list(dict.fromkeys(f for t in tables for f in t.columns))
+        columns, kinds, absent, nulls = {}, {}, {}, {}
+        for field in fields:
+            found = {t.kinds[field] for t in tables if field in t.kinds}
+            if len(found) == 1:
+                kind = found.pop()
+            elif found <= {"bool", "int", "float"}:
+                kind = "float"
+            else:
+                kind = "object"
+
+            parts = []
+            for t in tables:
+                if kind == "object":
+                    part = np.empty(len(t), dtype=object)
+                    if field in t.columns:
+                        part[:] = [t.value(field, i) for i in range(len(t))]
+                elif field in t.columns:
+                    part = t.columns[field]
+                else:
+                    part = np.full(len(t), "" if kind == "str" else np.nan)
+                parts.append(part)
+            array = np.concatenate(parts)
+            array.setflags(write=False)
+            columns[field], kinds[field] = array, kind
+
+            missing = np.concatenate([t.absent.get(field, np.zeros(len(t), dtype=bool)) if field in t.columns
+                                      else np.ones(len(t), dtype=bool) for t in tables])
+            if missing.any():
+                absent[field] = _readonly(missing)
+            if kind == "str":
+                nulls[field] = _readonly(np.concatenate([t.nulls.get(field, np.zeros(len(t), dtype=bool))
+                                                         for t in tables]))
+        return cls(columns, kinds, absent, nulls)
+
+    @classmethod
+    def from_file(cls, filepath):
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError):
+            records = []
+        return cls.from_records(records if isinstance(records, list) else [])
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return (RecordView(self, i) for i in range(self._len))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ColumnTable({k: v[index] for k, v in self.columns.items()}, self.kinds,
+                               {k: v[index] for k, v in self.absent.items()},
+                               {k: v[index] for k, v in self.nulls.items()})
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError(index)
+        return RecordView(self, index)
+
+    def has(self, field, row):
+        """그 행의 기록에 키가 있었는지"""
+        return field in self.columns and not (field in self.absent and self.absent[field][row])
+
+    def value(self, field, row):
+        """한 칸을 원래 파이썬 값으로 (결측은 None)"""
+        value = self.columns[field][row]
+        kind = self.kinds[field]
+        if kind == "str":
+            return None if field in self.nulls and self.nulls[field][row] else str(value)
+        if kind == "object":
+            return value
+        if np.isnan(value):
+            return None
+        return bool(value) if kind == "bool" else int(value) if kind == "int" else float(value)
+
+    def column(self, field):
+        """필드 배열 (없는 필드는 NaN)"""
+        if field in self.columns:
+            return self.columns[field]
+        return np.full(self._len, np.nan)
+
+    def to_frame(self, fields=None):
+        fields = fields or [f for f, kind in self.kinds.items() if kind != "object"]
+        return pd.DataFrame({f: self.column(f) for f in fields})
+
+    @property
+    def nbytes(self):
+        masks = list(self.absent.values()) + list(self.nulls.values())
+        return sum(array.nbytes for array in list(self.columns.values()) + masks)
+
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+
+class SharedTables:
+    """
+    프로세스 공용 테이블 묶음
+    파일 버전이 바뀌면 새 테이블을 만든 뒤 참조만 교체 (읽는 쪽은 잠금 없음)
+    """
+
+    def __init__(self, files, loader=None):
+        """
+        files: 이름 → 파일 경로 (또는 버전 확인용 경로 목록, 첫 번째가 기록 파일)
+        loader: 이름 → ColumnTable (기본: 첫 경로의 JSON)
+        """
+        self.files = {name: [paths] if isinstance(paths, str) else list(paths) for name, paths in files.items()}
+        self.loader = loader or (lambda name: ColumnTable.from_file(self.files[name][0]))
+        self._lock = threading.Lock()
+        self._tables = {}
+
+    def get(self, name):
+        version = data_version(self.files[name])
+        entry = self._tables.get(name)
+        if entry and entry[0] == version:
+            return entry[1]
+        with self._lock:
+            entry = self._tables.get(name)
+            if entry and entry[0] == version:
+                return entry[1]
+            table = self.loader(name)
+            self._tables = {**self._tables, name: (version, table)}
+            return table
+
+    def versions(self):
+        return {name: entry[0] for name, entry in self._tables.items()}
+
+    @property
+    def nbytes(self):
+        """지금 올라와 있는 테이블 크기 (새로 읽지 않음)"""
+        return sum(entry[1].nbytes for entry in self._tables.values())
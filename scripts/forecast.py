@@ -0,0 +1,211 @@
+"""
+발아/개화 확률 예측 (몬테카를로)
+- 저장된 모든 시즌으로 연중 일자별 기후값(평균/표준편차) 생성 → 파일 캐시
+- 현재 누적 GDD에서 수천 개의 미래 기온 궤적을 NumPy로 시뮬레이션
+- 이정표별 도달 날짜 분위수 반환
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from gdd_engine import DAYS_PER_YEAR, DEFAULT_PARAMS, MILESTONE_GDD, accumulate_gdd
+from sensor_stats import is_valid
+
+DATA_DIR = "data"
+CLIMATOLOGY_FILE = os.path.join(DATA_DIR, "climatology.json")
+
+# 관측이 부족한 날짜에 쓰는 기본 기후 (남부 키위 산지 평년 근사)
+PRIOR_ANNUAL_MEAN = 14.5
+PRIOR_AMPLITUDE = 11.0
+PRIOR_COLDEST_DOY = 20
+PRIOR_STD = 3.0
+PRIOR_WEIGHT = 10        # 기본값을 관측 몇 일치로 볼지
+SMOOTH_WINDOW = 7        # 일자별 평균 평활 반경 (±일)
+DEFAULT_AR1 = 0.7        # 기온 편차 자기상관
+
+QUANTILES = (0.1, 0.5, 0.9)
+
+
+def _temperature_samples(sensor_records):
+    """(연도, 연중 일자 인덱스, 기온) 목록"""
+    samples = []
+    for record in sensor_records:
+        if not is_valid(record, "outdoor_temp"):
+            continue
+        value = record["outdoor_temp"]
+        date_obj = datetime.strptime(record["date"], "%Y-%m-%d")
+        samples.append((date_obj.year, date_obj.timetuple().tm_yday - 1, float(value)))
+    return samples
+
+
+def source_fingerprint(sensor_records):
+    """기후값 재계산 여부를 판단하는 내용 기반 지문"""
+    digest = hashlib.sha1()
+    for year, doy, value in _temperature_samples(sensor_records):
+        digest.update(f"{year}-{doy}:{value};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def build_climatology(sensor_records):
+    """연중 일자별 기온 평균/표준편차 (기본 기후와 가중 혼합)"""
+    samples = _temperature_samples(sensor_records)
+    doy_axis = np.arange(DAYS_PER_YEAR)
+    prior_mean = PRIOR_ANNUAL_MEAN - PRIOR_AMPLITUDE * np.cos(2 * np.pi * (doy_axis - PRIOR_COLDEST_DOY) / 365)
+
+    count = np.zeros(DAYS_PER_YEAR)
+    total = np.zeros(DAYS_PER_YEAR)
+    total_sq = np.zeros(DAYS_PER_YEAR)
+    if samples:
+        _, doys, values = map(np.array, zip(*samples))
+        np.add.at(count, doys, 1)
+        np.add.at(total, doys, values)
+        np.add.at(total_sq, doys, values ** 2)
+
+    # 원형 평활 (연말-연초 연결)
+    kernel = np.ones(2 * SMOOTH_WINDOW + 1)
+
+    def smooth(x):
+        padded = np.concatenate([x[-SMOOTH_WINDOW:], x, x[:SMOOTH_WINDOW]])
+        return np.convolve(padded, kernel, mode="valid")
+
+    n = smooth(count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        obs_mean = np.where(n > 0, smooth(total) / n, prior_mean)
+        obs_var = np.where(n > 1, smooth(total_sq) / n - obs_mean ** 2, PRIOR_STD ** 2)
+    obs_std = np.sqrt(np.maximum(obs_var, 0.5 ** 2))
+
+    weight = n / (n + PRIOR_WEIGHT)
+    mean = weight * obs_mean + (1 - weight) * prior_mean
+    std = weight * obs_std + (1 - weight) * PRIOR_STD
+
+    # 연속한 날짜의 편차로 자기상관 추정
+    ar1 = DEFAULT_AR1
+    if samples:
+        by_key = {(y, d): v for y, d, v in samples}
+        pairs = [
+            (v - mean[d], by_key[(y, d + 1)] - mean[d + 1])
+            for (y, d), v in by_key.items()
+            if (y, d + 1) in by_key
+        ]
+        if len(pairs) >= 30:
+            a, b = np.array(pairs).T
+            if a.std() > 0 and b.std() > 0:
+                ar1 = float(np.clip(np.corrcoef(a, b)[0, 1], 0.0, 0.95))
+
+    return {
+        "source": source_fingerprint(sensor_records),
+        "built_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "n_samples": len(samples),
+        "ar1": round(ar1, 4),
+        "mean": np.round(mean, 3).tolist(),
+        "std": np.round(std, 3).tolist(),
+        "count": count.astype(int).tolist(),
+    }
+
+
+def load_climatology(sensor_records, filepath=CLIMATOLOGY_FILE):
+    """캐시된 기후값 로드 (데이터가 바뀐 경우에만 재계산/저장)"""
+    fingerprint = source_fingerprint(sensor_records)
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("source") == fingerprint:
+            return cached
+    except (OSError, ValueError):
+        pass
+
+    climatology = build_climatology(sensor_records)
+    try:
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(climatology, f, ensure_ascii=False)
+    except OSError:
+        pass
+    return climatology
+
+
+def simulate_temperatures(climatology, start_doy, n_days, n_sims=2000, seed=None):
+    """AR(1) 편차를 갖는 미래 일평균 기온 궤적 (n_sims × n_days)"""
+    rng = np.random.default_rng(seed)
+    mean = np.asarray(climatology["mean"])
+    std = np.asarray(climatology["std"])
+    phi = climatology.get("ar1", DEFAULT_AR1)
+
+    doys = (start_doy + np.arange(n_days)) % 365
+    shocks = rng.standard_normal((n_sims, n_days))
+    z = np.empty_like(shocks)
+    z[:, 0] = shocks[:, 0]
+    scale = np.sqrt(1 - phi ** 2)
+    for d in range(1, n_days):
+        z[:, d] = phi * z[:, d - 1] + scale * shocks[:, d]
+
+    return mean[doys] + std[doys] * z
+
+
+def season_to_date_gdd(gdd_records, year):
+    """해당 연도 1월 1일부터의 누적 GDD (기록 끝에서부터 그 해 daily_gdd 합)"""
+    total = 0.0
+    for i in range(len(gdd_records) - 1, -1, -1):
+        record = gdd_records[i]
+        if not record["date"].startswith(f"{year}-"):
+            break
+        total += record.get("daily_gdd") or 0
+    return round(total, 2)
+
+
+def forecast_milestones(sensor_records, gdd_records, climatology=None, params=None,
+                        n_sims=2000, horizon=300, seed=None, milestones=None):
+    """
+    이정표별 도달 날짜 분위수 예측
+    milestones: {이름: 시즌(1월 1일부터) 누적 GDD} (기본: 발아/개화)
+                accumulated_gdd 기준 값을 넘기면 두 번째 시즌부터 도달하지 못함
+    반환: {이정표: {"gdd", "dates": {분위수: 날짜}, "probability"}}
+    """
+    if not gdd_records:
+        return {}
+
+    params = params or DEFAULT_PARAMS
+    climatology = climatology or load_climatology(sensor_records)
+
+    last = gdd_records[-1]
+    stress_days = last.get("stress_days_remaining", 0)
+    start_date = datetime.strptime(last["date"], "%Y-%m-%d") + timedelta(days=1)
+    start_doy = start_date.timetuple().tm_yday - 1
+    # accumulated_gdd 는 해가 바뀌어도 이어지므로 이정표는 시즌(1월 1일부터) 누적으로 비교
+    current_gdd = season_to_date_gdd(gdd_records, start_date.year)
+
+    pending = {m: g for m, g in (milestones or MILESTONE_GDD).items() if current_gdd < g}
+    if not pending:
+        return {}
+
+    temps = simulate_temperatures(climatology, start_doy, horizon, n_sims=n_sims, seed=seed)
+    names = sorted(pending, key=pending.get)
+    crossing = accumulate_gdd(
+        temps,
+        base_temp=params["base_temp"],
+        shock_threshold=params["shock_threshold"],
+        recovery_penalty=params["recovery_penalty"],
+        stress_window=params["stress_window"],
+        initial_gdd=current_gdd,
+        initial_stress=stress_days,
+        thresholds=[pending[m] for m in names],
+    )
+
+    results = {}
+    for k, milestone in enumerate(names):
+        reached = crossing[k][crossing[k] >= 0]
+        entry = {
+            "gdd": pending[milestone],
+            "probability": round(len(reached) / n_sims, 3),
+            "dates": {},
+        }
+        if len(reached):
+            for q, day in zip(QUANTILES, np.quantile(reached, QUANTILES)):
+                entry["dates"][q] = (start_date + timedelta(days=int(round(day)))).date()
+        results[milestone] = entry
+
+    return results
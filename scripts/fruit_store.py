@@ -0,0 +1,416 @@
+"""
+과실 측정 데이터 저장소
+- 캘리퍼/저울 CSV 일괄 가져오기 (단위 변환, 이상값, 중복 검사를 벡터 연산으로)
+- 컬럼 단위 세그먼트(컬럼별 .npy, 과실 ID·날짜 정렬) + manifest 인덱스: 가져올 때마다 세그먼트 추가
+- manifest 에 세그먼트별 과실 행 범위 저장 → 과실 ID / 동 조회는 해당 행만 메모리 매핑으로 읽음
+
+사용법:
+    python scripts/fruit_store.py import measurements.csv
+    python scripts/fruit_store.py compact
+"""
+
+import os
+import re
+import io
+import json
+import shutil
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = "data"
+FRUIT_STORE_DIR = os.path.join(DATA_DIR, "fruit_store")
+MANIFEST_NAME = "manifest.json"
+
+VALUE_COLUMNS = ["transverse_mm", "longitudinal_mm", "weight_g"]
+COLUMNS = ["fruit_id", "house", "date"] + VALUE_COLUMNS
+
+# CSV 헤더 별칭 (소문자, 공백 제거 후 비교)
+COLUMN_ALIASES = {
+    "fruit_id": ["fruit_id", "fruitid", "fruit", "id", "tag", "과실id", "과실번호", "번호"],
+    "date": ["date", "날짜", "측정일"],
+    "house": ["house", "동", "하우스"],
+    "transverse": ["transverse", "transverse_diameter", "width", "횡경"],
+    "longitudinal": ["longitudinal", "length", "종경"],
+    "weight": ["weight", "무게", "중량"],
+}
+UNIT_FACTORS = {"mm": 1.0, "cm": 10.0, "g": 1.0, "kg": 1000.0}
+# 단위 표기가 없으면 쓰는 단위 (크기는 mm/cm 값 범위가 겹쳐 추정할 수 없으므로 표기 필수)
+DEFAULT_UNITS = {"weight": "g"}
+
+# 물리적으로 가능한 범위 (변환 후)
+LIMITS = {
+    "transverse_mm": (5.0, 120.0),
+    "longitudinal_mm": (5.0, 150.0),
+    "weight_g": (1.0, 400.0),
+}
+OUTLIER_Z = 6.0            # 같은 날·같은 동 기준 robust z 점수
+OUTLIER_MIN_GROUP = 10
+
+
+def _segment_fruits(seg):
+    """세그먼트에 든 과실 ID (이전 형식은 fruit_ids 목록)"""
+    return seg["fruit_rows"] if "fruit_rows" in seg else seg["fruit_ids"]
+
+
+# ============================================================
+# CSV 정규화 / 검증
+# ============================================================
+def _parse_header(name):
+    """헤더 → (표준 이름, 단위)  예: '횡경(cm)' → ('transverse', 'cm')"""
+    text = re.sub(r"\s+", "", str(name).strip().lower())
+    # 별칭 전체가 먼저 ('tag' 의 끝 g 를 단위로 읽지 않도록)
+    candidates = [(text, None)]
+    match = re.match(r"^(.+?)[_\(\[]*(mm|cm|kg|g)[\)\]]*$", text)
+    if match:
+        candidates.append((match.group(1), match.group(2)))
+    for base, unit in candidates:
+        for canonical, aliases in COLUMN_ALIASES.items():
+            if base in aliases:
+                return canonical, unit
+    return None, None
+
+
+def _normalize_house(values):
+    """'2', '2동', 'house 2' → '2동' (빈 칸은 NaN → 검증에서 거부)"""
+    text = values.astype(str).str.strip().where(values.notna(), "")
+    digits = text.str.extract(r"(\d+)", expand=False)
+    house = pd.Series(np.where(digits.notna(), digits.fillna("") + "동", text), index=values.index)
+    return house.replace("", np.nan)
+
+
+def normalize_frame(raw):
+    """CSV DataFrame → 표준 컬럼 (단위 변환 포함)"""
+    frame = pd.DataFrame(index=raw.index)
+    units = {}
+    for column in raw.columns:
+        canonical, unit = _parse_header(column)
+        if canonical and canonical not in frame:
+            frame[canonical] = raw[column]
+            units[canonical] = unit
+
+    missing = [c for c in ("fruit_id", "date") if c not in frame]
+    if missing:
+        raise ValueError(f"필수 컬럼 없음: {', '.join(missing)}")
+    no_unit = [c for c in ("transverse", "longitudinal", "weight") if c in frame and not units[c] and c not in DEFAULT_UNITS]
+    if no_unit:
+        raise ValueError(f"단위 표기 필요: {', '.join(no_unit)} (예: 횡경(mm), 횡경(cm))")
+
+    out = pd.DataFrame({
+        "fruit_id": frame["fruit_id"].astype(str).str.strip(),
+        "house": _normalize_house(frame["house"]) if "house" in frame else "",
+        "date": pd.to_datetime(frame["date"], errors="coerce").dt.normalize(),
+    })
+
+    for name, target in (("transverse", "transverse_mm"), ("longitudinal", "longitudinal_mm"), ("weight", "weight_g")):
+        if name not in frame:
+            out[target] = np.nan
+            continue
+        values = pd.to_numeric(frame[name], errors="coerce").astype(float)
+        unit = units.get(name) or DEFAULT_UNITS[name]
+        out[target] = values * UNIT_FACTORS[unit]
+
+    return out
+
+
+def validate(frame):
+    """
+    벡터화 검증 → (통과한 행, 거부 사유별 개수)
+    - 날짜/ID/동 누락, 측정값 없음, 물리적 범위 이탈, 같은 날·같은 동 대비 이상값
+    """
+    reasons = pd.Series("", index=frame.index)
+
+    reasons[frame["date"].isna()] = "bad_date"
+    reasons[(reasons == "") & (frame["fruit_id"].isin(["", "nan"]))] = "bad_fruit_id"
+    reasons[(reasons == "") & frame["house"].isna()] = "bad_house"
+    reasons[(reasons == "") & frame[VALUE_COLUMNS].isna().all(axis=1)] = "no_values"
+
+    for column, (lo, hi) in LIMITS.items():
+        values = frame[column]
+        out_of_range = values.notna() & ((values < lo) | (values > hi))
+        reasons[(reasons == "") & out_of_range] = "out_of_range"
+
+    group = frame.groupby([frame["date"], frame["house"]])
+    for column in ("transverse_mm", "weight_g"):
+        median = group[column].transform("median")
+        mad = (frame[column] - median).abs().groupby([frame["date"], frame["house"]]).transform("median")
+        size = group[column].transform("count")
+        z = (frame[column] - median).abs() / (1.4826 * mad.replace(0, np.nan))
+        reasons[(reasons == "") & (size >= OUTLIER_MIN_GROUP) & (z > OUTLIER_Z)] = "outlier"
+
+    rejected = reasons[reasons != ""].value_counts().to_dict()
+    return frame[reasons == ""], rejected
+
+
+# ============================================================
+# 저장소
+# ============================================================
+class FruitStore:
+    """세그먼트(컬럼별 .npy) 기반 컬럼 저장소"""
+
+    def __init__(self, path=FRUIT_STORE_DIR):
+        self.path = path
+        self.manifest_path = os.path.join(path, MANIFEST_NAME)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"schema": 1, "next_id": 1, "segments": []}
+
+    def _save_manifest(self):
+        os.makedirs(self.path, exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    # ------------------------------------------------------------
+    # manifest 만으로 답하는 조회
+    # ------------------------------------------------------------
+    def count(self):
+        return sum(seg["rows"] for seg in self.manifest["segments"])
+
+    def fruit_ids(self, house=None):
+        ids = set()
+        for seg in self.manifest["segments"]:
+            if house is None:
+                ids.update(_segment_fruits(seg))
+            else:
+                ids.update(seg["fruit_ids_by_house"].get(house, []))
+        return sorted(ids)
+
+    def houses(self):
+        return sorted({h for seg in self.manifest["segments"] for h in seg["houses"]})
+
+    # ------------------------------------------------------------
+    # 세그먼트 읽기
+    # ------------------------------------------------------------
+    def _segments_for(self, fruit_ids=None, house=None, start=None, end=None):
+        wanted = set(fruit_ids) if fruit_ids is not None else None
+        for seg in self.manifest["segments"]:
+            if wanted is not None and not wanted.intersection(_segment_fruits(seg)):
+                continue
+            if house is not None and house not in seg["houses"]:
+                continue
+            if start is not None and seg["date_max"] < start:
+                continue
+            if end is not None and seg["date_min"] > end:
+                continue
+            yield seg
+
+    def _row_ranges(self, seg, fruit_ids=None, house=None):
+        """세그먼트 안에서 읽을 [시작, 끝) 행 범위 (인접 범위는 합침)"""
+        fruit_rows = seg.get("fruit_rows")
+        if fruit_rows is None or (fruit_ids is None and house is None):
+            return [(0, seg["rows"])]
+        fruits = fruit_ids if fruit_ids is not None else seg["fruit_ids_by_house"].get(house, [])
+        if fruit_ids is not None and house is not None:
+            in_house = set(seg["fruit_ids_by_house"].get(house, []))
+            fruits = [f for f in fruits if f in in_house]
+        ranges = sorted(tuple(fruit_rows[f]) for f in set(fruits) if f in fruit_rows)
+        merged = []
+        for lo, hi in ranges:
+            if merged and merged[-1][1] == lo:
+                merged[-1] = (merged[-1][0], hi)
+            else:
+                merged.append((lo, hi))
+        return merged
+
+    def _read_segment(self, seg, columns=COLUMNS, ranges=None):
+        """세그먼트 컬럼 읽기 (ranges 가 있으면 그 행만)"""
+        if "file" in seg:
+            # 이전 형식(.npz 압축): 컬럼 전체를 풀어야 함 → compact 로 새 형식 변환
+            with np.load(os.path.join(self.path, seg["file"])) as data:
+                cols = {c: data[c] for c in columns}
+        else:
+            folder = os.path.join(self.path, seg["dir"])
+            cols = {c: np.load(os.path.join(folder, f"{c}.npy"), mmap_mode="r") for c in columns}
+        ranges = ranges or [(0, seg["rows"])]
+        return {c: np.concatenate([v[lo:hi] for lo, hi in ranges]) for c, v in cols.items()}
+
+    def query(self, fruit_id=None, house=None, start=None, end=None, columns=COLUMNS):
+        """
+        조건에 맞는 측정값 DataFrame (과실 ID, 날짜 순)
+        fruit_id 는 문자열 또는 목록, start/end 는 'YYYY-MM-DD'
+        """
+        fruit_ids = [fruit_id] if isinstance(fruit_id, str) else fruit_id
+        read_columns = list(dict.fromkeys(["fruit_id", "house", "date"] + list(columns)))
+        parts = []
+        for seg in self._segments_for(fruit_ids, house, start, end):
+            ranges = self._row_ranges(seg, fruit_ids, house)
+            if not ranges:
+                continue
+            cols = self._read_segment(seg, read_columns, ranges)
+            mask = np.ones(len(cols["date"]), dtype=bool)
+            if fruit_ids is not None and "fruit_rows" not in seg:
+                mask &= np.isin(cols["fruit_id"], fruit_ids)
+            if house is not None:
+                mask &= cols["house"] == house
+            if start is not None:
+                mask &= cols["date"] >= np.datetime64(start)
+            if end is not None:
+                mask &= cols["date"] <= np.datetime64(end)
+            if mask.any():
+                parts.append(pd.DataFrame({c: v[mask] for c, v in cols.items()}))
+
+        if not parts:
+            return pd.DataFrame({c: pd.Series(dtype=object) for c in columns})
+        frame = pd.concat(parts, ignore_index=True)
+        # 나중 세그먼트가 같은 (과실, 날짜)를 덮어씀
+        frame = frame.drop_duplicates(["fruit_id", "date"], keep="last")
+        return frame.sort_values(["fruit_id", "date"], ignore_index=True)[list(columns)]
+
+    def existing_keys(self, fruit_ids, start, end):
+        """(과실 ID, 날짜) 중복 검사용 키 집합 (관련 과실 행만 읽음)"""
+        keys = set()
+        for seg in self._segments_for(fruit_ids, None, start, end):
+            cols = self._read_segment(seg, ["fruit_id", "date"], self._row_ranges(seg, fruit_ids))
+            keys.update(zip(cols["fruit_id"].tolist(), cols["date"].astype(str).tolist()))
+        return keys
+
+    # ------------------------------------------------------------
+    # 쓰기
+    # ------------------------------------------------------------
+    def append(self, frame):
+        """정규화된 DataFrame → 새 세그먼트 (과실 ID, 날짜 정렬)"""
+        if frame.empty:
+            return None
+        frame = frame.sort_values(["fruit_id", "date"], ignore_index=True)
+
+        seg_id = self.manifest["next_id"]
+        dirname = f"seg_{seg_id:06d}"
+        folder = os.path.join(self.path, dirname)
+        os.makedirs(folder, exist_ok=True)
+        columns = {
+            "fruit_id": frame["fruit_id"].to_numpy(dtype=str),
+            "house": frame["house"].to_numpy(dtype=str),
+            "date": frame["date"].to_numpy(dtype="datetime64[D]"),
+        }
+        for column in VALUE_COLUMNS:
+            columns[column] = frame[column].to_numpy(dtype=np.float32)
+        # 압축하지 않은 .npy → 읽을 때 메모리 매핑으로 필요한 행만
+        for column, values in columns.items():
+            np.save(os.path.join(folder, f"{column}.npy"), values)
+
+        # 과실 ID 정렬이므로 과실마다 연속된 행 범위
+        ids = columns["fruit_id"]
+        unique, first = np.unique(ids, return_index=True)
+        last = np.append(first[1:], len(ids))
+        by_house = frame.groupby("house")["fruit_id"].unique()
+        seg = {
+            "dir": dirname,
+            "rows": len(frame),
+            "fruit_rows": {f: [int(lo), int(hi)] for f, lo, hi in zip(unique.tolist(), first, last)},
+            "houses": sorted(by_house.index.tolist()),
+            "fruit_ids_by_house": {h: sorted(ids.tolist()) for h, ids in by_house.items()},
+            "date_min": str(columns["date"].min()),
+            "date_max": str(columns["date"].max()),
+        }
+        self.manifest["segments"].append(seg)
+        self.manifest["next_id"] = seg_id + 1
+        self._save_manifest()
+        return seg
+
+    def compact(self):
+        """작은 세그먼트들을 하나로 합침 (중복 키는 최신 값 유지)"""
+        old = list(self.manifest["segments"])
+        if len(old) <= 1:
+            return 0
+        frame = self.query()
+        self.manifest["segments"] = []
+        self.append(frame)
+        for seg in old:
+            try:
+                if "file" in seg:
+                    os.remove(os.path.join(self.path, seg["file"]))
+                else:
+                    shutil.rmtree(os.path.join(self.path, seg["dir"]))
+            except OSError:
+                pass
+        return len(old)
+
+
+def import_csv(source, store=None, replace=False):
+    """
+    CSV 일괄 가져오기
+    source: 파일 경로 또는 파일 객체/바이트
+    반환: 결과 요약 딕셔너리
+    """
+    store = store or FruitStore()
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    raw = pd.read_csv(source, dtype=str, encoding="utf-8-sig")
+
+    frame = normalize_frame(raw)
+    frame, rejected = validate(frame)
+
+    # 파일 안 중복: 마지막 값 유지
+    in_file = int(frame.duplicated(["fruit_id", "date"], keep="last").sum())
+    frame = frame.drop_duplicates(["fruit_id", "date"], keep="last")
+
+    # 저장소와 중복: 기본은 건너뜀, replace=True 면 새 값으로 덮어씀
+    in_store = 0
+    if not frame.empty and not replace:
+        keys = store.existing_keys(
+            frame["fruit_id"].unique().tolist(),
+            str(frame["date"].min().date()),
+            str(frame["date"].max().date()),
+        )
+        if keys:
+            row_keys = list(zip(frame["fruit_id"], frame["date"].dt.strftime("%Y-%m-%d")))
+            dup = np.array([k in keys for k in row_keys])
+            in_store = int(dup.sum())
+            frame = frame[~dup]
+
+    store.append(frame)
+    return {
+        "rows": len(raw),
+        "imported": len(frame),
+        "rejected": rejected,
+        "duplicates_in_file": in_file,
+        "duplicates_in_store": in_store,
+        "total": store.count(),
+    }
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--store", default=FRUIT_STORE_DIR, help="저장소 폴더")
+    parser = argparse.ArgumentParser(description="과실 측정 데이터 저장소")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", parents=[common], help="CSV 가져오기")
+    p_import.add_argument("csv", nargs="+")
+    p_import.add_argument("--replace", action="store_true", help="이미 있는 (과실, 날짜)를 덮어씀")
+    sub.add_parser("compact", parents=[common], help="세그먼트 합치기")
+    args = parser.parse_args()
+
+    store = FruitStore(args.store)
+    if args.command == "compact":
+        merged = store.compact()
+        print(f"🗜️  {merged}개 세그먼트 → 1개 (총 {store.count()}행)")
+        return True
+
+    for path in args.csv:
+        started = time.perf_counter()
+        try:
+            result = import_csv(path, store, replace=args.replace)
+        except ValueError as e:
+            print(f"❌ {path}: {e}")
+            return False
+        elapsed = time.perf_counter() - started
+        print(f"📥 {path}: {result['imported']}/{result['rows']}행 저장 ({elapsed:.2f}s)")
+        if result["rejected"]:
+            print(f"  ⚠️  거부: {result['rejected']}")
+        if result["duplicates_in_file"] or result["duplicates_in_store"]:
+            print(f"  ♻️  중복: 파일 내 {result['duplicates_in_file']}, 저장소 {result['duplicates_in_store']}")
+    print(f"✅ 총 {store.count()}행")
+    return True
+
+
+if __name__ == "__main__":
+    exit(0 if main() else 1)
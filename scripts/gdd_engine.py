@@ -0,0 +1,337 @@
+"""
+적산온도(GDD) 벡터 엔진
+- collect_daily_data.calculate_gdd 와 같은 저온 쇼크/회복 페널티 규칙
+- 파라미터 격자 × 연도(또는 시뮬레이션 궤적)를 NumPy 배열로 한 번에 계산
+- 생육 기록 탭의 발아/개화 날짜로 파라미터 보정
+
+사용법:
+    python scripts/gdd_engine.py            # 기본 격자로 보정
+    python scripts/gdd_engine.py --workers 4
+"""
+
+import os
+import json
+import argparse
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from season_archive import read_records
+from sensor_stats import is_valid
+
+# 파일 경로
+DATA_DIR = "data"
+SENSOR_FILE = os.path.join(DATA_DIR, "sensor_history.json")
+PHENOLOGY_FILE = os.path.join(DATA_DIR, "phenology.json")
+CALIBRATION_FILE = os.path.join(DATA_DIR, "gdd_calibration.json")
+
+DAYS_PER_YEAR = 366
+
+# 시간 단위(degree-hour) 계산 설정
+MAX_GAP_SECONDS = 3 * 3600      # 이보다 긴 샘플 간격은 보간하지 않음
+MIN_COVERAGE_HOURS = 12         # 하루 중 이 시간 이상 측정된 날만 사용
+COLD_SHOCK_HOURS = 1.0          # 쇼크 기준 이하 누적 시간이 이 이상이면 저온 쇼크
+
+# calculate_gdd 기본값
+DEFAULT_PARAMS = {
+    "base_temp": 10.0,
+    "shock_threshold": 8.0,
+    "recovery_penalty": 0.5,
+    "stress_window": 3,
+}
+
+# 이정표 적산온도
+MILESTONE_GDD = {
+    "bud_break": 200,
+    "flowering_start": 750,
+}
+
+# 생육 기록 이벤트 키 → 이정표 (phenology_tab 수동 입력 포함)
+EVENT_MILESTONES = {
+    "bud_break": "bud_break",
+    "발아_확인": "bud_break",
+    "flowering_start": "flowering_start",
+    "개화_시작": "flowering_start",
+}
+
+# 보정용 기본 격자 (17 × 11 × 11 × 7 = 14,399 조합)
+DEFAULT_GRID = {
+    "base_temp": np.arange(8.0, 12.01, 0.25),
+    "shock_threshold": np.arange(5.0, 10.01, 0.5),
+    "recovery_penalty": np.arange(0.0, 1.01, 0.1),
+    "stress_window": np.arange(0, 7),
+}
+
+
+def build_temperature_matrix(sensor_records, field="outdoor_temp"):
+    """
+    센서 기록 → (연도 × 일자) 온도 행렬
+    빈 날짜와 결측/고착으로 표시된 날은 NaN (계산에서 건너뜀)
+    """
+    by_year = {}
+    for record in sensor_records:
+        if not is_valid(record, field):
+            continue
+        value = record[field]
+        date_obj = datetime.strptime(record["date"], "%Y-%m-%d")
+        by_year.setdefault(date_obj.year, []).append((date_obj.timetuple().tm_yday - 1, float(value)))
+
+    years = sorted(by_year)
+    temps = np.full((len(years), DAYS_PER_YEAR), np.nan)
+    for i, year in enumerate(years):
+        idx, values = zip(*by_year[year])
+        temps[i, list(idx)] = values
+
+    return years, temps
+
+
+def accumulate_gdd(temps, base_temp=10.0, shock_threshold=8.0, recovery_penalty=0.5,
+                   stress_window=3, initial_gdd=0.0, initial_stress=0, thresholds=None):
+    """
+    저온 쇼크를 반영한 적산온도 누적 (벡터화)
+
+    temps 의 마지막 축이 날짜, 나머지 축은 배치(연도/궤적)입니다.
+    파라미터는 스칼라 또는 배치 축과 브로드캐스트 가능한 배열입니다.
+    예: temps (Y, D), 파라미터 (P, 1) → 결과 (P, Y, D)
+
+    thresholds 를 주면 누적 시계열 대신 각 임계값을 처음 넘은 날짜 인덱스
+    (도달하지 못하면 -1) 를 (len(thresholds), ...) 배열로 반환합니다.
+    """
+    temps = np.asarray(temps, dtype=float)
+    base_temp = np.asarray(base_temp, dtype=float)
+    shock_threshold = np.asarray(shock_threshold, dtype=float)
+    recovery_penalty = np.asarray(recovery_penalty, dtype=float)
+    stress_window = np.asarray(stress_window, dtype=float)
+
+    shape = np.broadcast_shapes(
+        temps.shape[:-1], base_temp.shape, shock_threshold.shape,
+        recovery_penalty.shape, stress_window.shape,
+        np.shape(initial_gdd), np.shape(initial_stress),
+    )
+    n_days = temps.shape[-1]
+
+    acc = np.broadcast_to(np.asarray(initial_gdd, dtype=float), shape).copy()
+    stress = np.broadcast_to(np.asarray(initial_stress, dtype=float), shape).copy()
+
+    if thresholds is None:
+        daily_out = np.empty(shape + (n_days,))
+        acc_out = np.empty(shape + (n_days,))
+    else:
+        thresholds = np.asarray(thresholds, dtype=float)
+        crossing = np.full((len(thresholds),) + shape, -1, dtype=np.int32)
+
+    for d in range(n_days):
+        t = temps[..., d]
+        valid = ~np.isnan(t)
+        shock = valid & (t < shock_threshold)
+        recovering = valid & ~shock & (stress > 0)
+
+        raw = np.where(valid, np.maximum(0.0, np.nan_to_num(t) - base_temp), 0.0)
+        daily = np.where(shock, 0.0, np.where(recovering, raw * recovery_penalty, raw))
+        stress = np.where(shock, stress_window, np.where(recovering, stress - 1, stress))
+        acc = acc + daily
+
+        if thresholds is None:
+            daily_out[..., d] = daily
+            acc_out[..., d] = acc
+        else:
+            for k, threshold in enumerate(thresholds):
+                newly = (crossing[k] < 0) & (acc >= threshold)
+                crossing[k] = np.where(newly, d, crossing[k])
+
+    if thresholds is None:
+        return daily_out, acc_out
+    return crossing
+
+
+def degree_hours(timestamps, temps, base_temp=10.0, shock_threshold=8.0,
+                 max_gap=MAX_GAP_SECONDS):
+    """
+    30분 샘플 → 날짜별 열량(°C·시간)과 저온 노출 시간 (벡터화)
+
+    인접한 두 샘플 사이를 직선으로 보고 기준 온도 위 면적과
+    쇼크 기준 아래 시간을 구간별로 정확히 적분한 뒤 날짜별로 합산합니다.
+    (구간은 시작 시각의 날짜에 배정, max_gap 보다 긴 구간은 제외)
+
+    반환: {"date": [...], "heat": °C·h, "cold_hours": h, "covered_hours": h}
+    """
+    ts = np.asarray(timestamps, dtype=np.int64)
+    x = np.asarray(temps, dtype=float)
+    order = np.argsort(ts, kind="stable")
+    ts, x = ts[order], x[order]
+
+    h = np.diff(ts) / 3600.0
+    keep = (h > 0) & (h <= max_gap / 3600.0)
+    a, b, h = x[:-1][keep], x[1:][keep], h[keep]
+    start = ts[:-1][keep]
+
+    # 기준 온도 위 면적
+    u, v = a - base_temp, b - base_temp
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing_area = h * np.maximum(u, v) ** 2 / (2 * np.abs(u - v))
+    heat = np.where((u >= 0) & (v >= 0), h * (u + v) / 2,
+                    np.where((u <= 0) & (v <= 0), 0.0, crossing_area))
+
+    # 쇼크 기준 아래 시간
+    w, z = a - shock_threshold, b - shock_threshold
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing_time = h * np.abs(np.minimum(w, z)) / np.abs(w - z)
+    cold = np.where((w < 0) & (z < 0), h, np.where((w >= 0) & (z >= 0), 0.0, crossing_time))
+
+    if not len(start):
+        return {"date": [], "heat": np.array([]), "cold_hours": np.array([]), "covered_hours": np.array([])}
+
+    # 현지 시각 기준 날짜
+    offset = int(datetime.fromtimestamp(int(start[0])).astimezone().utcoffset().total_seconds())
+    day = (start + offset) // 86400
+    days, day_idx = np.unique(day, return_inverse=True)
+
+    return {
+        "date": [str(np.datetime64(int(d), "D")) for d in days],
+        "heat": np.bincount(day_idx, weights=heat),
+        "cold_hours": np.bincount(day_idx, weights=cold),
+        "covered_hours": np.bincount(day_idx, weights=h),
+    }
+
+
+def load_observed_events(phenology):
+    """
+    생육 기록에서 이정표 관측일 추출 (자동 감지 항목 제외)
+    반환: [(연도, 이정표, 연중 일자 인덱스), ...]
+    """
+    events = []
+    for year_str, year_data in phenology.items():
+        for key, value in year_data.items():
+            milestone = EVENT_MILESTONES.get(key)
+            if not milestone or value.get("auto_detected"):
+                continue
+            try:
+                date_obj = datetime.strptime(value["date"], "%Y-%m-%d")
+            except (KeyError, ValueError):
+                continue
+            events.append((int(year_str), milestone, date_obj.timetuple().tm_yday - 1))
+    return sorted(set(events))
+
+
+def parameter_grid(grid=None):
+    """격자 정의 → 조합별 1차원 파라미터 배열"""
+    grid = grid or DEFAULT_GRID
+    names = list(DEFAULT_PARAMS)
+    axes = [np.asarray(grid.get(name, [DEFAULT_PARAMS[name]]), dtype=float) for name in names]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return {name: m.ravel() for name, m in zip(names, mesh)}
+
+
+def score_grid(temps, event_rows, event_milestones, event_days, params):
+    """
+    파라미터 조합별 평균 절대 오차(일) 계산
+    도달하지 못한 이정표는 연말 도달로 간주해 오차에 반영합니다.
+    """
+    thresholds = [MILESTONE_GDD[m] for m in sorted(MILESTONE_GDD)]
+    crossing = accumulate_gdd(
+        temps,
+        base_temp=params["base_temp"][:, None],
+        shock_threshold=params["shock_threshold"][:, None],
+        recovery_penalty=params["recovery_penalty"][:, None],
+        stress_window=params["stress_window"][:, None],
+        thresholds=thresholds,
+    )
+    crossing = np.where(crossing < 0, temps.shape[-1], crossing)
+
+    milestone_idx = np.array([sorted(MILESTONE_GDD).index(m) for m in event_milestones])
+    predicted = crossing[milestone_idx, :, event_rows]  # (E, P)
+    return np.abs(predicted - event_days[:, None]).mean(axis=0)
+
+
+def _score_chunk(args):
+    return score_grid(*args)
+
+
+def calibrate(sensor_records, phenology, grid=None, workers=1, chunk_size=2000, top_k=5):
+    """
+    기록된 발아/개화 날짜에 맞는 GDD 파라미터 탐색
+    workers > 1 이면 격자를 나눠 프로세스 풀에서 계산합니다.
+    """
+    events = load_observed_events(phenology)
+    years, temps = build_temperature_matrix(sensor_records)
+    events = [e for e in events if e[0] in years]
+    if not events:
+        return None
+
+    # 관측 이벤트가 있는 연도만 계산
+    event_years = sorted({e[0] for e in events})
+    temps = temps[[years.index(y) for y in event_years]]
+    event_rows = np.array([event_years.index(e[0]) for e in events])
+    event_milestones = [e[1] for e in events]
+    event_days = np.array([e[2] for e in events], dtype=float)
+
+    params = parameter_grid(grid)
+    n_combos = len(params["base_temp"])
+    chunks = [
+        {name: values[i:i + chunk_size] for name, values in params.items()}
+        for i in range(0, n_combos, chunk_size)
+    ]
+    jobs = [(temps, event_rows, event_milestones, event_days, chunk) for chunk in chunks]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            scores = np.concatenate(list(pool.map(_score_chunk, jobs)))
+    else:
+        scores = np.concatenate([_score_chunk(job) for job in jobs])
+
+    order = np.argsort(scores, kind="stable")[:top_k]
+    best = [
+        {
+            "base_temp": round(float(params["base_temp"][i]), 2),
+            "shock_threshold": round(float(params["shock_threshold"][i]), 2),
+            "recovery_penalty": round(float(params["recovery_penalty"][i]), 2),
+            "stress_window": int(params["stress_window"][i]),
+            "mae_days": round(float(scores[i]), 2),
+        }
+        for i in order
+    ]
+
+    return {
+        "calibrated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "n_events": len(events),
+        "years": event_years,
+        "n_combinations": n_combos,
+        "best": best,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GDD 파라미터 보정")
+    parser.add_argument("--workers", type=int, default=1, help="프로세스 수")
+    parser.add_argument("--top", type=int, default=5, help="출력할 상위 조합 수")
+    args = parser.parse_args()
+
+    sensor_records = read_records("sensor", SENSOR_FILE)
+    with open(PHENOLOGY_FILE, "r", encoding="utf-8") as f:
+        phenology = json.load(f)
+
+    print("🔧 GDD 파라미터 보정")
+    started = time.perf_counter()
+    result = calibrate(sensor_records, phenology, workers=args.workers, top_k=args.top)
+    elapsed = time.perf_counter() - started
+
+    if not result:
+        print("⚠️  수동으로 기록된 발아/개화 이벤트가 없습니다")
+        return False
+
+    print(f"  {result['n_combinations']}개 조합 × {len(result['years'])}년 ({elapsed:.2f}s)")
+    for rank, best in enumerate(result["best"], 1):
+        print(f"  {rank}. base={best['base_temp']} shock={best['shock_threshold']} "
+              f"penalty={best['recovery_penalty']} window={best['stress_window']} "
+              f"→ 오차 {best['mae_days']}일")
+
+    with open(CALIBRATION_FILE, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"💾 {CALIBRATION_FILE}")
+    return True
+
+
+if __name__ == "__main__":
+    exit(0 if main() else 1)
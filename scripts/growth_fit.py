@@ -0,0 +1,402 @@
+"""
+과실별 성장 곡선 일괄 추정
+- 횡경(mm) ~ 시즌 누적 GDD 이중 시그모이드, 모든 과실을 한 번에 배치 Levenberg-Marquardt
+- 한 시즌(기본: 측정이 있는 마지막 해)만 추정 → 같은 과실 ID 를 다음 해에 다시 써도 섞이지 않음
+- 수렴하지 않은 과실만 프로세스 풀에서 여러 초기값으로 다시 추정
+- 과실별 결과를 캐시하고 새 측정이 있는 과실만 다시 계산
+- 동별 최종 크기/무게와 수확 시기(최종 크기 95% 도달) 예측
+
+사용법:
+    python scripts/growth_fit.py --workers 4
+    python scripts/growth_fit.py --season 2025
+"""
+
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+from forecast import forecast_milestones
+from fruit_store import FRUIT_STORE_DIR, FruitStore
+from season_archive import read_records
+from season_index import SeasonIndex, _year_doy
+
+DATA_DIR = "data"
+FIT_CACHE_FILE = os.path.join(DATA_DIR, "fruit_fits.json")
+GDD_FILE = os.path.join(DATA_DIR, "gdd_data.json")
+SENSOR_FILE = os.path.join(DATA_DIR, "sensor_history.json")
+
+FIT_SCHEMA = 1
+GDD_SCALE = 1000.0       # GDD 를 1000 단위로 (조건수 개선)
+MIN_POINTS = 4
+HARVEST_FRACTION = 0.95
+
+# 파라미터 순서: a1, k1, m1, a2, k2, m2
+#   D(x) = a1 / (1 + e^(-k1 (x - m1))) + a2 / (1 + e^(-k2 (x - m2)))
+N_PARAMS = 6
+LOWER = np.array([0.0, 0.5, 0.0, 0.0, 0.5, 0.0])
+UPPER = np.array([200.0, 30.0, 5.0, 200.0, 30.0, 5.0])
+
+# 키위 횡경 비대 형태 사전값 (시즌 GDD/1000, 개화 ≈ 0.75, 남부 산지 시즌 합계 ≈ 2.1)
+PRIOR_SHAPE = {"k1": 5.0, "m1": 1.1, "k2": 5.0, "m2": 1.8}
+PRIOR_SIGMA = {"k": 2.0, "m": 0.4, "ratio": 0.5}
+PRIOR_RATIO = 0.35       # 2차 비대량 / 1차 비대량
+
+MAX_ITER = 100
+TOLERANCE = 1e-8
+RESTARTS = 12
+
+
+# ============================================================
+# 배치 Levenberg-Marquardt
+# ============================================================
+def double_sigmoid(theta, x):
+    """theta (N, 6), x (N, T) → (N, T)"""
+    a1, k1, m1, a2, k2, m2 = (theta[:, i, None] for i in range(N_PARAMS))
+    return a1 / (1 + np.exp(-k1 * (x - m1))) + a2 / (1 + np.exp(-k2 * (x - m2)))
+
+
+def _residuals(theta, x, y, mask, scale):
+    """가중 잔차 + 야코비안 (관측 행 뒤에 사전값 5행)"""
+    a1, k1, m1, a2, k2, m2 = (theta[:, i, None] for i in range(N_PARAMS))
+    s1 = 1 / (1 + np.exp(-np.clip(k1 * (x - m1), -50, 50)))
+    s2 = 1 / (1 + np.exp(-np.clip(k2 * (x - m2), -50, 50)))
+    d1, d2 = s1 * (1 - s1), s2 * (1 - s2)
+
+    r_obs = np.where(mask, a1 * s1 + a2 * s2 - y, 0.0)
+    j_obs = np.stack([
+        s1, a1 * d1 * (x - m1), -a1 * k1 * d1,
+        s2, a2 * d2 * (x - m2), -a2 * k2 * d2,
+    ], axis=-1) * mask[..., None]
+
+    n = len(theta)
+    sig_a = PRIOR_SIGMA["ratio"] * scale[:, 0]
+    r_prior = np.stack([
+        (theta[:, 1] - PRIOR_SHAPE["k1"]) / PRIOR_SIGMA["k"],
+        (theta[:, 2] - PRIOR_SHAPE["m1"]) / PRIOR_SIGMA["m"],
+        (theta[:, 4] - PRIOR_SHAPE["k2"]) / PRIOR_SIGMA["k"],
+        (theta[:, 5] - PRIOR_SHAPE["m2"]) / PRIOR_SIGMA["m"],
+        (theta[:, 3] - PRIOR_RATIO * theta[:, 0]) / sig_a,
+    ], axis=1)
+    j_prior = np.zeros((n, 5, N_PARAMS))
+    j_prior[:, 0, 1] = 1 / PRIOR_SIGMA["k"]
+    j_prior[:, 1, 2] = 1 / PRIOR_SIGMA["m"]
+    j_prior[:, 2, 4] = 1 / PRIOR_SIGMA["k"]
+    j_prior[:, 3, 5] = 1 / PRIOR_SIGMA["m"]
+    j_prior[:, 4, 0] = -PRIOR_RATIO / sig_a
+    j_prior[:, 4, 3] = 1 / sig_a
+
+    return np.concatenate([r_obs, r_prior], axis=1), np.concatenate([j_obs, j_prior], axis=1)
+
+
+def fit_batch(x, y, mask, theta0, max_iter=MAX_ITER, tol=TOLERANCE):
+    """
+    N개 곡선을 동시에 추정
+    x, y, mask: (N, T) — 과실마다 측정 수가 달라 mask 로 패딩 구분
+    반환: (theta (N, 6), 관측 RMSE (N,), 수렴 여부 (N,))
+    """
+    theta = np.clip(theta0.astype(float), LOWER, UPPER)
+    scale = np.maximum(np.nanmax(np.where(mask, y, np.nan), axis=1, keepdims=True), 1.0)
+    lam = np.full(len(theta), 1e-2)
+    converged = np.zeros(len(theta), dtype=bool)
+
+    r, jac = _residuals(theta, x, y, mask, scale)
+    cost = (r ** 2).sum(axis=1)
+    eye = np.eye(N_PARAMS)
+
+    for _ in range(max_iter):
+        active = ~converged
+        if not active.any():
+            break
+        grad = np.einsum("ntp,nt->np", jac, r)
+        hess = np.einsum("ntp,ntq->npq", jac, jac)
+        damped = hess + lam[:, None, None] * (hess * eye + 1e-9 * eye)
+        step = np.linalg.solve(damped, -grad[..., None])[..., 0]
+
+        trial = np.clip(theta + step, LOWER, UPPER)
+        r_new, jac_new = _residuals(trial, x, y, mask, scale)
+        cost_new = (r_new ** 2).sum(axis=1)
+
+        better = active & (cost_new < cost)
+        done = better & (cost - cost_new <= tol * np.maximum(cost, 1e-12))
+        theta[better] = trial[better]
+        r[better], jac[better] = r_new[better], jac_new[better]
+        cost = np.where(better, cost_new, cost)
+        lam = np.where(better, lam * 0.3, lam * 10)
+        # 더 내려갈 수 없는 곳(감쇠가 매우 커짐)도 수렴으로 간주
+        converged |= done | (active & (lam > 1e10))
+
+    n_obs = np.maximum(mask.sum(axis=1), 1)
+    rmse = np.sqrt((np.where(mask, r[:, :mask.shape[1]], 0.0) ** 2).sum(axis=1) / n_obs)
+    return _canonical(theta), rmse, converged
+
+
+def _canonical(theta):
+    """두 시그모이드 순서 정렬 (m1 ≤ m2)"""
+    theta = theta.copy()
+    swap = theta[:, 2] > theta[:, 5]
+    theta[swap] = theta[swap][:, [3, 4, 5, 0, 1, 2]]
+    return theta
+
+
+def initial_guess(x, y, mask):
+    """관측 최대값과 사전 형태로 초기값"""
+    top = np.nanmax(np.where(mask, y, np.nan), axis=1)
+    reached = 1 / (1 + np.exp(-PRIOR_SHAPE["k1"] * (np.nanmax(np.where(mask, x, np.nan), axis=1) - PRIOR_SHAPE["m1"])))
+    a1 = top / np.maximum(reached, 0.3)
+    theta = np.empty((len(x), N_PARAMS))
+    theta[:, 0] = a1
+    theta[:, 1] = PRIOR_SHAPE["k1"]
+    theta[:, 2] = PRIOR_SHAPE["m1"]
+    theta[:, 3] = PRIOR_RATIO * a1
+    theta[:, 4] = PRIOR_SHAPE["k2"]
+    theta[:, 5] = PRIOR_SHAPE["m2"]
+    return theta
+
+
+def _fit_straggler(args):
+    """한 과실을 여러 초기값으로 동시에 추정 → 가장 좋은 수렴 결과"""
+    x, y, theta0, seed = args
+    rng = np.random.default_rng(seed)
+    starts = theta0 * rng.uniform(0.6, 1.6, size=(RESTARTS, N_PARAMS))
+    starts[0] = theta0
+    xs = np.repeat(x[None], RESTARTS, axis=0)
+    ys = np.repeat(y[None], RESTARTS, axis=0)
+    mask = np.ones_like(xs, dtype=bool)
+    theta, rmse, converged = fit_batch(xs, ys, mask, starts, max_iter=MAX_ITER * 3)
+    order = np.lexsort((rmse, ~converged))
+    best = order[0]
+    return theta[best], float(rmse[best]), bool(converged[best])
+
+
+def harvest_gdd(theta, fraction=HARVEST_FRACTION, lo=0.0, hi=6.0, iterations=40):
+    """최종 크기의 fraction 에 도달하는 시즌 GDD (이분법, 곡선 단조 증가)"""
+    target = fraction * (theta[:, 0] + theta[:, 3])
+    lo = np.full(len(theta), lo)
+    hi = np.full(len(theta), hi)
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        below = double_sigmoid(theta, mid[:, None])[:, 0] < target
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+    return (lo + hi) / 2 * GDD_SCALE
+
+
+# ============================================================
+# 데이터 준비 / 캐시
+# ============================================================
+def season_gdd_lookup(index):
+    """(연도, 연중 일자) → 시즌 누적 GDD 조회 함수"""
+    by_year = {year: index.season_gdd(year) for year in index.years}
+
+    def lookup(dates):
+        out = np.full(len(dates), np.nan)
+        for i, date_str in enumerate(dates):
+            year, doy = _year_doy(date_str)
+            if year in by_year:
+                out[i] = by_year[year][doy]
+        return out
+    return lookup
+
+
+def latest_season(store):
+    """측정이 있는 마지막 연도 (없으면 None)"""
+    segments = store.manifest["segments"]
+    return max(int(seg["date_max"][:4]) for seg in segments) if segments else None
+
+
+def _season_range(season):
+    return f"{season}-01-01", f"{season}-12-31"
+
+
+def _load_cache(filepath, season):
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("schema") != FIT_SCHEMA or cache.get("season") != season:
+        return {}
+    return cache.get("fits", {})
+
+
+def _save_cache(fits, filepath, season):
+    try:
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump({"schema": FIT_SCHEMA, "season": season, "fits": fits},
+                      f, ensure_ascii=False, separators=(",", ":"))
+    except OSError as e:
+        print(f"❌ Save error: {e}")
+
+
+def fit_fruits(store, index, cache_file=FIT_CACHE_FILE, workers=1, season=None):
+    """
+    한 시즌의 모든 과실 곡선 추정 (새 측정이 있는 과실만)
+    season: 연도 (기본: 측정이 있는 마지막 해)
+    반환: (과실별 결과 딕셔너리, 다시 계산한 과실 수)
+    """
+    season = season or latest_season(store)
+    if season is None:
+        return {}, 0
+    start, end = _season_range(season)
+    frame = store.query(start=start, end=end, columns=["fruit_id", "house", "date", "transverse_mm"])
+    frame = frame[frame["transverse_mm"].notna()]
+    dates = frame["date"].dt.strftime("%Y-%m-%d").to_numpy()
+    frame = frame.assign(date=dates, x=season_gdd_lookup(index)(dates) / GDD_SCALE)
+    frame = frame[np.isfinite(frame["x"])]
+
+    fits = _load_cache(cache_file, season)
+    todo = []
+    groups = {}
+    for fruit_id, rows in frame.groupby("fruit_id", sort=True):
+        if len(rows) < MIN_POINTS:
+            continue
+        key = [len(rows), rows["date"].iloc[-1], round(float(rows["x"].iloc[-1]), 4)]
+        groups[fruit_id] = rows
+        cached = fits.get(fruit_id)
+        if cached is None or cached.get("key") != key:
+            todo.append((fruit_id, key))
+
+    if todo:
+        width = max(len(groups[f]) for f, _ in todo)
+        x = np.zeros((len(todo), width))
+        y = np.zeros((len(todo), width))
+        mask = np.zeros((len(todo), width), dtype=bool)
+        for i, (fruit_id, _) in enumerate(todo):
+            rows = groups[fruit_id]
+            x[i, :len(rows)] = rows["x"].to_numpy()
+            y[i, :len(rows)] = rows["transverse_mm"].to_numpy()
+            mask[i, :len(rows)] = True
+
+        theta0 = initial_guess(x, y, mask)
+        theta, rmse, converged = fit_batch(x, y, mask, theta0)
+
+        stragglers = np.flatnonzero(~converged)
+        if len(stragglers):
+            jobs = [(x[i, mask[i]], y[i, mask[i]], theta0[i], int(i)) for i in stragglers]
+            if workers > 1 and len(jobs) > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_fit_straggler, jobs))
+            else:
+                results = [_fit_straggler(job) for job in jobs]
+            for i, (t, e, c) in zip(stragglers, results):
+                theta[i], rmse[i], converged[i] = t, e, c
+
+        harvest = harvest_gdd(theta)
+        for i, (fruit_id, key) in enumerate(todo):
+            fits[fruit_id] = {
+                "key": key,
+                "house": groups[fruit_id]["house"].iloc[0],
+                "params": [round(float(v), 5) for v in theta[i]],
+                "final_mm": round(float(theta[i, 0] + theta[i, 3]), 2),
+                "harvest_gdd": round(float(harvest[i]), 1),
+                "rmse": round(float(rmse[i]), 3),
+                "converged": bool(converged[i]),
+            }
+
+    # 측정이 삭제된 과실은 캐시에서 제거
+    fits = {f: fits[f] for f in groups if f in fits}
+    if todo or len(fits) != len(_load_cache(cache_file, season)):
+        _save_cache(fits, cache_file, season)
+    return fits, len(todo)
+
+
+# ============================================================
+# 동별 요약
+# ============================================================
+def weight_allometry(store, house, season=None):
+    """무게 = c · 횡경^b (로그 선형 회귀, season 지정 시 그 해 측정만), 측정 부족하면 None"""
+    start, end = _season_range(season) if season else (None, None)
+    frame = store.query(house=house, start=start, end=end, columns=["transverse_mm", "weight_g"]).dropna()
+    frame = frame[(frame["transverse_mm"] > 0) & (frame["weight_g"] > 0)]
+    if len(frame) < 10:
+        return None
+    b, log_c = np.polyfit(np.log(frame["transverse_mm"]), np.log(frame["weight_g"]), 1)
+    return float(np.exp(log_c)), float(b)
+
+
+def house_summary(fits, store, gdd_records, index, sensor_records=None, n_sims=1000, seed=None, season=None):
+    """
+    동별 최종 크기 분포와 수확 시기 (fits 를 추정한 시즌 기준)
+    수확 시기: 동 중앙값 과실이 최종 크기 95%에 도달하는 GDD → 날짜 (이미 지났으면 실제 날짜)
+    """
+    season = season or latest_season(store)
+    if not gdd_records or season is None:
+        return {}
+    current_year = int(gdd_records[-1]["date"][:4])
+    # 수확 GDD 는 시즌(1월 1일부터) 누적 → 과실 곡선의 x 축과 같은 시즌 GDD 로 비교
+    season_gdd = index.season_gdd(season)
+
+    summary = {}
+    for house in sorted({f["house"] for f in fits.values()}):
+        rows = [f for f in fits.values() if f["house"] == house]
+        final = np.array([f["final_mm"] for f in rows])
+        harvest = float(np.median([f["harvest_gdd"] for f in rows]))
+        entry = {
+            "fruits": len(rows),
+            "converged": sum(f["converged"] for f in rows),
+            "final_mm": {q: round(float(v), 1) for q, v in zip((0.1, 0.5, 0.9), np.quantile(final, (0.1, 0.5, 0.9)))},
+            "final_weight_g": None,
+            "harvest_gdd": round(harvest, 0),
+            "harvest_dates": {},
+        }
+        allometry = weight_allometry(store, house, season)
+        if allometry:
+            c, b = allometry
+            entry["final_weight_g"] = {q: round(c * v ** b, 0) for q, v in entry["final_mm"].items()}
+
+        with np.errstate(invalid="ignore"):
+            crossed = np.flatnonzero(season_gdd >= harvest)
+        if len(crossed):
+            reached = date(season, 1, 1) + timedelta(days=int(crossed[0]))
+            entry["harvest_dates"] = {q: reached for q in (0.1, 0.5, 0.9)}
+        elif season == current_year:
+            # forecast_milestones 도 시즌 누적 GDD 로 이정표를 비교
+            forecast = forecast_milestones(sensor_records or [], gdd_records, milestones={house: harvest},
+                                           n_sims=n_sims, seed=seed)
+            entry["harvest_dates"] = forecast.get(house, {}).get("dates", {})
+        summary[house] = entry
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="과실 성장 곡선 일괄 추정")
+    parser.add_argument("--workers", type=int, default=1, help="재추정 프로세스 수")
+    parser.add_argument("--store", default=FRUIT_STORE_DIR)
+    parser.add_argument("--season", type=int, help="추정할 연도 (기본: 측정이 있는 마지막 해)")
+    args = parser.parse_args()
+
+    store = FruitStore(args.store)
+    index = SeasonIndex.load()
+    if index is None or not store.count():
+        print("⚠️  과실 측정 또는 시즌 인덱스가 없습니다")
+        return False
+
+    started = time.perf_counter()
+    season = args.season or latest_season(store)
+    fits, refit = fit_fruits(store, index, workers=args.workers, season=season)
+    elapsed = time.perf_counter() - started
+    print(f"🥝 {season}년 과실 {len(fits)}개 (다시 계산 {refit}개, {elapsed:.2f}s)")
+
+    gdd_records = read_records("gdd", GDD_FILE)
+    sensor_records = read_records("sensor", SENSOR_FILE)
+
+    for house, entry in house_summary(fits, store, gdd_records, index, sensor_records, season=season).items():
+        final = entry["final_mm"]
+        print(f"  {house}: 최종 횡경 {final[0.5]}mm ({final[0.1]}~{final[0.9]}), "
+              f"수렴 {entry['converged']}/{entry['fruits']}")
+        if entry["final_weight_g"]:
+            print(f"       최종 무게 약 {entry['final_weight_g'][0.5]:.0f}g")
+        dates = entry["harvest_dates"]
+        if dates:
+            print(f"       수확 시기 {dates[0.1]:%m-%d} ~ {dates[0.9]:%m-%d} (중앙 {dates[0.5]:%m-%d})")
+    return True
+
+
+if __name__ == "__main__":
+    exit(0 if main() else 1)
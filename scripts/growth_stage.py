@@ -0,0 +1,66 @@
+"""
+생육 단계 판정
+- 월 + 누적 GDD 기반 단계 분류 (앱/수집기 공용)
+"""
+
+# 생육 이정표
+MILESTONES = [
+    {"id": "bud_break", "name": "발아", "gdd": 200, "emoji": "🌱"},
+    {"id": "flowering_start", "name": "개화", "gdd": 750, "emoji": "🌸"},
+]
+
+
+# 단계별 표시 정보
+STAGES = {
+    "dormancy": {"name": "휴면기/발아기", "emoji": "🌱", "color": "stage-dormancy",
+                 "next_milestone": "발아", "next_gdd": 200},
+    "pre_flowering": {"name": "발아 후 성장기", "emoji": "🌿", "color": "stage-dormancy",
+                      "next_milestone": "개화", "next_gdd": 750},
+    "flowering": {"name": "개화기/착과기", "emoji": "🌸", "color": "stage-flowering",
+                  "next_milestone": "착과 완료", "next_gdd": 1000},
+    "fruiting": {"name": "과실 비대기", "emoji": "🥝", "color": "stage-fruiting",
+                 "next_milestone": "수확", "next_gdd": 0},
+    "harvest": {"name": "수확 후 관리", "emoji": "📦", "color": "stage-harvest",
+                "next_milestone": "내년 준비", "next_gdd": 0},
+}
+
+
+def stage_progress(stage_id, month, current_gdd):
+    """단계 안에서의 진행률 (%)"""
+    if stage_id == "dormancy":
+        progress = (current_gdd / 200) * 100
+    elif stage_id == "pre_flowering":
+        progress = ((current_gdd - 200) / 550) * 100
+    elif stage_id == "flowering":
+        progress = ((current_gdd - 750) / 250) * 100 if current_gdd >= 750 else 0
+    elif stage_id == "fruiting":
+        progress = ((month - 6) / 4) * 100
+    else:
+        return 100
+    return min(100, max(0.0, progress))
+
+
+def stage_info(stage_id, month, current_gdd):
+    """단계 id → 표시용 딕셔너리 (이름, 색, 진행률, 다음 이정표)"""
+    return {"id": stage_id, **STAGES[stage_id], "progress": stage_progress(stage_id, month, current_gdd)}
+
+
+def classify_stage(month, current_gdd):
+    """월과 누적 GDD로 생육 단계 판정 (타임라인이 없을 때의 기준)"""
+    if month in [1, 2, 3] and current_gdd < 750:
+        stage_id = "dormancy" if current_gdd < 200 else "pre_flowering"
+    elif month in [1, 2, 3, 4, 5]:
+        stage_id = "flowering"
+    elif month in [6, 7, 8, 9, 10]:
+        stage_id = "fruiting"
+    else:  # 11, 12월
+        stage_id = "harvest"
+    return stage_info(stage_id, month, current_gdd)
+
+
+def milestone_progress(current_gdd):
+    """이정표별 진행률 (%)"""
+    return [
+        dict(m, progress=min(100.0, current_gdd / m["gdd"] * 100), reached=current_gdd >= m["gdd"])
+        for m in MILESTONES
+    ]
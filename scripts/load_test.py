@@ -0,0 +1,260 @@
+"""
+대시보드 동시 접속 부하 테스트
+- 여러 해의 합성 센서 데이터를 임시 폴더에 만들고 수집기와 같은 과정으로 파생 파일 생성
+- 세션 수별로 헤드리스 세션(AppTest)을 동시에 실행: 앱 열기 → GDD 범위 변경 → 연도 비교 변경
+  → 생육 기록 폼 저장 → 새로고침
+- 재실행 지연 p50/p95/p99, 처리량, CPU, 메모리(세션당) 보고
+
+st.tabs 는 매 실행마다 다섯 탭을 모두 그리므로(탭 전환은 브라우저 안에서만 일어남)
+각 재실행이 다섯 탭 전체 렌더링 비용을 포함합니다.
+AppTest 세션은 한 프로세스에서 돌기 때문에 실제 서버처럼 캐시를 공유합니다.
+
+사용법:
+    python scripts/load_test.py --sessions 1 4 8 16 --years 3
+    python scripts/load_test.py --sessions 8 --json load_test.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import threading
+import contextlib
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from synthetic_data import synthetic_api_data
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+# share_runtime 이 손대는 Streamlit 내부 구조를 확인한 버전 (requirements.txt 고정 버전과 같게 유지)
+STREAMLIT_TESTED_VERSION = "1.37.0"
+GDD_RANGES = ["all", "year", "30d"]   # app.GDD_RANGES 키
+
+
+# ============================================================
+# 합성 데이터
+# ============================================================
+def build_dataset(data_dir, years, seed=0):
+    """data_dir/data/ 에 합성 센서 기록과 파생 파일 생성 (수집기 함수 사용)"""
+    cwd = os.getcwd()
+    os.makedirs(os.path.join(data_dir, "data"), exist_ok=True)
+    os.chdir(data_dir)
+    try:
+        import collect_daily_data as collector
+        from dashboard_snapshot import write_snapshot
+        from season_index import SeasonIndex, SEASON_INDEX_FILE
+        from stage_timeline import update_stage_timeline
+
+        end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = end.replace(year=end.year - years + 1, month=1, day=1)
+
+        records = []
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            day = start
+            while day < end:
+                days = min(90, (end - day).days)
+                records += collector.parse_history_data(synthetic_api_data(day, days, seed=seed + len(records)))
+                day += timedelta(days=days)
+            collector.save_json(collector.SENSOR_FILE, records)
+            collector.save_json(collector.PHENOLOGY_FILE, {})
+            collector.calculate_gdd(records)
+
+        gdd_records = collector.load_json(collector.GDD_FILE)
+        timeline = update_stage_timeline(gdd_records, collector.load_json(collector.PHENOLOGY_FILE))
+        SeasonIndex.build(records, gdd_records).save(SEASON_INDEX_FILE)
+        write_snapshot(records, gdd_records, sensor_file=collector.SENSOR_FILE, gdd_file=collector.GDD_FILE,
+                       timeline=timeline)
+        return len(records)
+    finally:
+        os.chdir(cwd)
+
+
+# ============================================================
+# 세션 흐름
+# ============================================================
+def rss_mb():
+    """현재 프로세스 RSS (MB)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _find(elements, label):
+    return next((e for e in elements if e.label == label), None)
+
+
+def session_flow(at, session_id, iterations, record, serial=None):
+    """
+    한 세션의 사용 흐름 (단계마다 지연 기록)
+    serial: 공용 Runtime 없이 돌 때 재실행을 한 번에 하나씩만 하도록 잡는 잠금
+    """
+    def step(name, action):
+        with serial or contextlib.nullcontext():
+            started = time.perf_counter()
+            action()
+            record(name, time.perf_counter() - started, bool(at.exception))
+
+    step("open", at.run)
+    for it in range(iterations):
+        radio = _find(at.radio, "표시 범위")
+        if radio is not None:
+            step("gdd_range", lambda: radio.set_value(GDD_RANGES[(it + 1) % len(GDD_RANGES)]).run())
+
+        compare = _find(at.selectbox, "비교 연도")
+        if compare is not None and len(compare.options) > 1:
+            step("compare_year", lambda: compare.select_index((it + 1) % len(compare.options)).run())
+
+        notes = _find(at.text_input, "메모 (선택)")
+        submit = _find(at.button, "💾 저장")
+        if notes is not None and submit is not None:
+            notes.input(f"load test {session_id}-{it}")
+            step("phenology_form", lambda: submit.click().run())
+
+        refresh = _find(at.button, "🔄 새로고침")
+        if refresh is not None:
+            step("refresh", lambda: refresh.click().run())
+
+
+def share_runtime():
+    """
+    AppTest 는 실행마다 전역 Runtime/설정(global.appTest)을 바꾸고 끝나면 되돌리므로
+    동시 세션이 서로의 상태를 지움 → 서버처럼 한 번만 설정하고 AppTest 의 설정/해제는 무시
+
+    공개 API 로는 할 수 없어 Streamlit 내부(Runtime._instance, app_test.Runtime,
+    app_test.patch_config_options, config._set_option)를 바꿉니다.
+    STREAMLIT_TESTED_VERSION 에서만 적용하고, 다른 버전이면 아무것도 바꾸지 않고 False
+    (그때는 재실행을 잠금으로 하나씩 돌림 → 동시성 수치가 아님)
+    """
+    import streamlit
+    if streamlit.__version__ != STREAMLIT_TESTED_VERSION:
+        return False
+
+    from unittest.mock import MagicMock
+    from streamlit import config, logger
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import app_test
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    app_test.Runtime = type("Runtime", (), {"_instance": None})
+    config.get_config_options()
+    logger.set_log_level("error")
+    config._set_option("global.appTest", True, "load_test")
+    app_test.patch_config_options = lambda options: contextlib.nullcontext()
+    return True
+
+
+def run_level(n_sessions, iterations, baseline_rss, timeout=120, serial=None):
+    """세션 n개 동시 실행 → 지표 (serial: session_flow 참고)"""
+    from streamlit.testing.v1 import AppTest
+
+    lock = threading.Lock()
+    samples = []
+
+    def record(name, seconds, failed):
+        with lock:
+            samples.append((name, seconds, failed))
+
+    sessions = [AppTest.from_file(APP_FILE, default_timeout=timeout) for _ in range(n_sessions)]
+    cpu_start = time.process_time()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessions) as pool:
+        list(pool.map(lambda i: session_flow(sessions[i], i, iterations, record, serial), range(n_sessions)))
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_start
+    memory = rss_mb()
+    del sessions
+
+    latencies = np.array([s[1] for s in samples]) * 1000
+    p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) if len(latencies) else (0, 0, 0)
+    by_step = {}
+    for name, seconds, _ in samples:
+        by_step.setdefault(name, []).append(seconds * 1000)
+
+    return {
+        "sessions": n_sessions,
+        "reruns": len(samples),
+        "errors": sum(s[2] for s in samples),
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+        "throughput_per_s": round(len(samples) / wall, 2),
+        "cpu_percent": round(cpu / wall * 100, 1),
+        "cpu_ms_per_rerun": round(cpu / max(len(samples), 1) * 1000, 1),
+        "rss_mb": round(memory, 1),
+        "rss_per_session_mb": round((memory - baseline_rss) / n_sessions, 2),
+        "steps_p50_ms": {name: round(float(np.median(v)), 1) for name, v in sorted(by_step.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대시보드 동시 접속 부하 테스트")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 8, 16], help="동시 세션 수 목록")
+    parser.add_argument("--iterations", type=int, default=3, help="세션당 흐름 반복 횟수")
+    parser.add_argument("--years", type=int, default=3, help="합성 데이터 연수")
+    parser.add_argument("--data-dir", help="합성 데이터 폴더 (기본: 임시 폴더, 실행 후 삭제)")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    data_dir = os.path.abspath(args.data_dir) if args.data_dir else tempfile.mkdtemp(prefix="kiwi-load-")
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    if not os.path.exists(os.path.join(data_dir, "data", "sensor_history.json")):
+        started = time.perf_counter()
+        days = build_dataset(data_dir, args.years)
+        print(f"🧪 합성 데이터 {days}일 ({args.years}년, {time.perf_counter() - started:.1f}s) → {data_dir}")
+
+    cwd = os.getcwd()
+    os.chdir(data_dir)
+    results = []
+    try:
+        serial = None
+        if not share_runtime():
+            import streamlit
+            serial = threading.Lock()
+            print(f"⚠️ streamlit {streamlit.__version__} ≠ {STREAMLIT_TESTED_VERSION}: "
+                  f"공용 Runtime 없이 재실행을 하나씩 실행 (지연은 참고용, 동시성 수치 아님)")
+        # 캐시 예열 (첫 실행의 모듈 로드/그림 생성은 측정에서 제외)
+        run_level(1, 1, rss_mb(), serial=serial)
+        baseline = rss_mb()
+
+        print(f"{'세션':>4} {'재실행':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'처리량/s':>9} {'CPU%':>6} {'RSS MB':>8} {'MB/세션':>8} {'오류':>4}")
+        for n in args.sessions:
+            result = run_level(n, args.iterations, baseline, serial=serial)
+            results.append(result)
+            print(f"{n:>4} {result['reruns']:>6} {result['p50_ms']:>8.0f} {result['p95_ms']:>8.0f} "
+                  f"{result['p99_ms']:>8.0f} {result['throughput_per_s']:>9.2f} {result['cpu_percent']:>6.0f} "
+                  f"{result['rss_mb']:>8.0f} {result['rss_per_session_mb']:>8.2f} {result['errors']:>4}")
+    finally:
+        os.chdir(cwd)
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"years": args.years, "iterations": args.iterations, "shared_runtime": serial is None,
+                       "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"💾 {json_path}")
+    return not any(r["errors"] for r in results)
+
+
+if __name__ == "__main__":
+    exit(0 if main() else 1)
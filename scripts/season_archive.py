@@ -0,0 +1,235 @@
+"""
+지난 시즌 압축 보관
+- 끝난 연도의 센서/GDD 기록을 연도별 압축 컬럼 블록(.npz, 필드마다 압축)으로 옮기고
+  hot JSON 에는 진행 중인 시즌만 남김 → 매일 파싱/커밋하는 파일이 작게 유지됨
+- 보관 블록은 한 번 쓰면 바뀌지 않음 (index.json 에 행 수, 날짜 범위, 체크섬)
+- 읽기는 투명하게: 보관 연도 + hot 기록을 이어 붙여 반환 (블록은 프로세스 안에서 캐시)
+
+사용법:
+    python scripts/season_archive.py          # 끝난 시즌 보관
+    python scripts/season_archive.py --list   # 보관 현황
+"""
+
+import os
+import json
+import hashlib
+import argparse
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+from farm_data import ColumnTable, data_version
+
+DATA_DIR = "data"
+ARCHIVE_DIR = os.path.join(DATA_DIR, "archive")
+ARCHIVE_INDEX_NAME = "index.json"
+ARCHIVE_INDEX_FILE = os.path.join(ARCHIVE_DIR, ARCHIVE_INDEX_NAME)
+
+DATASETS = {
+    "sensor": os.path.join(DATA_DIR, "sensor_history.json"),
+    "gdd": os.path.join(DATA_DIR, "gdd_data.json"),
+}
+
+ARCHIVE_SCHEMA = 1
+# 블록 안 마스크 배열 이름 접두어 (필드 이름과 겹치지 않게)
+ABSENT_PREFIX = "__absent__"
+NULL_PREFIX = "__null__"
+# 연말 이후 이 기간이 지나야 보관 (수집기 결측 재수집 기간 GAP_LOOKBACK_DAYS 이상)
+ARCHIVE_GRACE_DAYS = 60
+
+
+# ============================================================
+# 인덱스 / 블록
+# ============================================================
+def load_index(archive_dir=ARCHIVE_DIR):
+    try:
+        with open(os.path.join(archive_dir, ARCHIVE_INDEX_NAME), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {"schema": ARCHIVE_SCHEMA, "datasets": {}}
+    return index if index.get("schema") == ARCHIVE_SCHEMA else {"schema": ARCHIVE_SCHEMA, "datasets": {}}
+
+
+def _save_index(index, archive_dir):
+    path = os.path.join(archive_dir, ARCHIVE_INDEX_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _write_block(table, path):
+    """
+    ColumnTable → 압축 npz (중첩 값은 필드별 JSON 문자열 배열)
+    키 없음/문자열 None 마스크는 __absent__/__null__ 접두어 배열로 함께 저장
+    """
+    arrays = {}
+    for field, array in table.columns.items():
+        if table.kinds[field] == "object":
+            array = np.array([json.dumps(v, ensure_ascii=False, separators=(",", ":")) for v in array], dtype=str)
+        arrays[field] = array
+    for field, mask in table.absent.items():
+        arrays[ABSENT_PREFIX + field] = mask
+    for field, mask in table.nulls.items():
+        arrays[NULL_PREFIX + field] = mask
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path)
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=64)
+def _read_block(path, checksum, kinds):
+    """압축 블록 → ColumnTable (체크섬별 캐시, 블록은 불변)"""
+    kinds = dict(kinds)
+    columns, absent, nulls = {}, {}, {}
+    with np.load(path) as data:
+        for field, kind in kinds.items():
+            array = data[field]
+            if kind == "object":
+                decoded = np.empty(len(array), dtype=object)
+                decoded[:] = [json.loads(v) for v in array]
+                array = decoded
+            array.setflags(write=False)
+            columns[field] = array
+            if ABSENT_PREFIX + field in data.files:
+                absent[field] = data[ABSENT_PREFIX + field]
+            if kind == "str":
+                # 마스크 없이 쓴 예전 블록: "" 를 None 으로 읽던 동작 유지
+                nulls[field] = data[NULL_PREFIX + field] if NULL_PREFIX + field in data.files else array == ""
+    for mask in list(absent.values()) + list(nulls.values()):
+        mask.setflags(write=False)
+    return ColumnTable(columns, kinds, absent, nulls)
+
+
+def read_year(dataset, year, archive_dir=ARCHIVE_DIR, index=None):
+    """보관된 한 해 (없으면 None)"""
+    index = index or load_index(archive_dir)
+    entry = index["datasets"].get(dataset, {}).get(str(year))
+    if entry is None:
+        return None
+    return _read_block(os.path.join(archive_dir, entry["file"]), entry["sha1"], tuple(entry["kinds"].items()))
+
+
+def archived_years(dataset, archive_dir=ARCHIVE_DIR):
+    return sorted(int(y) for y in load_index(archive_dir)["datasets"].get(dataset, {}))
+
+
+# ============================================================
+# 읽기 (보관 + hot)
+# ============================================================
+def read_table(dataset, hot_file=None, archive_dir=ARCHIVE_DIR):
+    """보관 연도 + hot 기록 → ColumnTable (날짜순)"""
+    hot_file = hot_file or DATASETS[dataset]
+    index = load_index(archive_dir)
+    tables = [read_year(dataset, year, archive_dir, index) for year in archived_years(dataset, archive_dir)]
+    tables.append(ColumnTable.from_file(hot_file))
+    return ColumnTable.concat(tables)
+
+
+def read_records(dataset, hot_file=None, archive_dir=ARCHIVE_DIR):
+    """보관 연도 + hot 기록 → 딕셔너리 목록 (전체 기록이 필요한 계산용)"""
+    hot_file = hot_file or DATASETS[dataset]
+    index = load_index(archive_dir)
+    records = []
+    for year in archived_years(dataset, archive_dir):
+        records += [dict(r) for r in read_year(dataset, year, archive_dir, index)]
+    try:
+        with open(hot_file, "r", encoding="utf-8") as f:
+            records += json.load(f)
+    except (OSError, ValueError):
+        pass
+    return records
+
+
+def history_version(dataset, hot_file=None, archive_dir=ARCHIVE_DIR):
+    """hot 파일 + 보관 인덱스 기준 데이터 버전"""
+    return data_version([hot_file or DATASETS[dataset], os.path.join(archive_dir, ARCHIVE_INDEX_NAME)])
+
+
+# ============================================================
+# 보관
+# ============================================================
+def closed_years(years, today=None, grace_days=ARCHIVE_GRACE_DAYS):
+    """연말 + grace_days 가 지난 연도"""
+    today = today or date.today()
+    return sorted(y for y in years if date(y, 12, 31) + timedelta(days=grace_days) < today)
+
+
+def archive_closed_seasons(today=None, archive_dir=ARCHIVE_DIR, files=None):
+    """
+    끝난 연도를 hot JSON 에서 보관 블록으로 이동
+    반환: {데이터셋: [보관한 연도]}
+    """
+    files = files or DATASETS
+    index = load_index(archive_dir)
+    moved = {}
+
+    for dataset, hot_file in files.items():
+        try:
+            with open(hot_file, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        by_year = {}
+        for record in records:
+            by_year.setdefault(int(record["date"][:4]), []).append(record)
+        years = closed_years(by_year, today)
+        if not years:
+            continue
+
+        os.makedirs(archive_dir, exist_ok=True)
+        entries = index["datasets"].setdefault(dataset, {})
+        for year in years:
+            rows = by_year[year]
+            existing = read_year(dataset, year, archive_dir, index)
+            if existing is not None:
+                # 이미 보관된 해에 늦게 들어온 기록 → 합쳐서 다시 씀 (날짜 중복은 hot 우선)
+                dates = {r["date"] for r in rows}
+                rows = sorted([dict(r) for r in existing if r["date"] not in dates] + rows, key=lambda r: r["date"])
+            table = ColumnTable.from_records(rows)
+            filename = f"{dataset}_{year}.npz"
+            entries[str(year)] = {
+                "file": filename,
+                "rows": len(table),
+                "date_min": rows[0]["date"],
+                "date_max": rows[-1]["date"],
+                "kinds": table.kinds,
+                "sha1": _write_block(table, os.path.join(archive_dir, filename)),
+            }
+
+        _save_index(index, archive_dir)
+        remaining = [r for r in records if int(r["date"][:4]) not in years]
+        tmp = hot_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(remaining, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, hot_file)
+        moved[dataset] = years
+
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="지난 시즌 압축 보관")
+    parser.add_argument("--list", action="store_true", help="보관 현황만 출력")
+    args = parser.parse_args()
+
+    if not args.list:
+        moved = archive_closed_seasons()
+        for dataset, years in moved.items():
+            print(f"🗄️  {dataset}: {', '.join(map(str, years))} 보관")
+        if not moved:
+            print("보관할 시즌 없음")
+
+    for dataset, entries in load_index()["datasets"].items():
+        for year, entry in sorted(entries.items()):
+            size = os.path.getsize(os.path.join(ARCHIVE_DIR, entry["file"])) / 1024
+            print(f"  {dataset} {year}: {entry['rows']}행 ({entry['date_min']} ~ {entry['date_max']}, {size:.0f}KB)")
+    return True
+
+
+if __name__ == "__main__":
+    exit(0 if main() else 1)
@@ -0,0 +1,179 @@
+"""
+연도 × 연중 일자 인덱스
+- 지표별 (연도 × 366) 행렬을 미리 만들어 두고 수집 시 바뀐 칸만 갱신
+- 올해 vs N년 비교, 평년 대비 편차를 배열 조회로 계산
+"""
+
+import os
+import json
+import warnings
+from datetime import datetime
+
+import numpy as np
+
+DATA_DIR = "data"
+SEASON_INDEX_FILE = os.path.join(DATA_DIR, "season_index.json")
+
+DAYS_PER_YEAR = 366
+
+SENSOR_METRICS = [
+    "outdoor_temp",
+    "outdoor_humid",
+    "temp_2dong",
+    "temp_3dong",
+    "temp_soil",
+    "moisture_2dong",
+    "moisture_3dong",
+]
+GDD_METRICS = [
+    "daily_gdd",
+    "accumulated_gdd",
+]
+METRICS = SENSOR_METRICS + GDD_METRICS
+
+
+def _year_doy(date_str):
+    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+    return date_obj.year, date_obj.timetuple().tm_yday - 1
+
+
+class SeasonIndex:
+    """지표별 연도 × 연중 일자 행렬 (빈 칸은 NaN)"""
+
+    def __init__(self):
+        self.years = []
+        self.metrics = {m: np.full((0, DAYS_PER_YEAR), np.nan) for m in METRICS}
+
+    # ------------------------------------------------------------
+    # 생성 / 저장
+    # ------------------------------------------------------------
+    @classmethod
+    def build(cls, sensor_records, gdd_records):
+        index = cls()
+        index.update(sensor_records, gdd_records)
+        return index
+
+    @classmethod
+    def load(cls, filepath=SEASON_INDEX_FILE):
+        """저장된 인덱스 로드 (없으면 None)"""
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        index = cls()
+        index.years = data.get("years", [])
+        for metric in METRICS:
+            rows = data.get("metrics", {}).get(metric)
+            if rows:
+                index.metrics[metric] = np.array(rows, dtype=float)
+            else:
+                index.metrics[metric] = np.full((len(index.years), DAYS_PER_YEAR), np.nan)
+        return index
+
+    def save(self, filepath=SEASON_INDEX_FILE):
+        data = {
+            "schema": 1,
+            "years": self.years,
+            "metrics": {
+                metric: [[None if np.isnan(v) else round(float(v), 2) for v in row] for row in values]
+                for metric, values in self.metrics.items()
+            },
+        }
+        try:
+            os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+            with open(filepath, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            return True
+        except OSError as e:
+            print(f"❌ Save error: {e}")
+            return False
+
+    # ------------------------------------------------------------
+    # 증분 갱신
+    # ------------------------------------------------------------
+    def _row(self, year):
+        if year not in self.years:
+            self.years.append(year)
+            self.years.sort()
+            row = self.years.index(year)
+            for metric in METRICS:
+                self.metrics[metric] = np.insert(self.metrics[metric], row, np.nan, axis=0)
+        return self.years.index(year)
+
+    def update(self, sensor_records=(), gdd_records=()):
+        """새/수정된 기록의 칸만 갱신, 바뀐 칸 수 반환"""
+        changed = 0
+        for records, metrics in ((sensor_records, SENSOR_METRICS), (gdd_records, GDD_METRICS)):
+            for record in records:
+                year, doy = _year_doy(record["date"])
+                row = self._row(year)
+                for metric in metrics:
+                    value = record.get(metric)
+                    value = np.nan if value is None else float(value)
+                    current = self.metrics[metric][row, doy]
+                    if not (current == value or (np.isnan(current) and np.isnan(value))):
+                        self.metrics[metric][row, doy] = value
+                        changed += 1
+        return changed
+
+    # ------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------
+    def series(self, metric, year):
+        """해당 연도의 366일 배열 (없으면 NaN 배열)"""
+        if year not in self.years:
+            return np.full(DAYS_PER_YEAR, np.nan)
+        return self.metrics[metric][self.years.index(year)]
+
+    def value(self, metric, date_str):
+        year, doy = _year_doy(date_str)
+        return self.series(metric, year)[doy]
+
+    def season_gdd(self, year):
+        """해당 연도 1월 1일부터의 누적 GDD (기록 없는 날은 이전 값 유지)"""
+        daily = self.series("daily_gdd", year)
+        cumulative = np.nancumsum(daily)
+        last_day = np.flatnonzero(~np.isnan(daily))
+        if len(last_day):
+            cumulative[last_day[-1] + 1:] = np.nan
+        else:
+            cumulative[:] = np.nan
+        return cumulative
+
+    def compare(self, metric, year, other_year):
+        """두 연도의 같은 날짜 비교 → (올해, 비교 연도, 차이)"""
+        if metric == "season_gdd":
+            this, other = self.season_gdd(year), self.season_gdd(other_year)
+        else:
+            this, other = self.series(metric, year), self.series(metric, other_year)
+        return this, other, this - other
+
+    def anomaly(self, metric, year):
+        """다른 연도 평균 대비 편차"""
+        others = [i for i, y in enumerate(self.years) if y != year]
+        if not others:
+            return np.full(DAYS_PER_YEAR, np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # 모든 연도가 빈 날짜
+            baseline = np.nanmean(self.metrics[metric][others], axis=0)
+        return self.series(metric, year) - baseline
+
+
+def update_season_index(sensor_records, gdd_records, full_sensor=None, full_gdd=None,
+                        filepath=SEASON_INDEX_FILE):
+    """
+    수집기용 증분 갱신
+    인덱스 파일이 없으면 전체 기록(full_*)으로 새로 만듭니다.
+    """
+    index = SeasonIndex.load(filepath)
+    if index is None:
+        index = SeasonIndex.build(full_sensor or sensor_records, full_gdd or gdd_records)
+        changed = sum(int(np.count_nonzero(~np.isnan(v))) for v in index.metrics.values())
+    else:
+        changed = index.update(sensor_records, gdd_records)
+
+    if changed:
+        index.save(filepath)
+    return changed
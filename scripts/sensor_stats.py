@@ -0,0 +1,114 @@
+"""
+센서 스트리밍 통계 및 이상 감지
+- 채널별 1패스 누적 (Welford): 평균/최소/최대/표준편차/유효 샘플 수
+- 값 목록을 저장하지 않으므로 채널당 메모리 O(1)
+- 결측/범위 이탈/고착(값 변화 없음) 플래그
+"""
+
+import math
+
+# 채널별 허용 범위 (이탈 값은 통계에서 제외)
+CHANNEL_LIMITS = {
+    "outdoor_temp": (-30.0, 50.0),
+    "outdoor_humid": (0.0, 100.0),
+    "temp_2dong": (-30.0, 60.0),
+    "temp_3dong": (-30.0, 60.0),
+    "temp_soil": (-20.0, 50.0),
+    "moisture_2dong": (0.0, 100.0),
+    "moisture_3dong": (0.0, 100.0),
+}
+
+# 이 샘플 수 이상 값이 전혀 변하지 않으면 고착으로 판단 (30분 간격 기준 6시간)
+# 토양 수분은 하루 종일 일정할 수 있어 검사하지 않음
+STUCK_MIN_SAMPLES = {
+    "outdoor_temp": 12,
+    "outdoor_humid": 12,
+    "temp_2dong": 12,
+    "temp_3dong": 12,
+    "temp_soil": 12,
+}
+
+# GDD 계산에 필요한 채널 → 이상 시 하루 전체를 bad 로 표시
+CRITICAL_CHANNELS = ("outdoor_temp",)
+
+
+class RunningStats:
+    """Welford 방식 1패스 통계"""
+
+    __slots__ = ("n", "mean", "_m2", "min", "max", "rejected")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.rejected = 0
+
+    def add(self, value, limits=None):
+        if limits and not (limits[0] <= value <= limits[1]):
+            self.rejected += 1
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / self.n) if self.n > 1 else 0.0
+
+    def to_dict(self):
+        if not self.n:
+            return {"n": 0, "rejected": self.rejected}
+        return {
+            "n": self.n,
+            "min": round(self.min, 2),
+            "max": round(self.max, 2),
+            "std": round(self.std, 2),
+            "rejected": self.rejected,
+        }
+
+
+def channel_flags(channel, stats):
+    """채널 이상 플래그 목록"""
+    flags = []
+    if stats.rejected:
+        flags.append("out_of_range")
+    if stats.n == 0:
+        flags.append("missing")
+    elif stats.n >= STUCK_MIN_SAMPLES.get(channel, math.inf) and stats.max == stats.min:
+        flags.append("stuck")
+    return flags
+
+
+def assess_day(channel_stats):
+    """
+    하루치 채널 통계 → 데이터 품질
+    반환: {"status": "good" | "degraded" | "bad", "flags": {채널: [플래그]}}
+    """
+    flags = {}
+    for channel, stats in channel_stats.items():
+        channel_flag = channel_flags(channel, stats)
+        if channel_flag:
+            flags[channel] = channel_flag
+
+    status = "good"
+    if flags:
+        status = "degraded"
+    if any(channel in flags and (flags[channel] != ["out_of_range"]) for channel in CRITICAL_CHANNELS):
+        status = "bad"
+
+    return {"status": status, "flags": flags}
+
+
+def is_valid(record, channel):
+    """기록의 채널 값을 계산에 써도 되는지 (결측/고착/범위 이탈 제외)"""
+    if record.get(channel) is None:
+        return False
+    flags = record.get("quality", {}).get("flags", {}).get(channel, [])
+    return not any(flag in ("missing", "stuck") for flag in flags)
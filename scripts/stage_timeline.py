@@ -0,0 +1,169 @@
+"""
+연도별 생육 단계 타임라인
+- 수집기가 단계별 시작/끝 날짜 구간을 미리 만들어 저장
+  (시작일: 직접 기록한 생육 이벤트 > 시즌 누적 GDD 도달일 > 월 기준)
+- 임의 날짜의 단계, 진행률, 다음 이정표를 이진 탐색으로 조회
+"""
+
+import os
+import json
+from bisect import bisect_right
+from datetime import date, datetime
+
+from growth_stage import stage_info
+
+DATA_DIR = "data"
+STAGE_TIMELINE_FILE = os.path.join(DATA_DIR, "stage_timeline.json")
+
+TIMELINE_SCHEMA = 1
+
+# 단계 순서와 시작 기준
+# events: 생육 기록 탭의 수동 입력 키, gdd: 시즌 누적 GDD 도달값, month: 늦어도 이 달 1일에 시작
+STAGE_RULES = [
+    {"id": "dormancy", "events": [], "gdd": None, "month": 1},
+    {"id": "pre_flowering", "events": ["발아_확인"], "gdd": 200, "month": None},
+    {"id": "flowering", "events": ["개화_시작"], "gdd": 750, "month": 4},
+    {"id": "fruiting", "events": ["착과_확인"], "gdd": None, "month": 6},
+    {"id": "harvest", "events": ["수확_시작"], "gdd": None, "month": 11},
+]
+
+
+def _season_gdd(gdd_records):
+    """연도 → (날짜 목록, 1월 1일부터의 누적 GDD 목록)"""
+    seasons = {}
+    for record in sorted(gdd_records, key=lambda r: r["date"]):
+        dates, values = seasons.setdefault(int(record["date"][:4]), ([], []))
+        total = (values[-1] if values else 0) + (record.get("daily_gdd") or 0)
+        dates.append(record["date"])
+        values.append(round(total, 2))
+    return seasons
+
+
+def _year_intervals(year, dates=(), values=(), events=None):
+    """한 해의 단계 구간 [{id, start, end, source}] (end 는 포함)"""
+    events = events or {}
+    starts = []
+    for rule in STAGE_RULES:
+        recorded = [events[key]["date"] for key in rule["events"]
+                    if key in events and events[key].get("date", "")[:4] == str(year)]
+        if recorded:
+            starts.append((min(recorded), "event"))
+            continue
+        candidates = []
+        if rule["gdd"] is not None:
+            crossed = next((d for d, v in zip(dates, values) if v >= rule["gdd"]), None)
+            if crossed:
+                candidates.append((crossed, "gdd"))
+        if rule["month"] is not None:
+            candidates.append((f"{year}-{rule['month']:02d}-01", "month"))
+        starts.append(min(candidates) if candidates else None)
+
+    # 뒤 단계가 먼저 시작했으면 앞 단계는 그 날까지로 (빈 구간은 제외)
+    intervals = []
+    next_start = f"{year + 1}-01-01"
+    for rule, start in reversed(list(zip(STAGE_RULES, starts))):
+        if start is None or start[0] >= next_start:
+            continue
+        end = date.fromordinal(datetime.strptime(next_start, "%Y-%m-%d").toordinal() - 1).isoformat()
+        intervals.append({"id": rule["id"], "start": start[0], "end": end, "source": start[1]})
+        next_start = start[0]
+    return intervals[::-1]
+
+
+class StageTimeline:
+    """연도별 단계 구간 + 시즌 GDD (날짜 → 단계 조회)"""
+
+    def __init__(self, years=None):
+        self.years = years or {}
+        self._index()
+
+    def _index(self):
+        self._intervals = [i for year in sorted(self.years) for i in self.years[year]["intervals"]]
+        self._starts = [i["start"] for i in self._intervals]
+
+    # ------------------------------------------------------------
+    # 생성 / 저장
+    # ------------------------------------------------------------
+    @classmethod
+    def build(cls, gdd_records, phenology=None):
+        phenology = phenology or {}
+        seasons = _season_gdd(gdd_records)
+        years = {}
+        for year in sorted(set(seasons) | {int(y) for y in phenology if y.isdigit()}):
+            dates, values = seasons.get(year, ([], []))
+            years[str(year)] = {
+                "intervals": _year_intervals(year, dates, values, phenology.get(str(year))),
+                "dates": dates,
+                "gdd": values,
+            }
+        return cls(years)
+
+    @classmethod
+    def load(cls, filepath=STAGE_TIMELINE_FILE):
+        """저장된 타임라인 로드 (없으면 None)"""
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("schema") != TIMELINE_SCHEMA:
+            return None
+        return cls(data["years"])
+
+    def to_dict(self):
+        return {"schema": TIMELINE_SCHEMA, "years": self.years}
+
+    def save(self, filepath=STAGE_TIMELINE_FILE):
+        try:
+            os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+            with open(filepath, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+            return True
+        except OSError as e:
+            print(f"❌ Save error: {e}")
+            return False
+
+    # ------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------
+    def intervals(self, year=None):
+        """단계 구간 목록 (연도 지정 시 그 해만, 기록 없는 해는 월 기준)"""
+        if year is None:
+            return list(self._intervals)
+        entry = self.years.get(str(year))
+        return entry["intervals"] if entry else _year_intervals(year)
+
+    def season_gdd(self, date_str):
+        """그 날까지의 시즌 누적 GDD (기록이 없으면 마지막 값)"""
+        entry = self.years.get(date_str[:4])
+        if not entry:
+            return 0
+        i = bisect_right(entry["dates"], date_str) - 1
+        return entry["gdd"][i] if i >= 0 else 0
+
+    def interval(self, date_str):
+        i = bisect_right(self._starts, date_str) - 1
+        if i >= 0 and date_str <= self._intervals[i]["end"]:
+            return self._intervals[i]
+        year = int(date_str[:4])
+        return next(i for i in _year_intervals(year) if i["start"] <= date_str <= i["end"])
+
+    def lookup(self, date_str):
+        """날짜 → 단계 정보 (classify_stage 형식 + 구간, 시즌 GDD)"""
+        if isinstance(date_str, date):
+            date_str = date_str.isoformat()
+        interval = self.interval(date_str)
+        current_gdd = self.season_gdd(date_str)
+        info = stage_info(interval["id"], int(date_str[5:7]), current_gdd)
+        info.update(start=interval["start"], end=interval["end"], source=interval["source"],
+                    date=date_str, gdd=current_gdd)
+        return info
+
+
+def update_stage_timeline(gdd_records, phenology, filepath=STAGE_TIMELINE_FILE):
+    """수집기용: 전체 기록으로 다시 만들고 바뀐 경우에만 저장"""
+    timeline = StageTimeline.build(gdd_records, phenology)
+    previous = StageTimeline.load(filepath)
+    if previous is None or previous.years != timeline.years:
+        timeline.save(filepath)
+    return timeline
@@ -0,0 +1,49 @@
+"""
+합성 ECOWITT 히스토리 데이터
+- 부하 테스트(load_test.py)와 API 재생 서버(ecowitt_replay.py)가 같이 쓰는 생성기
+- 같은 시드면 같은 응답
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+SAMPLE_SECONDS = 1800
+
+
+def synthetic_api_data(start, days, seed=0, interval=SAMPLE_SECONDS):
+    """
+    ECOWITT 히스토리 응답 형식의 샘플 (기본 30분 간격)
+    기온: 연중 코사인 + 일교차 + AR(1) 잡음, 동 내부는 실외보다 따뜻하게
+    """
+    rng = np.random.default_rng(seed)
+    per_day = 24 * 3600 // interval
+    ts = int(start.timestamp()) + np.arange(days * per_day) * interval
+    local = [datetime.fromtimestamp(t) for t in ts[::per_day]]
+    doy = np.repeat([d.timetuple().tm_yday for d in local], per_day)[:len(ts)]
+    hour = (ts % 86400) / 3600 + 9  # KST
+
+    noise = np.zeros(len(ts))
+    shocks = rng.normal(0, 0.35, len(ts))
+    for i in range(1, len(ts)):
+        noise[i] = 0.995 * noise[i - 1] + shocks[i]
+
+    outdoor = 14.5 - 11 * np.cos(2 * np.pi * (doy - 20) / 365) + 5 * np.sin(2 * np.pi * (hour - 9) / 24) + noise
+    channels = {
+        ("indoor", "temperature"): outdoor,
+        ("indoor", "humidity"): np.clip(70 - 2 * (outdoor - outdoor.mean()) + rng.normal(0, 3, len(ts)), 20, 100),
+        ("temp_and_humidity_ch1", "temperature"): outdoor + 3 + rng.normal(0, 0.5, len(ts)),
+        ("temp_and_humidity_ch3", "temperature"): outdoor + 2.5 + rng.normal(0, 0.5, len(ts)),
+        ("temp_ch2", "temperature"): np.convolve(outdoor, np.ones(2 * per_day) / (2 * per_day), mode="same") + 2,
+        ("soil_ch1", "soilmoisture"): 42 + 4 * np.sin(2 * np.pi * ts / (5 * 86400)) + rng.normal(0, 0.5, len(ts)),
+        ("soil_ch2", "soilmoisture"): 43 + 4 * np.cos(2 * np.pi * ts / (6 * 86400)) + rng.normal(0, 0.5, len(ts)),
+    }
+
+    payload = {}
+    keys = [str(t) for t in ts]
+    for (source, measure), values in channels.items():
+        payload.setdefault(source, {})[measure] = {
+            "unit": "%" if measure != "temperature" else "℃",
+            "list": dict(zip(keys, (f"{v:.1f}" for v in values))),
+        }
+    return payload
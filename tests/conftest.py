@@ -0,0 +1,5 @@
+import os
+import sys
+
+# scripts/ 의 모듈은 서로 최상위 이름으로 import
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
@@ -0,0 +1,62 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from alerts import FARM_TZ, RULES, AlertEngine, process_alerts
+
+
+def kst(text):
+    return int(datetime.strptime(text, "%Y-%m-%d %H:%M").replace(tzinfo=FARM_TZ).timestamp())
+
+
+@pytest.fixture
+def utc_runner(monkeypatch):
+    """GitHub Actions 처럼 러너 로컬 시간이 UTC"""
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def night_rule():
+    return [r for r in RULES if r["id"] == "night_cold_2dong"]
+
+
+def test_night_window_uses_farm_time(utc_runner):
+    engine = AlertEngine(rules=night_rule())
+    samples = [(kst("2026-05-10 13:00"), 12.0), (kst("2026-05-10 16:00"), 14.0), (kst("2026-05-10 22:00"), 12.0)]
+    alerts = engine.evaluate({"temp_2dong": samples}, lambda d: "flowering")
+    assert [(a["date"], a["time"]) for a in alerts] == [("2026-05-10", "22:00")]
+
+
+def test_date_and_stage_use_farm_day(utc_runner):
+    # KST 01:00 = 전날 16:00 UTC → 날짜는 현지 기준
+    seen = []
+    engine = AlertEngine(rules=night_rule())
+    alerts = engine.evaluate({"temp_2dong": [(kst("2026-05-11 01:00"), 10.0)]},
+                             lambda d: seen.append(d) or "flowering")
+    assert seen == ["2026-05-11"]
+    assert alerts[0]["date"] == "2026-05-11"
+
+
+def test_duration_rule_fires_once_per_episode():
+    rule = [r for r in RULES if r["id"] == "moisture_low_2dong"]
+    start = kst("2026-07-01 00:00")
+    low = [(start + i * 1800, 35.0) for i in range(16)]
+    engine = AlertEngine(rules=rule)
+    alerts = engine.evaluate({"moisture_2dong": low}, lambda d: "fruiting")
+    # 6시간 지속 → 13번째 샘플에서 한 번만
+    assert [a["ts"] for a in alerts] == [start + 12 * 1800]
+
+
+def test_incremental_state_skips_seen_samples(tmp_path):
+    rule_ids = {"cold_shock"}
+    series = {"outdoor_temp": [(kst("2026-02-01 03:00"), 5.0), (kst("2026-02-01 03:30"), 4.0)]}
+    files = dict(state_file=str(tmp_path / "state.json"), log_file=str(tmp_path / "log.json"))
+    stage = lambda d: "dormancy"
+    first = process_alerts(series, stage, **files)
+    again = process_alerts(series, stage, **files)
+    assert [a["rule"] for a in first if a["rule"] in rule_ids] == ["cold_shock"]
+    assert again == []
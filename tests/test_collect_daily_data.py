@@ -0,0 +1,77 @@
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import collect_daily_data as collector
+
+
+def day(offset):
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+
+def record(date_str, n=48):
+    return {"date": date_str, "outdoor_temp": 15.0, "sample_count": n,
+            "stats": {"outdoor_temp": {"n": n}, "temp_2dong": {"n": 0}}}
+
+
+def test_find_gaps_ignores_inactive_channels():
+    history = [record("2026-05-01"), record("2026-05-02", n=30), record("2026-05-04"),
+               {"date": "2026-05-05", "sample_count": 20}]
+    gaps = collector.find_gaps(history, datetime(2026, 5, 1), datetime(2026, 5, 5))
+    # temp_2dong 는 검사 기간 내내 0 → 미설치 센서로 보고 제외
+    assert gaps == ["2026-05-02", "2026-05-03", "2026-05-05"]
+
+
+def test_coalesce_ranges_bridges_and_splits():
+    dates = ["2026-05-01", "2026-05-02", "2026-05-04", "2026-05-08", "2026-05-10"]
+    assert collector.coalesce_ranges(dates) == [("2026-05-01", "2026-05-04"), ("2026-05-08", "2026-05-10")]
+    assert collector.coalesce_ranges(dates, bridge_days=0) == [
+        ("2026-05-01", "2026-05-02"), ("2026-05-04", "2026-05-04"),
+        ("2026-05-08", "2026-05-08"), ("2026-05-10", "2026-05-10")]
+
+    week = [f"2026-06-{d:02d}" for d in range(1, 11)]
+    assert collector.coalesce_ranges(week, max_days=7) == [("2026-06-01", "2026-06-07"), ("2026-06-08", "2026-06-10")]
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    """최근 10일 기록: 8일 전 없음, 7일 전 샘플 부족, 4일 전 없음"""
+    monkeypatch.chdir(tmp_path)
+    records = [record(day(-10)), record(day(-9)), record(day(-7), n=10), record(day(-6)),
+               record(day(-5)), record(day(-3)), record(day(-2)), record(day(-1))]
+    collector.save_json(collector.SENSOR_FILE, records)
+    return records
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """요청 구간마다 하루 48개 샘플을 돌려주는 API 대역"""
+    calls = []
+
+    def get_history_data(start, end):
+        calls.append((start[:10], end[:10]))
+        first = datetime.strptime(start[:10], "%Y-%m-%d")
+        days = (datetime.strptime(end[:10], "%Y-%m-%d") - first).days + 1
+        ts = [int(first.timestamp()) + i * 1800 for i in range(days * 48)]
+        return {"indoor": {"temperature": {"list": {str(t): "15.0" for t in ts}}}}
+
+    monkeypatch.setattr(collector, "get_history_data", get_history_data)
+    return calls
+
+
+def test_repair_gaps_refetches_only_incomplete_days(history, fake_api):
+    repaired = collector.repair_gaps()
+    assert fake_api == [(day(-8), day(-7)), (day(-4), day(-4))]
+    assert sorted(r["date"] for r in repaired) == [day(-8), day(-7), day(-4)]
+    assert all(r["stats"]["outdoor_temp"]["n"] == 48 for r in repaired)
+    assert collector.load_json(collector.REFETCH_LOG_FILE) == {day(-8): 1, day(-7): 1, day(-4): 1}
+
+
+def test_repair_gaps_stops_after_max_attempts(history, fake_api, monkeypatch):
+    monkeypatch.setattr(collector, "parse_history_data", lambda api_data: [])
+    for _ in range(collector.MAX_REFETCH_ATTEMPTS + 1):
+        assert collector.repair_gaps() == []
+    assert len(fake_api) == 2 * collector.MAX_REFETCH_ATTEMPTS
+    with open(collector.REFETCH_LOG_FILE, encoding="utf-8") as f:
+        assert set(json.load(f).values()) == {collector.MAX_REFETCH_ATTEMPTS}
@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+from dashboard_snapshot import build_snapshot, load_snapshot, write_snapshot
+from stage_timeline import StageTimeline
+
+
+def gdd_records(start, end, daily=5.0):
+    records, total, day = [], 0.0, start
+    while day <= end:
+        total += daily
+        records.append({"date": day.isoformat(), "daily_gdd": daily, "accumulated_gdd": total})
+        day += timedelta(days=1)
+    return records
+
+
+def test_second_season_milestones_use_season_gdd():
+    records = gdd_records(date(2025, 1, 1), date(2026, 1, 20))
+    snapshot = build_snapshot([], records, today=date(2026, 1, 21))
+    # 전체 누적은 1930 이지만 올해는 20일 × 5
+    assert snapshot["current_gdd"] == 100.0
+    assert [m["reached"] for m in snapshot["milestones"]] == [False] * len(snapshot["milestones"])
+    assert snapshot["stage"]["id"] == "dormancy"
+    assert snapshot["stage"]["gdd"] == snapshot["current_gdd"]
+
+
+def test_stage_is_the_timeline_lookup(tmp_path):
+    records = gdd_records(date(2026, 1, 1), date(2026, 5, 10))
+    phenology = {"2026": {"개화_시작": {"date": "2026-05-02"}}}
+    timeline = StageTimeline.build(records, phenology)
+    sensor, gdd = tmp_path / "sensor.json", tmp_path / "gdd.json"
+    sensor.write_text("[]")
+    gdd.write_text("[]")
+    path = str(tmp_path / "snapshot.json")
+
+    written = write_snapshot([], records, path, str(sensor), str(gdd), timeline=timeline)
+    loaded = load_snapshot(path, str(sensor), str(gdd))
+    assert loaded["stage"] == written["stage"]
+    assert loaded["stage"] == timeline.lookup(loaded["stage"]["date"])
+    assert build_snapshot([], records, today=date(2026, 5, 10), timeline=timeline)["stage"]["source"] == "event"
@@ -0,0 +1,31 @@
+import numpy as np
+
+from farm_data import ColumnTable
+
+
+RECORDS = [
+    {"date": "2026-01-01", "outdoor_temp": 3.5, "sample_count": 48, "note": "a"},
+    {"date": "2026-01-02", "outdoor_temp": None, "sample_count": 40, "note": None},
+]
+
+
+def test_get_matches_dict_get():
+    table = ColumnTable.from_records(RECORDS)
+    for view, record in zip(table, RECORDS):
+        for key in ("outdoor_temp", "sample_count", "note", "missing"):
+            assert view.get(key, "default") == record.get(key, "default")
+
+
+def test_columns_and_negative_index():
+    table = ColumnTable.from_records(RECORDS)
+    assert table.kinds == {"date": "str", "outdoor_temp": "float", "sample_count": "int", "note": "str"}
+    assert table[-1]["sample_count"] == 40
+    assert np.isnan(table.column("outdoor_temp")[1])
+    assert len(table[1:]) == 1
+
+
+def test_records_round_trip_with_none_empty_and_absent_keys():
+    records = RECORDS + [{"date": "2026-01-03", "note": ""}]
+    table = ColumnTable.from_records(records)
+    assert [dict(view) for view in table] == records
+    assert [dict(view) for view in ColumnTable.concat([table[:1], table[1:]])] == records
@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from forecast import build_climatology, forecast_milestones, season_to_date_gdd, simulate_temperatures
+
+
+def gdd_records(start, end, daily=5.0):
+    records, total, day = [], 0.0, start
+    while day <= end:
+        total += daily
+        records.append({"date": day.isoformat(), "daily_gdd": daily, "accumulated_gdd": total,
+                        "stress_days_remaining": 0})
+        day += timedelta(days=1)
+    return records
+
+
+@pytest.fixture
+def climatology():
+    return build_climatology([])
+
+
+def test_season_to_date_gdd_counts_only_that_year():
+    records = gdd_records(date(2025, 12, 1), date(2026, 1, 10))
+    assert season_to_date_gdd(records, 2026) == 50.0
+    assert season_to_date_gdd(records, 2027) == 0.0
+
+
+def test_simulated_temperatures_follow_ar1(climatology):
+    climatology = dict(climatology, ar1=0.6)
+    temps = simulate_temperatures(climatology, start_doy=100, n_days=60, n_sims=4000, seed=0)
+    assert temps.shape == (4000, 60)
+    mean, std = np.asarray(climatology["mean"]), np.asarray(climatology["std"])
+    z = (temps - mean[100:160]) / std[100:160]
+    assert abs(z.mean()) < 0.05
+    assert abs(z.std() - 1) < 0.05
+    lag1 = np.mean([np.corrcoef(z[:, d], z[:, d + 1])[0, 1] for d in range(59)])
+    assert abs(lag1 - 0.6) < 0.05
+
+
+def test_second_season_forecast_starts_from_season_gdd(climatology):
+    records = gdd_records(date(2024, 1, 1), date(2026, 2, 28), daily=2.0)
+    # 전체 누적은 이미 두 이정표를 넘었지만 올해는 118
+    assert records[-1]["accumulated_gdd"] > 750
+    result = forecast_milestones([], records, climatology=climatology, n_sims=300, seed=1)
+    assert set(result) == {"bud_break", "flowering_start"}
+    assert result["bud_break"]["dates"][0.5] < result["flowering_start"]["dates"][0.5]
+    assert result["bud_break"]["dates"][0.1] >= date(2026, 3, 1)
+
+
+def test_reached_milestones_are_dropped(climatology):
+    records = gdd_records(date(2026, 1, 1), date(2026, 3, 31), daily=3.0)
+    result = forecast_milestones([], records, climatology=climatology, n_sims=100, seed=1)
+    assert "bud_break" not in result
+    assert "flowering_start" in result
+
+
+def test_year_end_record_starts_a_new_season(climatology):
+    records = gdd_records(date(2025, 1, 1), date(2025, 12, 31), daily=3.0)
+    result = forecast_milestones([], records, climatology=climatology, n_sims=100, seed=1)
+    assert result["bud_break"]["dates"][0.1] >= date(2026, 1, 1)
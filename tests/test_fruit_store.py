@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fruit_store import FruitStore, _parse_header, import_csv, normalize_frame, validate
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("tag", ("fruit_id", None)),
+    ("Fruit ID", ("fruit_id", None)),
+    ("횡경(cm)", ("transverse", "cm")),
+    ("width_mm", ("transverse", "mm")),
+    ("무게 [kg]", ("weight", "kg")),
+    ("무게", ("weight", None)),
+    ("memo", (None, None)),
+])
+def test_parse_header(header, expected):
+    assert _parse_header(header) == expected
+
+
+def csv_frame(**columns):
+    return pd.DataFrame({k: pd.Series(v, dtype=object) for k, v in columns.items()})
+
+
+def test_size_without_unit_is_rejected():
+    # 초기 과실 9.5~12.5mm 를 cm 로 추정해 10배 하던 경우
+    raw = csv_frame(tag=["A", "B", "C"], date=["2026-06-01"] * 3, 횡경=["9.5", "11", "12.5"])
+    with pytest.raises(ValueError, match="단위"):
+        normalize_frame(raw)
+
+
+def test_explicit_units_convert():
+    raw = csv_frame(tag=["A", "B"], date=["2026-06-01"] * 2, **{"횡경(mm)": ["9.5", "11"], "종경(cm)": ["1.2", "1.4"],
+                                                               "무게": ["3", "4"]})
+    frame = normalize_frame(raw)
+    assert frame["transverse_mm"].tolist() == [9.5, 11.0]
+    assert frame["longitudinal_mm"].tolist() == pytest.approx([12.0, 14.0])
+    assert frame["weight_g"].tolist() == [3.0, 4.0]
+
+
+def test_missing_house_is_rejected():
+    raw = csv_frame(tag=["A", "B", "C"], date=["2026-06-01"] * 3, house=["2", np.nan, "3동"],
+                    **{"횡경(mm)": ["20", "21", "22"]})
+    frame, rejected = validate(normalize_frame(raw))
+    assert frame["house"].tolist() == ["2동", "3동"]
+    assert rejected == {"bad_house": 1}
+
+
+def test_import_query_and_dedupe(tmp_path):
+    store = FruitStore(str(tmp_path / "store"))
+    header = "tag,house,date,횡경(mm)\n"
+    first = header + "".join(f"F{i},{i % 2 + 1},2026-06-01,{20 + i}\n" for i in range(6))
+    second = header + "".join(f"F{i},{i % 2 + 1},2026-06-08,{30 + i}\n" for i in range(6)) + "F0,1,2026-06-01,99\n"
+    import_csv(first.encode(), store)
+    result = import_csv(second.encode(), store)
+    assert result["duplicates_in_store"] == 1
+    assert store.count() == 12
+
+    one = store.query("F2")
+    assert one["date"].dt.strftime("%Y-%m-%d").tolist() == ["2026-06-01", "2026-06-08"]
+    assert one["transverse_mm"].tolist() == [22.0, 32.0]
+    assert set(store.query(house="1동")["fruit_id"]) == {"F0", "F2", "F4"}
+
+    import_csv(second.encode(), store, replace=True)
+    assert store.query("F0", end="2026-06-01")["transverse_mm"].tolist() == [99.0]
+    assert store.compact() == 3
+    assert len(store.query()) == 12
@@ -0,0 +1,126 @@
+import json
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+import collect_daily_data as collector
+from farm_data import FARM_TZ
+from gdd_engine import DEFAULT_PARAMS, accumulate_gdd, build_temperature_matrix, degree_hours, parameter_grid
+
+# 저온 쇼크 → 회복 기간 → 정상, 중간에 결측일 포함
+TEMPS = [12.0, 15.5, 7.0, 14.0, 16.0, None, 18.0, 20.0, 6.5, 11.0, 13.0, 22.5, 25.0, 9.0]
+
+
+def sensor_records(temps, start=date(2026, 4, 1)):
+    return [{"date": (start + timedelta(days=i)).isoformat(), "outdoor_temp": t} for i, t in enumerate(temps)]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_matches_collector_calculate_gdd(data_dir):
+    assert collector.calculate_gdd(sensor_records(TEMPS), bad_day_policy="skip")
+    with open(collector.GDD_FILE, encoding="utf-8") as f:
+        expected = json.load(f)
+
+    temps = np.array([np.nan if t is None else t for t in TEMPS])
+    daily, acc = accumulate_gdd(temps, **DEFAULT_PARAMS)
+    np.testing.assert_allclose(daily, [r["daily_gdd"] for r in expected], atol=0.005)
+    np.testing.assert_allclose(acc, [r["accumulated_gdd"] for r in expected], atol=0.005)
+
+
+def test_grid_matches_single_runs():
+    params = parameter_grid({"base_temp": [9.0, 10.0], "shock_threshold": [7.0, 8.0],
+                             "recovery_penalty": [0.0, 0.5], "stress_window": [0, 3]})
+    temps = np.array([[np.nan if t is None else t for t in TEMPS], np.linspace(5, 25, len(TEMPS))])
+    _, grid = accumulate_gdd(temps, **{name: values[:, None] for name, values in params.items()})
+    assert grid.shape == (16, 2, len(TEMPS))
+
+    for p in range(16):
+        single = {name: values[p] for name, values in params.items()}
+        for y in range(2):
+            np.testing.assert_allclose(grid[p, y], accumulate_gdd(temps[y], **single)[1])
+
+
+def test_thresholds_give_first_crossing_day():
+    temps = np.array([np.nan if t is None else t for t in TEMPS])
+    _, acc = accumulate_gdd(temps)
+    crossing = accumulate_gdd(temps, thresholds=[10.0, 30.0, 1e6])
+    assert crossing[0] == np.argmax(acc >= 10.0)
+    assert crossing[1] == np.argmax(acc >= 30.0)
+    assert crossing[2] == -1
+
+
+def test_temperature_matrix_skips_invalid_days():
+    records = sensor_records([10.0, None, 12.0, 13.0], start=date(2025, 12, 31))
+    records[2]["quality"] = {"flags": {"outdoor_temp": ["stuck"]}}
+    years, temps = build_temperature_matrix(records)
+    assert years == [2025, 2026]
+    assert temps[0, 364] == 10.0
+    assert np.isnan(temps[1, :2]).all() and temps[1, 2] == 13.0
+
+
+@pytest.fixture
+def farm_runner(monkeypatch):
+    """degree_hours 날짜 구분은 러너 로컬 시간 → 농장 시간대로 고정"""
+    monkeypatch.setenv("TZ", "Asia/Seoul")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def kst(text):
+    return int(datetime.strptime(text, "%Y-%m-%d %H:%M").replace(tzinfo=FARM_TZ).timestamp())
+
+
+def test_degree_hours_constant_day(farm_runner):
+    ts = kst("2026-05-01 00:00") + np.arange(48) * 1800
+    result = degree_hours(ts, np.full(48, 20.0))
+    assert result["date"] == ["2026-05-01"]
+    np.testing.assert_allclose([result["heat"][0], result["cold_hours"][0], result["covered_hours"][0]],
+                               [10.0 * 23.5, 0.0, 23.5])
+
+
+def test_degree_hours_integrates_threshold_crossings(farm_runner):
+    # 6 → 14°C 한 시간: 기준 10°C 위 삼각형 0.5h × 4°C / 2, 8°C 아래 0.25h
+    result = degree_hours([kst("2026-05-01 03:00"), kst("2026-05-01 04:00")], [6.0, 14.0])
+    assert result["heat"][0] == pytest.approx(1.0)
+    assert result["cold_hours"][0] == pytest.approx(0.25)
+
+    # 순서가 바뀌어 들어와도 같은 값
+    reverse = degree_hours([kst("2026-05-01 04:00"), kst("2026-05-01 03:00")], [14.0, 6.0])
+    assert reverse["heat"][0] == pytest.approx(1.0)
+
+
+def test_degree_hours_skips_long_gaps_and_splits_days(farm_runner):
+    ts = [kst("2026-05-01 20:00"), kst("2026-05-01 20:30"), kst("2026-05-01 23:30"), kst("2026-05-02 00:00")]
+    result = degree_hours(ts, [12.0, 12.0, 14.0, 16.0])
+    # 20:30 → 23:30 (3h) 은 max_gap 이내, 23:30 → 00:00 은 시작 시각의 날짜(5/1)
+    assert result["date"] == ["2026-05-01"]
+    assert result["covered_hours"][0] == pytest.approx(4.0)
+
+    result = degree_hours(ts, [12.0, 12.0, 14.0, 16.0], max_gap=3600)
+    assert result["covered_hours"][0] == pytest.approx(1.0)
+    assert result["heat"][0] == pytest.approx(0.5 * 2.0 + 0.5 * 5.0)
+
+    assert degree_hours([kst("2026-05-01 00:00")], [15.0])["date"] == []
+
+
+def test_calculate_gdd_degree_hour_method(data_dir):
+    records = [
+        {"date": "2026-05-01", "outdoor_temp": 12.0, "degree_hours": 120.0, "cold_hours": 0.0, "covered_hours": 24.0},
+        {"date": "2026-05-02", "outdoor_temp": 14.0, "degree_hours": 50.0, "cold_hours": 1.5, "covered_hours": 24.0},
+        {"date": "2026-05-03", "outdoor_temp": 16.0, "degree_hours": 96.0, "cold_hours": 0.0, "covered_hours": 6.0},
+    ]
+    assert collector.calculate_gdd(records, method="degree_hour")
+    with open(collector.GDD_FILE, encoding="utf-8") as f:
+        gdd = json.load(f)
+    assert [r["daily_gdd"] for r in gdd] == [5.0, 0.0, 3.0]   # 120/24, 저온 쇼크, 측정 부족 → 일평균 (16-10) × 회복 0.5
+    assert [r.get("method") for r in gdd] == ["degree_hour", "degree_hour", None]
+    assert gdd[1]["is_shock"] and gdd[1]["cold_hours"] == 1.5
@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+
+import pytest
+
+from forecast import forecast_milestones
+from fruit_store import FruitStore
+from growth_fit import house_summary
+from season_index import SeasonIndex
+
+
+def gdd_records(start, end, daily=5.0):
+    """날마다 daily 씩 쌓이는 GDD 기록 (accumulated_gdd 는 해가 바뀌어도 이어짐)"""
+    records, total, day = [], 0.0, start
+    while day <= end:
+        total += daily
+        records.append({"date": day.isoformat(), "daily_gdd": daily, "accumulated_gdd": total})
+        day += timedelta(days=1)
+    return records
+
+
+def fits(harvest_gdd):
+    return {
+        f"F{i}": {"house": "1동", "final_mm": 60.0 + i, "harvest_gdd": harvest_gdd, "converged": True}
+        for i in range(3)
+    }
+
+
+@pytest.fixture
+def two_seasons(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    records = gdd_records(date(2024, 1, 1), date(2026, 4, 30))
+    return records, SeasonIndex.build([], records), FruitStore(str(tmp_path / "store"))
+
+
+def test_current_season_forecast_uses_season_gdd(two_seasons):
+    records, index, store = two_seasons
+    # 시즌 누적 600, 전체 누적 4255 → 수확 GDD 1000 은 올해 아직 남음
+    assert records[-1]["accumulated_gdd"] > 4000
+    summary = house_summary(fits(1000.0), store, records, index, n_sims=200, seed=1, season=2026)
+    dates = summary["1동"]["harvest_dates"]
+    expected = forecast_milestones([], records, milestones={"harvest": 1000.0}, n_sims=200, seed=1)
+    assert dates == expected["harvest"]["dates"]
+    assert date(2026, 5, 1) <= dates[0.1] <= dates[0.9] <= date(2026, 12, 31)
+
+
+def test_past_season_uses_that_season_crossing(two_seasons):
+    records, index, store = two_seasons
+    summary = house_summary(fits(1000.0), store, records, index, season=2025)
+    # 5/일 → 시즌 누적 1000 은 200번째 날
+    assert summary["1동"]["harvest_dates"][0.5] == date(2025, 7, 19)
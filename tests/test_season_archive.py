@@ -0,0 +1,39 @@
+import json
+from datetime import date
+
+import season_archive
+
+
+HOT = [
+    {"date": "2025-06-01", "outdoor_temp": 21.5, "sample_count": 48, "note": "", "stats": {"temp": [1, 2]}},
+    {"date": "2025-06-02", "outdoor_temp": None, "sample_count": 40, "note": None, "stats": None},
+    {"date": "2025-06-03", "sample_count": 12, "note": "센서 교체"},
+    {"date": "2026-06-01", "outdoor_temp": 22.0, "sample_count": 48, "note": "", "stats": {"temp": [3]}},
+    {"date": "2026-06-02", "outdoor_temp": None, "sample_count": 41, "note": None, "stats": None},
+]
+
+
+def _archive(tmp_path):
+    hot_file = tmp_path / "sensor_history.json"
+    hot_file.write_text(json.dumps(HOT), encoding="utf-8")
+    archive_dir = str(tmp_path / "archive")
+    moved = season_archive.archive_closed_seasons(today=date(2026, 6, 3), archive_dir=archive_dir,
+                                                  files={"sensor": str(hot_file)})
+    assert moved == {"sensor": [2025]}
+    return str(hot_file), archive_dir
+
+
+def test_read_records_round_trip(tmp_path):
+    hot_file, archive_dir = _archive(tmp_path)
+    assert season_archive.read_records("sensor", hot_file, archive_dir) == HOT
+
+
+def test_archived_and_hot_rows_have_same_shape(tmp_path):
+    hot_file, archive_dir = _archive(tmp_path)
+    records = season_archive.read_records("sensor", hot_file, archive_dir)
+    archived, hot = records[1], records[4]
+    assert archived["date"][:4] == "2025" and hot["date"][:4] == "2026"
+    assert list(archived) == list(hot)
+
+    table = season_archive.read_table("sensor", hot_file, archive_dir)
+    assert [dict(view) for view in table] == HOT
@@ -0,0 +1,89 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import collect_daily_data as collector
+from farm_data import FARM_TZ
+from sensor_stats import CHANNEL_LIMITS, RunningStats, assess_day, channel_flags, is_valid
+
+
+def running(values, limits=None):
+    stats = RunningStats()
+    for value in values:
+        stats.add(value, limits)
+    return stats
+
+
+def test_matches_numpy_mean_and_std():
+    values = np.random.default_rng(3).normal(18.0, 4.0, 500)
+    stats = running(values)
+    assert stats.n == 500
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.std == pytest.approx(values.std())
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+
+def test_stable_with_large_offset():
+    # 합/제곱합 방식이면 자릿수 손실로 분산이 틀어지는 범위
+    values = 1e9 + np.random.default_rng(4).normal(0.0, 0.01, 1000)
+    assert running(values).std == pytest.approx(values.std(), rel=1e-4)
+
+
+def test_out_of_range_values_are_rejected():
+    stats = running([20.0, 99.0, 22.0, -40.0], CHANNEL_LIMITS["outdoor_temp"])
+    assert (stats.n, stats.rejected, stats.mean) == (2, 2, 21.0)
+    assert stats.to_dict() == {"n": 2, "min": 20.0, "max": 22.0, "std": 1.0, "rejected": 2}
+    assert channel_flags("outdoor_temp", stats) == ["out_of_range"]
+
+
+def test_flags_and_day_status():
+    good = running(np.linspace(10, 20, 48))
+    stuck = running([15.0] * 48)
+    assert channel_flags("outdoor_temp", RunningStats()) == ["missing"]
+    assert channel_flags("temp_2dong", stuck) == ["stuck"]
+    assert channel_flags("moisture_2dong", stuck) == []
+
+    assert assess_day({"outdoor_temp": good, "temp_2dong": good})["status"] == "good"
+    assert assess_day({"outdoor_temp": good, "temp_2dong": stuck})["status"] == "degraded"
+    assert assess_day({"outdoor_temp": stuck, "temp_2dong": good})["status"] == "bad"
+    out_of_range = running([20.0, 99.0, 21.0], CHANNEL_LIMITS["outdoor_temp"])
+    assert assess_day({"outdoor_temp": out_of_range})["status"] == "degraded"
+
+
+def test_is_valid():
+    assert is_valid({"outdoor_temp": 12.0}, "outdoor_temp")
+    assert not is_valid({"outdoor_temp": None}, "outdoor_temp")
+    assert not is_valid({"outdoor_temp": 12.0, "quality": {"flags": {"outdoor_temp": ["stuck"]}}}, "outdoor_temp")
+    assert is_valid({"outdoor_temp": 12.0, "quality": {"flags": {"outdoor_temp": ["out_of_range"]}}}, "outdoor_temp")
+
+
+@pytest.fixture
+def farm_runner(monkeypatch):
+    """수집기 날짜 구분은 러너 로컬 시간 → 농장 시간대로 고정"""
+    monkeypatch.setenv("TZ", "Asia/Seoul")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_parse_history_streams_daily_stats(farm_runner):
+    start = int(datetime(2026, 5, 1, tzinfo=FARM_TZ).timestamp())
+    ts = start + np.arange(96) * 1800
+    temps = 15 + 5 * np.sin(np.arange(96) / 7)
+    temps[10] = 80.0   # 범위 이탈
+    payload = {"indoor": {"temperature": {"list": {str(t): f"{v:.1f}" for t, v in zip(ts, temps)}}}}
+
+    days = collector.parse_history_data(payload)
+    assert [d["date"] for d in days] == ["2026-05-01", "2026-05-02"]
+
+    first = np.array([float(f"{v:.1f}") for v in temps[:48]])
+    kept = np.delete(first, 10)
+    assert days[0]["outdoor_temp"] == round(kept.mean(), 2)
+    assert days[0]["stats"]["outdoor_temp"] == {"n": 47, "min": round(kept.min(), 2), "max": round(kept.max(), 2),
+                                                "std": round(kept.std(), 2), "rejected": 1}
+    assert days[0]["temp_2dong"] is None
+    assert days[0]["quality"]["flags"]["temp_2dong"] == ["missing"]
+    assert days[1]["sample_count"] == 48